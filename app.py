@@ -1,16 +1,18 @@
 import streamlit as st
-from modules import data_loader, preprocessing, eda, agent_analysis, time_analysis, anomaly, visualizations, business_intel
-import plotly.graph_objects as go
-import plotly.express as px
+from modules import data_loader, preprocessing, eda, agent_analysis, time_analysis, anomaly, business_intel, sessionization, callback_latency, occupancy, dataset_store, sql_engine, audio_scoring, recording_match, datetime_parsing, sanitizer, agent_kpis, drift, call_store, ingest, result_cache, live_feed
 import os
+import numpy as np
 import pandas as pd
 
+APP_DIR = os.path.dirname(__file__)
+SAMPLE_PATH = os.path.join(APP_DIR, "sample_data.csv")
+
 st.set_page_config(page_title="Call Center Analytics Dashboard", layout="wide", initial_sidebar_state="expanded")
 
-# Custom CSS for advanced styling (placeholder)
-if os.path.exists("assets/custom.css"):
-    with open("assets/custom.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Custom CSS for advanced styling (read from disk once per process)
+custom_css = data_loader.read_asset(os.path.join(APP_DIR, "assets", "custom.css"))
+if custom_css is not None:
+    st.markdown(f"<style>{custom_css.decode('utf-8')}</style>", unsafe_allow_html=True)
 
 # Header
 st.markdown("""
@@ -25,6 +27,9 @@ st.markdown("""
 # Sidebar: Filters, quick insights, alerts
 with st.sidebar:
     st.title("Filters & Insights")
+    live = live_feed.get_live_feed()
+    app_modes = ["Dashboard"] + (["SQL Explorer"] if sql_engine.is_available() else []) + (["Live"] if live is not None else [])
+    app_mode = st.radio("Mode", app_modes, horizontal=True, help="SQL Explorer queries every stored dump in place, without loading it into memory. Live follows the dialer feed during the shift.") if len(app_modes) > 1 else "Dashboard"
     # --- Quick Stats (if data loaded) ---
     if 'preprocessed' in locals() and preprocessed is not None:
         stats = eda.overview_stats(preprocessed)
@@ -48,14 +53,36 @@ with st.sidebar:
     # --- Filters ---
     st.markdown("<div class='section'></div>", unsafe_allow_html=True)
     st.subheader("Filter Data")
+    call_history = call_store.get_call_store()
+    history_bounds = call_history.date_bounds()
+    browse_history = st.toggle("Browse Stored History", disabled=history_bounds is None, help="Analyse previously loaded dumps from the call store instead of an upload. Only the days in the date range are read (default: the last 7 stored days).")
     date_range = st.date_input("Date Range", [])
     agent_filter = st.text_input("Agent Name (optional)")
     call_type = st.selectbox("Call Type", ["All", "Inbound", "Outbound"])
     st.markdown("<div class='section'></div>", unsafe_allow_html=True)
+    # --- Drop Folder (background ingestion of nightly dumps) ---
+    watcher = ingest.get_watcher()
+    opened_dump = None
+    if watcher is not None:
+        st.subheader("Drop Folder")
+        ingested = watcher.status()
+        done = ingested[ingested['state'] == 'done']
+        last_scan = pd.Timestamp(watcher.last_scan, unit='s').strftime('%H:%M:%S') if watcher.last_scan else 'pending'
+        latest_lag = f", latest lag {done['lag_sec'].iloc[0]:.0f}s" if not done.empty else ''
+        st.caption(f"Watching `{watcher.directory}` (last scan {last_scan}): {len(done)} ingested, {int(ingested['state'].isin(['pending', 'running']).sum())} pending, {int((ingested['state'] == 'failed').sum())} failed{latest_lag}.")
+        if not ingested.empty:
+            with st.expander("Ingestion Status"):
+                st.dataframe(ingested, use_container_width=True)
+        dump_labels = {row.dataset: f"{row.file} ({int(row.rows):,} calls)" for row in done.itertuples()}
+        opened_dump = st.selectbox("Open Ingested Dump", [None] + list(dump_labels), format_func=lambda v: "-- None --" if v is None else dump_labels[v], disabled=not dump_labels, help="Dumps are preprocessed and analysed in the background as soon as they land, so they open instantly.")
+        st.markdown("<div class='section'></div>", unsafe_allow_html=True)
     # --- Sample Data Download ---
     st.subheader("Sample Data")
-    with open(os.path.join(os.path.dirname(__file__), "sample_data.csv"), "rb") as f:
-        st.download_button("Download Sample CSV", f, file_name="sample_call_data.csv", mime="text/csv")
+    st.download_button("Download Sample CSV", data_loader.read_asset(SAMPLE_PATH), file_name="sample_call_data.csv", mime="text/csv")
+    # --- Call Recordings ---
+    st.markdown("<div class='section'></div>", unsafe_allow_html=True)
+    st.subheader("Call Recordings")
+    audio_file = st.file_uploader("Audio Feature Table", type=["parquet", "csv"], help="Output of `python -m modules.audio_features <folder>` or the notebook's enhanced_audio_features.csv.")
     # --- Help & Support ---
     st.markdown("<div class='section'></div>", unsafe_allow_html=True)
     with st.expander("❓ Help & Support"):
@@ -67,29 +94,161 @@ with st.sidebar:
     st.markdown("<div class='section'></div>", unsafe_allow_html=True)
     st.info("Upload your call center data to get started or use the sample data.")
 
+# Live: sliding-window KPIs from the dialer event stream, read from the feed's in-memory counters
+def live_overview(show_agents: bool = True):
+    snapshot = live.snapshot()
+    feed_status = snapshot['status']
+    if feed_status['error']:
+        st.warning(f"⚠️ Live feed error (retrying): {feed_status['error']}")
+    if feed_status['as_of'] is None:
+        st.info("Waiting for the first call events from the dialer feed...")
+        return
+    st.caption(f"As of {feed_status['as_of']:%Y-%m-%d %H:%M} | {feed_status['events']:,} events received, {feed_status['rejected']:,} rejected.")
+    for window, window_kpis in snapshot['windows'].items():
+        st.subheader(window)
+        col1, col2, col3, col4 = st.columns(4)
+        for col, icon, value, label in [
+            (col1, '📞', f"{window_kpis['calls']:,}", 'Calls'),
+            (col2, '✅', f"{window_kpis['answer_rate']:.1f}%", 'Answer Rate'),
+            (col3, '🚨', f"{window_kpis['drop_rate']:.1f}%", 'Drop Rate'),
+            (col4, '⏱️', f"{window_kpis['aht_min']:.2f}", 'AHT (min)'),
+        ]:
+            with col:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div class='metric-icon'>{icon}</div>
+                    <div class='metric-number'>{value}</div>
+                    <div class='metric-label'>{label}</div>
+                </div>
+                """, unsafe_allow_html=True)
+    if show_agents:
+        st.subheader("Agent Activity")
+        st.dataframe(snapshot['agents'], use_container_width=True, hide_index=True)
+
+# Refreshed in place every REFRESH_SECONDS where fragments exist (Streamlit 1.37+); older versions refresh on rerun
+if hasattr(st, 'fragment'):
+    live_overview = st.fragment(run_every=live_feed.REFRESH_SECONDS)(live_overview)
+
+if app_mode == "Live":
+    st.markdown("""
+    <div class='hero-section' style='margin-bottom:2em;'>
+        <div class='hero-icon'>📡</div>
+        <div class='hero-content'>
+            <h1>Live Floor</h1>
+            <p>Answer rate, drop rate and AHT for the last 15 and 60 minutes and today, updated as calls arrive from the dialer feed.</p>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    live_overview()
+    if not hasattr(st, 'fragment'):
+        st.button("🔄 Refresh Live KPIs")
+    st.stop()
+
+# SQL Explorer: pushed-down aggregates and ad-hoc queries over the stored dumps
+if app_mode == "SQL Explorer":
+    st.markdown("""
+    <div class='hero-section' style='margin-bottom:2em;'>
+        <div class='hero-icon'>🗄️</div>
+        <div class='hero-content'>
+            <h1>SQL Explorer</h1>
+            <p>Query the full dialer history in place. Aggregates run inside the embedded SQL engine and only results come back, so history larger than memory stays on disk.</p>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    sql_store = dataset_store.get_store()
+    stored = sql_store.datasets()
+    if not stored:
+        st.info("No stored datasets yet. Load a dump in Dashboard mode first; it is persisted automatically.")
+        st.stop()
+    selected = st.multiselect("Datasets", stored, default=stored, help="Stored dumps, identified by dataset version.")
+    sql_paths = sql_store.paths(selected)
+    if not sql_paths:
+        st.info("Select at least one dataset.")
+        st.stop()
+    sql_stats = sql_engine.overview_stats_sql(sql_paths)
+    col1, col2, col3, col4 = st.columns(4)
+    for col, icon, value, label in [
+        (col1, '📞', f"{sql_stats['total_calls']:,}", 'Total Calls'),
+        (col2, '👥', f"{sql_stats['unique_agents']}", 'Unique Agents'),
+        (col3, '⏱️', f"{(sql_stats['avg_talk_time'] or 0):.2f}", 'Avg Talk Time (min)'),
+        (col4, '🚨', f"{sql_stats['dropped_rate']:.1f}%", 'Drop Rate'),
+    ]:
+        with col:
+            st.markdown(f"""
+            <div class='metric-card'>
+                <div class='metric-icon'>{icon}</div>
+                <div class='metric-number'>{value}</div>
+                <div class='metric-label'>{label}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    st.caption(f"Date Range: {sql_stats['date_range'][0]} to {sql_stats['date_range'][1]} | Busiest Hour: {sql_stats['busiest_hour']} | Busiest Day: {sql_stats['busiest_day']}")
+    with st.expander("Agent Performance"):
+        st.dataframe(sql_engine.agent_performance_sql(sql_paths), use_container_width=True)
+    with st.expander("Hourly & Daily Patterns"):
+        sql_hourly, sql_daily = sql_engine.time_patterns_sql(sql_paths)
+        st.dataframe(sql_hourly, use_container_width=True)
+        st.dataframe(sql_daily, use_container_width=True)
+    with st.expander("Anomalous Calls"):
+        sql_anomalies = sql_engine.detect_anomalies_sql(sql_paths, n=50)
+        if sql_anomalies is None:
+            st.info("No anomalous calls found.")
+        else:
+            st.dataframe(sql_anomalies, use_container_width=True)
+    st.subheader("Ad-hoc Query")
+    query = st.text_area("SQL (the table is `calls`)", "SELECT full_name, count(*) AS calls, avg(length_in_min) AS aht\nFROM calls\nGROUP BY full_name\nORDER BY calls DESC", height=140)
+    max_rows = st.number_input("Max Rows to Display", min_value=100, max_value=1_000_000, value=10_000, step=1000)
+    if st.button("Run Query"):
+        result_slot = st.empty()
+        progress_slot = st.empty()
+        batches, rows = [], 0
+        try:
+            for batch in sql_engine.stream_query(sql_paths, query):
+                batches.append(batch.head(max_rows - rows))
+                rows += len(batches[-1])
+                progress_slot.caption(f"Streamed {rows:,} rows in {len(batches)} batch{'es' if len(batches) != 1 else ''}...")
+                if rows >= max_rows:
+                    break
+            result = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+            result_slot.dataframe(result, use_container_width=True)
+            progress_slot.caption(f"{rows:,} rows{' (truncated)' if rows >= max_rows else ''}.")
+            st.download_button("Download Query Result CSV", result.to_csv(index=False).encode('utf-8'), file_name="query_result.csv", mime="text/csv")
+        except Exception as e:
+            st.error(f"❌ Query failed: {e}")
+    st.stop()
+
 # File upload and sample data logic
 uploaded_file = st.file_uploader("Upload Call Data", type=["csv", "xlsx"], help="Drag and drop your call center data file here.")
-load_sample = False
-if not uploaded_file:
-    # Show Load Sample Data button on landing page
+if not uploaded_file and not browse_history and not opened_dump:
+    # Show Load Sample Data button on landing page; the choice is kept for the rest of the session
     if st.button("✨ Load Sample Data", key="load_sample_btn"):
-        load_sample = True
+        st.session_state['sample_loaded'] = True
 
 # --- Session state for mapping and data ---
+# Sessions only hold the dataset id; the preprocessed frame lives once per process in the dataset store
+store = dataset_store.get_store()
 if 'mapping_confirmed' not in st.session_state:
     st.session_state['mapping_confirmed'] = False
-if 'preprocessed' not in st.session_state:
-    st.session_state['preprocessed'] = None
 if 'last_uploaded_file' not in st.session_state:
     st.session_state['last_uploaded_file'] = None
+if 'dataset_version' not in st.session_state:
+    st.session_state['dataset_version'] = None
+if 'quarantine' not in st.session_state:
+    st.session_state['quarantine'] = None
+if 'sample_loaded' not in st.session_state:
+    st.session_state['sample_loaded'] = False
 
 # Reset mapping if a new file is uploaded
 if uploaded_file and uploaded_file != st.session_state['last_uploaded_file']:
     st.session_state['mapping_confirmed'] = False
-    st.session_state['preprocessed'] = None
+    st.session_state['dataset_version'] = None
+    st.session_state['quarantine'] = None
+    st.session_state['sample_loaded'] = False
     st.session_state['last_uploaded_file'] = uploaded_file
+load_sample = st.session_state['sample_loaded'] and not uploaded_file and not browse_history and not opened_dump
 
 preprocessed = None
+view_version = None
+persist_results = True
 if uploaded_file or load_sample:
     with st.spinner("Processing data..."):
         if uploaded_file:
@@ -98,6 +257,8 @@ if uploaded_file or load_sample:
                 if not st.session_state['mapping_confirmed']:
                     # --- Strict User-Driven Column Mapping ---
                     st.markdown("## Map Your Columns to Required Features")
+                    if st.session_state.pop('dataset_evicted', False):
+                        st.error("❌ This upload is no longer in the dataset store (older datasets are removed to free space). Confirm the column mapping again to reprocess it.")
                     st.info("Please map each required feature to a column in your file. No defaults are used. All mappings are mandatory.")
                     columns = list(df.columns)
                     # Date mapping: single or split
@@ -125,42 +286,113 @@ if uploaded_file or load_sample:
                         if not mapping_valid:
                             st.error("All mappings are required. Please select a column for every feature.")
                         else:
+                            # Drop summary/duplicate rows and quarantine invalid ones before mapping
+                            df, st.session_state['quarantine'] = sanitizer.sanitize(df)
                             # Apply mapping
                             if date_mapping_type == "Single column":
-                                df['call_dateTime'] = pd.to_datetime(df[date_col], errors='coerce')
+                                df['call_dateTime'], df.attrs['datetime_report'] = datetime_parsing.parse_datetimes(df[date_col])
                             else:
-                                df['call_dateTime'] = pd.to_datetime(df[date_col].astype(str) + ' ' + df[time_col].astype(str), errors='coerce')
+                                df['call_dateTime'], df.attrs['datetime_report'] = datetime_parsing.combine_date_time(df[date_col], df[time_col])
                             df['date'] = df['call_dateTime'].dt.date
                             df['full_name'] = df[agent_col]
                             df['call_outcome'] = df[outcome_col]
                             df['length_in_min'] = pd.to_numeric(df[talk_time_col], errors='coerce')
                             # Continue with preprocessing and analysis
                             preprocessed = preprocessing.preprocess_data(df)
-                            st.session_state['preprocessed'] = preprocessed
+                            if preprocessed is not None:
+                                st.session_state['dataset_version'] = store.put(data_loader.dataset_version(preprocessed), preprocessed)
+                                call_history.write(preprocessed, st.session_state['dataset_version'])
                             st.session_state['mapping_confirmed'] = True
                             st.success("Column mapping applied. Proceeding with analysis.")
                             st.rerun()
                     if not mapping_confirmed or not mapping_valid:
                         st.warning("Please complete the column mapping above to proceed with analysis.")
                         st.stop()
+                elif st.session_state['dataset_version'] is not None and st.session_state['dataset_version'] not in store:
+                    # Evicted from the dataset store since the mapping was confirmed: map the file again to reprocess it
+                    st.session_state['mapping_confirmed'] = False
+                    st.session_state['dataset_evicted'] = True
+                    st.rerun()
                 else:
-                    preprocessed = st.session_state['preprocessed']
+                    preprocessed = store.get(st.session_state['dataset_version'])
             else:
                 st.error("Failed to load data.")
+        elif load_sample and st.session_state['dataset_version'] in store:
+            # Sample already processed earlier in this session: reruns reuse the stored frame
+            preprocessed = store.get(st.session_state['dataset_version'])
         elif load_sample:
-            sample_path = os.path.join(os.path.dirname(__file__), "sample_data.csv")
-            with open(sample_path, "rb") as f:
-                df = data_loader.load_data(f)
+            df = data_loader.load_sample_data(SAMPLE_PATH)
             if df is not None:
+                df, st.session_state['quarantine'] = sanitizer.sanitize(df)
                 preprocessed = preprocessing.preprocess_data(df)
+                if preprocessed is not None:
+                    st.session_state['dataset_version'] = store.put(data_loader.dataset_version(preprocessed), preprocessed)
+                    call_history.write(preprocessed, st.session_state['dataset_version'])
+                    preprocessed = store.get(st.session_state['dataset_version'])
             else:
                 st.error("Failed to load sample data.")
+elif browse_history:
+    # Stored history: only the date partitions in range (and holding the matching agents) are read
+    history_end = date_range[-1] if date_range else history_bounds[1]
+    history_start = date_range[0] if date_range else history_end - pd.Timedelta(days=6)
+    history_agents = tuple(a for a in call_history.agents() if agent_filter.strip().lower() in a.lower()) if agent_filter.strip() else ()
+    view_version = call_history.query_version(history_start, history_end, history_agents)
+    # Each query is a one-off view: its results are not written to the result cache
+    persist_results = False
+    if history_agents or not agent_filter.strip():
+        with st.spinner("Reading stored calls..."):
+            preprocessed = data_loader.load_call_history(history_start, history_end, history_agents, call_history.version())
+    if preprocessed is None:
+        st.info(f"No stored calls between {history_start} and {history_end} for the selected agents.")
+    else:
+        st.caption(f"📚 Stored history: {len(preprocessed):,} calls from {history_start} to {history_end}{f' for {len(history_agents)} agent(s)' if history_agents else ''}.")
+elif opened_dump:
+    # Ingested in the background: the frame is in the dataset store and its results are precomputed
+    preprocessed = store.get(opened_dump)
+    if preprocessed is None:
+        st.error("The ingested dump is no longer in the dataset store.")
+    else:
+        view_version = opened_dump
+        st.session_state['quarantine'] = result_cache.load(opened_dump, 'quarantine')
+        st.caption(f"📥 Ingested dump: {dump_labels[opened_dump]}.")
+
+# Dataset version (also the store id) keys the per-dataset caches without re-hashing the frame on every rerun
+dataset_version = view_version or st.session_state['dataset_version']
+results_version = dataset_version if persist_results else None
+
+# Rows whose call date/time could not be parsed are kept (as NaT) but left out of time-based views
+datetime_report = preprocessed.attrs.get('datetime_report') if preprocessed is not None else None
+if datetime_report and (datetime_report['unparseable'] or datetime_report['missing']):
+    st.warning(f"⚠️ {datetime_report['unparseable']:,} of {datetime_report['rows']:,} rows have an unparseable call date/time (expected format: {datetime_report['format']}) and {datetime_report['missing']:,} have none; they are excluded from time-based views.")
+quality = sanitizer.quality_report(preprocessed) if preprocessed is not None else None
+if quality is not None and not quality.empty:
+    removed = int(quality.loc[quality['action'].isin(['drop', 'quarantine']), 'rows'].sum())
+    with st.expander(f"🧹 Data Quality Report ({removed:,} of {int(quality['rows'].iloc[0]):,} rows removed)"):
+        st.dataframe(quality, use_container_width=True)
+        quarantine = st.session_state['quarantine']
+        if quarantine is not None and not quarantine.empty:
+            st.download_button("Download Quarantined Rows CSV", quarantine.to_csv(index=False).encode('utf-8'), file_name="quarantined_rows.csv", mime="text/csv")
 
 # Main content: Tabs for EDA, Agent Analysis, Time Patterns, Anomalies, BI
 if preprocessed is not None:
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Overview", "Agent Analysis", "Time Patterns", "Anomalies", "Business Intelligence"])
+    # Plotting and report libraries are only needed once data is loaded, so the landing page never imports them
+    import plotly.graph_objects as go
+    import plotly.express as px
+    from modules import visualizations, export, grid
+    # Call recordings: audio features (scored when scikit-learn is installed) linked to their dialer rows
+    audio_features = audio_scoring.load_feature_table(audio_file) if audio_file is not None else None
+    audio_scored, recordings, scorer, audio_missing = None, None, None, []
+    if audio_features is not None and not audio_features.empty:
+        audio_version = data_loader.dataset_version(audio_features)
+        audio_missing = audio_scoring.missing_columns(audio_features)
+        if audio_scoring.is_available() and not audio_missing:
+            scorer = audio_scoring.get_scorer(audio_features, refit=st.session_state.get('refit_audio_models', False))
+            audio_scored = audio_scoring.score_calls(audio_features, audio_version, scorer, scorer.model_id)
+            audio_version = f"{audio_version}-{scorer.model_id}"
+        recordings = recording_match.match_recordings(preprocessed, dataset_version, audio_scored if audio_scored is not None else audio_features, audio_version)
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["Overview", "Agent Analysis", "Time Patterns", "Anomalies", "Business Intelligence", "Repeat Dials", "Audio Insights"])
     with tab1:
-        stats = eda.overview_stats(preprocessed)
+        stats = result_cache.analysis('overview', preprocessed, results_version)
         # Hero section
         st.markdown("""
         <div class='hero-section'>
@@ -206,6 +438,13 @@ if preprocessed is not None:
             </div>
             """, unsafe_allow_html=True)
         st.markdown("<div class='section'></div>", unsafe_allow_html=True)
+        # Live cards from the dialer feed next to the loaded dump's totals; agent activity is in Live mode
+        if live is not None:
+            st.subheader("📡 Live Floor")
+            live_overview(show_agents=False)
+            if not hasattr(st, 'fragment'):
+                st.button("🔄 Refresh Live KPIs")
+            st.markdown("<div class='section'></div>", unsafe_allow_html=True)
         # Donut chart for call outcome
         st.subheader("Call Outcome Distribution")
         if not stats['outcome_counts'].empty:
@@ -243,59 +482,129 @@ if preprocessed is not None:
         </span>
         </div>
         """, unsafe_allow_html=True)
+        # Report export (built in the background worker pool)
+        st.markdown("<div class='section'></div>", unsafe_allow_html=True)
+        st.subheader("Export Report")
+        exporter = export.get_exporter()
+        export_formats = st.multiselect("Formats", list(export.FORMATS.keys()), default=list(export.FORMATS.keys()), format_func=lambda f: export.FORMATS[f])
+        export_charts = st.checkbox("Include chart images", value=True)
+        if st.button("Generate Report", disabled=not export_formats):
+            st.session_state['export_job'] = exporter.submit(preprocessed, dataset_version, export_formats, {'charts': export_charts})
+        def export_status():
+            job = exporter.status(st.session_state.get('export_job')) if st.session_state.get('export_job') else None
+            if job is None:
+                return
+            if job['state'] == 'failed':
+                st.error(f"❌ Report export failed: {job['error']}")
+            elif job['state'] != 'done':
+                st.progress(job['progress'], text=job['stage'])
+            else:
+                cols = st.columns(len(job['files']))
+                for col, (fmt, path) in zip(cols, job['files'].items()):
+                    with col, open(path, 'rb') as f:
+                        st.download_button(f"Download {export.FORMATS[fmt]}", f.read(), file_name=os.path.basename(path), mime=export.MIME_TYPES[fmt], key=f"export_{fmt}")
+        export_job = exporter.status(st.session_state['export_job']) if st.session_state.get('export_job') else None
+        if export_job and export_job['state'] in ('queued', 'running') and hasattr(st, 'fragment'):
+            @st.fragment(run_every=1)
+            def export_progress():
+                export_status()
+                if exporter.status(st.session_state['export_job'])['state'] not in ('queued', 'running'):
+                    st.rerun()
+            export_progress()
+        else:
+            export_status()
+            if export_job and export_job['state'] in ('queued', 'running'):
+                st.button("🔄 Refresh Export Status")
     with tab2:
         st.markdown("""
         <h2 style='margin-bottom:0.5em;'>Agent Performance Benchmarking</h2>
-        <div style='margin-bottom:1.5em;'>Compare agent AHT (Average Handle Time) to the team. Click an agent for call history and trend.</div>
+        <div style='margin-bottom:1.5em;'>Compare agent AHT (Average Handle Time) to the team. Pick an agent below the leaderboard for their call history.</div>
         """, unsafe_allow_html=True)
-        agent_stats = agent_analysis.agent_performance(preprocessed)
+        agent_stats = result_cache.analysis('agent_performance', preprocessed, results_version)
         leaderboard_cols = ['full_name', 'avg_talk_time_min', 'median_talk_time_min', 'total_calls', 'rank_by_avg_talk_time']
         leaderboard = agent_stats[leaderboard_cols].copy()
         leaderboard = leaderboard.sort_values('avg_talk_time_min')
         team_avg = leaderboard['avg_talk_time_min'].mean()
-        def badge(rank):
-            if rank == 1:
-                return "<span class='badge badge-good'>Top Performer</span>"
-            elif rank == leaderboard['rank_by_avg_talk_time'].max():
-                return "<span class='badge badge-alert'>Needs Coaching</span>"
-            else:
-                return "<span class='badge badge-warning'>Team</span>"
-        leaderboard['Badge'] = leaderboard['rank_by_avg_talk_time'].apply(badge)
-        def aht_sparkline(agent):
-            df_agent = preprocessed[(preprocessed['full_name'] == agent) & (preprocessed['call_outcome'] == 'Answered')]
-            if df_agent.shape[0] < 3:
-                return ""
-            df_agent = df_agent.sort_values('date')
-            fig = go.Figure(go.Scatter(y=df_agent['length_in_min'], mode='lines', line=dict(color='#ff9800', width=2)))
-            fig.update_layout(margin=dict(l=0,r=0,t=0,b=0), height=32, width=90, xaxis=dict(visible=False), yaxis=dict(visible=False), plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-            return st.plotly_chart(fig, use_container_width=False, height=32)
+        rank = leaderboard['rank_by_avg_talk_time']
+        leaderboard['Badge'] = np.select([rank == 1, rank == rank.max()], ['🏆 Top Performer', '🎯 Needs Coaching'], '👥 Team')
+        leaderboard['AHT band'] = np.select([leaderboard['avg_talk_time_min'] > team_avg + 0.5, leaderboard['avg_talk_time_min'] > team_avg], ['bad', 'warn'], 'good')
+        # Sparklines: each agent's rolling 7-day AHT over the last 30 days
+        rolling_kpis = agent_kpis.rolling_agent_kpis(preprocessed, dataset_version)
+        sparklines = agent_kpis.kpi_sparklines(rolling_kpis, 'aht_7d', days=30)
+        leaderboard['AHT Trend'] = leaderboard['full_name'].map(sparklines)
         # --- Agent search/filter ---
         agent_search = st.text_input("Search Agent Name", "", placeholder="Type agent name...")
         if agent_search:
             leaderboard = leaderboard[leaderboard['full_name'].str.contains(agent_search, case=False, na=False)]
         st.markdown("<div class='feature-card' style='padding:1.5em;'>", unsafe_allow_html=True)
         st.markdown("<b>Leaderboard (by AHT)</b>", unsafe_allow_html=True)
-        st.download_button("Download Leaderboard CSV", leaderboard.to_csv(index=False).encode('utf-8'), file_name="agent_aht_leaderboard.csv", mime="text/csv")
+        st.download_button("Download Leaderboard CSV", leaderboard.drop(columns=['AHT band', 'AHT Trend']).to_csv(index=False).encode('utf-8'), file_name="agent_aht_leaderboard.csv", mime="text/csv")
         if leaderboard.empty:
             st.info("No agents match your search.")
         else:
-            for idx, row in leaderboard.iterrows():
-                col1, col2, col3, col4, col5 = st.columns([2,2,2,2,2])
-                with col1:
-                    st.markdown(f"<b>{row['full_name']}</b> {row['Badge']}", unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"AHT: <span style='color:#ff9800;font-weight:700'>{row['avg_talk_time_min']:.2f} min</span>", unsafe_allow_html=True)
-                with col3:
-                    st.markdown(f"Median: {row['median_talk_time_min']:.2f} min", unsafe_allow_html=True)
-                with col4:
-                    st.markdown(f"Calls: {int(row['total_calls'])}", unsafe_allow_html=True)
-                with col5:
-                    aht_sparkline(row['full_name'])
-                with st.expander(f"Show {row['full_name']}'s Call History"):
-                    agent_calls = preprocessed[(preprocessed['full_name'] == row['full_name'])][['date','call_outcome','length_in_min']]
-                    st.dataframe(agent_calls.rename(columns={'date':'Date','call_outcome':'Outcome','length_in_min':'Talk Time (min)'}), use_container_width=True)
-                    st.download_button(f"Download {row['full_name']} Call History CSV", agent_calls.to_csv(index=False).encode('utf-8'), file_name=f"{row['full_name']}_call_history.csv", mime="text/csv")
+            grid.paginated_grid(
+                leaderboard, 'leaderboard', ['avg_talk_time_min', 'median_talk_time_min', 'total_calls', 'full_name'], 'avg_talk_time_min',
+                bands={'avg_talk_time_min': 'AHT band'}, hidden=['rank_by_avg_talk_time'],
+                column_config={
+                    'full_name': 'Agent',
+                    'avg_talk_time_min': st.column_config.NumberColumn('AHT (min)', format='%.2f'),
+                    'median_talk_time_min': st.column_config.NumberColumn('Median (min)', format='%.2f'),
+                    'total_calls': st.column_config.NumberColumn('Calls', format='%d'),
+                    'AHT Trend': st.column_config.LineChartColumn('AHT Trend (7-day, last 30 days)'),
+                })
+            history_agent = st.selectbox("Show Call History", [None] + leaderboard['full_name'].tolist(), format_func=lambda a: "-- Select agent --" if a is None else a)
+            if history_agent is not None:
+                agent_calls = preprocessed[(preprocessed['full_name'] == history_agent)][['date','call_outcome','length_in_min']]
+                st.dataframe(agent_calls.rename(columns={'date':'Date','call_outcome':'Outcome','length_in_min':'Talk Time (min)'}), use_container_width=True)
+                st.download_button(f"Download {history_agent} Call History CSV", agent_calls.to_csv(index=False).encode('utf-8'), file_name=f"{history_agent}_call_history.csv", mime="text/csv")
         st.markdown("</div>", unsafe_allow_html=True)
+        # Rolling 7/30-day KPIs and ranks
+        st.subheader("Rolling Agent KPIs 📈")
+        if rolling_kpis is None or rolling_kpis.empty:
+            st.info("Not enough dated calls for rolling KPIs.")
+        else:
+            col1, col2, col3 = st.columns([1, 1, 3])
+            with col1:
+                kpi_window = st.selectbox("Window", list(agent_kpis.WINDOWS), format_func=lambda w: f"{w} days")
+            with col2:
+                kpi_label = st.selectbox("Metric", list(agent_kpis.METRICS.keys()))
+            latest = rolling_kpis[rolling_kpis['date'] == rolling_kpis['date'].max()].sort_values(f'calls_{kpi_window}d', ascending=False)
+            with col3:
+                kpi_agents = st.multiselect("Agents", sorted(rolling_kpis['full_name'].unique()), default=latest['full_name'].head(5).tolist())
+            kpi_col = f"{agent_kpis.METRICS[kpi_label]}_{kpi_window}d"
+            trend = rolling_kpis[rolling_kpis['full_name'].isin(kpi_agents)]
+            fig = px.line(trend, x='date', y=kpi_col, color='full_name', title=f'Rolling {kpi_window}-Day {kpi_label}', labels={'date':'Date', kpi_col:kpi_label, 'full_name':'Agent'})
+            fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+            st.plotly_chart(fig, use_container_width=True)
+            with st.expander(f"Show Latest {kpi_window}-Day Ranks"):
+                rank_cols = ['full_name', f'calls_{kpi_window}d', f'answer_rate_{kpi_window}d', f'aht_{kpi_window}d', f'aht_rank_{kpi_window}d', f'volume_rank_{kpi_window}d']
+                st.dataframe(latest[rank_cols].sort_values(f'aht_rank_{kpi_window}d'), use_container_width=True)
+                st.download_button("Download Rolling KPIs CSV", rolling_kpis.to_csv(index=False).encode('utf-8'), file_name="agent_rolling_kpis.csv", mime="text/csv")
+        # Occupancy & Idle Time
+        st.subheader("Agent Occupancy & Idle Time")
+        session_gap = st.slider("Break Threshold (min)", min_value=5, max_value=240, value=30, step=5, help="An idle gap longer than this ends the agent's work session.")
+        occupancy_stats = occupancy.agent_occupancy(preprocessed, dataset_version, session_gap)
+        if occupancy_stats is not None and not occupancy_stats.empty:
+            fig = px.bar(occupancy_stats.sort_values('occupancy'), x='occupancy', y='full_name', orientation='h', title='Occupancy (% of Logged-In Time on Calls)', labels={'occupancy':'Occupancy (%)','full_name':'Agent'}, color='occupancy', color_continuous_scale='Oranges', height=max(320, 22 * len(occupancy_stats)))
+            fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)', coloraxis_showscale=False)
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"Team occupancy {occupancy_stats['talk_hours'].sum() / max(occupancy_stats['logged_in_hours'].sum(), 1e-9) * 100:.1f}% over {occupancy_stats['logged_in_hours'].sum():.1f} logged-in hours. Logged-in time runs from the first call to the last call end of each session.")
+            with st.expander("Show Occupancy Table"):
+                st.dataframe(occupancy_stats, use_container_width=True)
+                st.download_button("Download Occupancy CSV", occupancy_stats.to_csv(index=False).encode('utf-8'), file_name="agent_occupancy.csv", mime="text/csv")
+        else:
+            st.info("Not enough call timeline data for occupancy.")
+        # Audio profile of each agent's matched call recordings
+        if recordings is not None and recordings['full_name'].notna().any():
+            st.subheader("Agent Audio Profile 🎧")
+            agent_audio = recording_match.agent_audio_summary(recordings)
+            fig = px.scatter(agent_audio, x='avg_energy_rms', y='avg_silence_ratio', size='recordings', color='avg_composite_priority' if 'avg_composite_priority' in agent_audio.columns else None, hover_name='full_name', title='Energy vs Silence of Recorded Calls per Agent', labels={'avg_energy_rms':'Avg Energy (RMS)','avg_silence_ratio':'Avg Silence Ratio','avg_composite_priority':'Avg Priority'}, color_continuous_scale='Oranges', color_discrete_sequence=['#ff9800'])
+            fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{int(recordings['full_name'].notna().sum()):,} of {len(recordings):,} recordings matched to a dialer call within {recording_match.MATCH_TOLERANCE_MINUTES} minutes by phone number.")
+            with st.expander("Show Agent Audio Table"):
+                st.dataframe(agent_audio, use_container_width=True)
+                st.download_button("Download Agent Audio CSV", agent_audio.to_csv(index=False).encode('utf-8'), file_name="agent_audio_profile.csv", mime="text/csv")
         # Agent Activity Heatmap
         st.subheader("Agent Activity Heatmap (Calls per Hour)")
         if 'hour' in preprocessed.columns and preprocessed['hour'].notnull().any():
@@ -330,7 +639,7 @@ if preprocessed is not None:
     with tab3:
         # --- Agent search/filter for Time Patterns ---
         agent_search_tp = st.text_input("Filter by Agent Name (optional)", "", placeholder="Type agent name...")
-        filtered_preprocessed = preprocessed.copy()
+        filtered_preprocessed = preprocessed
         if agent_search_tp:
             filtered_preprocessed = filtered_preprocessed[filtered_preprocessed['full_name'].str.contains(agent_search_tp, case=False, na=False)]
         if filtered_preprocessed.empty:
@@ -347,7 +656,10 @@ if preprocessed is not None:
             </div>
             """, unsafe_allow_html=True)
             # Compute stats for cards
-            hourly_stats, daily_stats = time_analysis.time_patterns(filtered_preprocessed)
+            if filtered_preprocessed is preprocessed:
+                hourly_stats, daily_stats = result_cache.analysis('time_patterns', preprocessed, results_version)
+            else:
+                hourly_stats, daily_stats = time_analysis.time_patterns(filtered_preprocessed)
             busiest_hour = hourly_stats['total_calls'].idxmax() if not hourly_stats.empty and 'total_calls' in hourly_stats else '--'
             busiest_day = daily_stats['total_calls'].idxmax() if not daily_stats.empty and 'total_calls' in daily_stats else '--'
             peak_volume = int(hourly_stats['total_calls'].max()) if not hourly_stats.empty and 'total_calls' in hourly_stats else '--'
@@ -476,6 +788,35 @@ if preprocessed is not None:
                 summary_lines.append(f"Peak call volume in an hour: <b>{peak_volume}</b>.")
             st.markdown("<b>Executive Summary:</b> " + " ".join(summary_lines), unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
+        # --- Concurrent Calls (whole center, not agent-filtered) ---
+        st.markdown("<div class='feature-card' style='margin-bottom:1.5em;'>", unsafe_allow_html=True)
+        st.subheader("Concurrent Calls (Trunk & Seat Load)")
+        col1, col2 = st.columns(2)
+        with col1:
+            concurrency_resolution = st.radio("Resolution", ["1min", "1s"], horizontal=True, format_func=lambda r: "Minute" if r == "1min" else "Second", help="Per-second detail is shown one day at a time.")
+        with col2:
+            concurrency_group = st.selectbox("Peak Concurrency By", ["Day", "Campaign", "Agent Group"])
+        curve = time_analysis.concurrency_curve(preprocessed, dataset_version)
+        concurrency_day = None
+        if concurrency_resolution == "1s" and not curve.empty:
+            # Opens on the day of the overall peak
+            concurrency_day = st.date_input("Day", value=curve['concurrent_calls'].idxmax().date(), min_value=curve.index.min().date(), max_value=curve.index.max().date())
+            curve = time_analysis.concurrency_curve(preprocessed, dataset_version, concurrency_resolution, concurrency_day)
+        if concurrency_day is not None and (curve.empty or not curve['concurrent_calls'].any()):
+            # The dataset has calls with talk time, just none active on the selected day
+            st.info(f"No calls with talk time on {concurrency_day}; pick another day.")
+        elif curve.empty:
+            st.info("No calls with talk time available for the concurrency curve.")
+        else:
+            fig = px.line(curve, x=curve.index, y='concurrent_calls', title='Concurrent Active Calls', labels={'time':'Time','concurrent_calls':'Active Calls'}, color_discrete_sequence=['#ff9800'])
+            fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+            st.plotly_chart(fig, use_container_width=True)
+            group_col = {'Day': None, 'Campaign': 'campaign_id', 'Agent Group': 'user_group'}[concurrency_group]
+            peaks = time_analysis.peak_concurrency(preprocessed, dataset_version, group_col)
+            st.caption(f"Peak concurrency was {int(curve['concurrent_calls'].max())} active calls at {curve['concurrent_calls'].idxmax()}.")
+            st.dataframe(peaks, use_container_width=True)
+            st.download_button("Download Peak Concurrency CSV", peaks.to_csv(index=False).encode('utf-8'), file_name="peak_concurrency.csv", mime="text/csv")
+        st.markdown("</div>", unsafe_allow_html=True)
     with tab4:
         # Hero/intro section
         st.markdown("""
@@ -488,7 +829,7 @@ if preprocessed is not None:
         </div>
         """, unsafe_allow_html=True)
         with st.spinner('Detecting anomalies and rendering visuals...'):
-            anomalies = anomaly.detect_anomalies(preprocessed, n=10)
+            anomalies = result_cache.analysis('anomalies', preprocessed, results_version)
             # Glassy cards for key outliers
             if anomalies is not None and not anomalies.empty:
                 longest = anomalies.iloc[0]
@@ -536,11 +877,12 @@ if preprocessed is not None:
                 st.subheader("Anomalous Calls Timeline (Lollipop Chart)")
                 # Ensure call_dateTime is present
                 if 'call_dateTime' in preprocessed.columns:
-                    all_calls = preprocessed[['call_dateTime', 'length_in_min']].copy()
-                    all_calls['Anomaly'] = False
+                    all_calls = preprocessed[['call_dateTime', 'length_in_min']]
                     if 'call_dateTime' in anomalies.columns:
                         anomaly_keys = set(anomalies['call_dateTime'])
-                        all_calls['Anomaly'] = all_calls['call_dateTime'].isin(anomaly_keys)
+                        all_calls = all_calls.assign(Anomaly=all_calls['call_dateTime'].isin(anomaly_keys))
+                    else:
+                        all_calls = all_calls.assign(Anomaly=False)
                     # Sort by time
                     all_calls = all_calls.sort_values('call_dateTime')
                     # Build lollipop chart
@@ -621,6 +963,18 @@ if preprocessed is not None:
                         if 'length_in_min' in agent_calls.columns: rename_map['length_in_min'] = 'Talk Time (min)'
                         st.dataframe(agent_calls.rename(columns=rename_map), use_container_width=True)
                 st.markdown("</div>", unsafe_allow_html=True)
+        # Recordings flagged by the audio models, with the dialer call they belong to
+        if recordings is not None and 'is_anomaly' in recordings.columns:
+            st.markdown("<div class='feature-card' style='margin-bottom:1.5em;'>", unsafe_allow_html=True)
+            st.subheader("Anomalous Call Recordings 🎧")
+            flagged = recordings[recordings['is_anomaly'] == 1].sort_values('composite_priority', ascending=False)
+            if flagged.empty:
+                st.info("No call recordings were flagged as anomalous.")
+            else:
+                flagged = flagged[[c for c in ['filename', 'call_dateTime', 'full_name', 'campaign_id', 'call_outcome', 'length_in_sec', 'general_duration', 'priority_level', 'composite_priority', 'anomaly_score'] if c in flagged.columns]]
+                st.dataframe(flagged, use_container_width=True)
+                st.download_button("Download Anomalous Recordings CSV", flagged.to_csv(index=False).encode('utf-8'), file_name="anomalous_recordings.csv", mime="text/csv")
+            st.markdown("</div>", unsafe_allow_html=True)
     with tab5:
         st.markdown("""
         <div class='hero-section' style='margin-bottom:2em;'>
@@ -680,9 +1034,10 @@ if preprocessed is not None:
         """, unsafe_allow_html=True)
         st.write("See which agents, days, and times are driving high average handle time (AHT > 3 min).")
         if 'full_name' in preprocessed.columns and 'date' in preprocessed.columns and 'length_in_min' in preprocessed.columns:
-            aht_df = preprocessed[preprocessed['call_outcome']=='Answered'].copy()
-            aht_df['Day'] = pd.to_datetime(aht_df['date']).dt.day_name()
-            aht_df['Agent'] = aht_df['full_name'].apply(lambda x: x.split()[0] if isinstance(x,str) else x)
+            aht_df = preprocessed.loc[preprocessed['call_outcome']=='Answered', ['full_name', 'date', 'length_in_min']]
+            aht_df = aht_df.assign(
+                Day=pd.to_datetime(aht_df['date']).dt.day_name(),
+                Agent=aht_df['full_name'].apply(lambda x: x.split()[0] if isinstance(x,str) else x))
             pivot = aht_df.groupby(['Agent','Day'])['length_in_min'].mean().reset_index()
             heatmap = pivot.pivot(index='Day', columns='Agent', values='length_in_min')
             # Reorder days for clarity
@@ -711,52 +1066,11 @@ if preprocessed is not None:
         # 3. Executive Alerts & Recommendations
         st.markdown("<div class='feature-card' style='margin-bottom:2em;'>", unsafe_allow_html=True)
         st.subheader("Executive Alerts & Recommendations 🚨")
-        # Compute team averages
-        recs = []
-        if 'full_name' in preprocessed.columns and 'date' in preprocessed.columns and 'length_in_min' in preprocessed.columns:
-            df = preprocessed.copy()
-            df['Agent'] = df['full_name'].apply(lambda x: x.split()[0] if isinstance(x,str) else x)
-            df['Day'] = pd.to_datetime(df['date']).dt.day_name()
-            df['Hour'] = pd.to_datetime(df['date']).dt.hour
-            # Team averages
-            team_aht = df[df['call_outcome']=='Answered']['length_in_min'].mean()
-            team_drop = (df['call_outcome']=='Dropped').mean()*100
-            # Agent AHT alerts
-            agent_aht = df[df['call_outcome']=='Answered'].groupby('Agent')['length_in_min'].mean()
-            for agent, aht in agent_aht.items():
-                if aht > team_aht:
-                    # Find worst hour/day for this agent
-                    agent_df = df[(df['Agent']==agent) & (df['call_outcome']=='Answered')]
-                    if not agent_df.empty:
-                        worst = agent_df.groupby(['Day','Hour'])['length_in_min'].mean().sort_values(ascending=False).head(1)
-                        worst_day, worst_hour = worst.index[0]
-                        worst_val = worst.values[0]
-                        recs.append((
-                            f"⏱️ High AHT: <b>{agent}</b>",
-                            f"AHT: <b>{aht:.2f} min</b> (team avg: {team_aht:.2f} min). Worst: <b>{worst_day} at {int(worst_hour):02d}:00</b> ({worst_val:.2f} min)",
-                            f"Coach {agent} for efficiency, especially on {worst_day} at {int(worst_hour):02d}:00."
-                        ))
-            # Hourly team AHT alerts
-            hour_aht = df[df['call_outcome']=='Answered'].groupby(['Day','Hour'])['length_in_min'].mean()
-            for (day, hour), val in hour_aht.items():
-                if val > team_aht + 0.5:
-                    recs.append((
-                        f"⏱️ Abnormal Team AHT: <b>{day} {int(hour):02d}:00</b>",
-                        f"Team AHT: <b>{val:.2f} min</b> (avg: {team_aht:.2f} min)",
-                        f"Review call routing, staffing, or process for this slot."
-                    ))
-            # Agent drop rate alerts
-            agent_drop = df.groupby('Agent').apply(lambda x: (x['call_outcome']=='Dropped').mean()*100)
-            for agent, dr in agent_drop.items():
-                if dr > team_drop + 5:
-                    recs.append((
-                        f"🚨 High Drop Rate: <b>{agent}</b>",
-                        f"Drop Rate: <b>{dr:.1f}%</b> (team avg: {team_drop:.1f}%)",
-                        f"Review call handling and support for {agent}."
-                    ))
+        recs = business_intel.executive_alerts(preprocessed, dataset_version)
         # Visual summary
         num_critical = len(recs)
-        st.markdown(f"<div style='font-size:1.1em;font-weight:600;margin-bottom:1em;'>Detected <span style='color:#e74c3c;font-weight:bold;'>{num_critical} critical issue{'s' if num_critical!=1 else ''}</span> this week.</div>", unsafe_allow_html=True)
+        st.markdown(f"<div style='font-size:1.1em;font-weight:600;margin-bottom:1em;'>Detected <span style='color:#e74c3c;font-weight:bold;'>{num_critical} KPI shift{'s' if num_critical!=1 else ''}</span> still in progress.</div>", unsafe_allow_html=True)
+        st.caption("Daily AHT and drop rate per agent and per hour slot are checked for sustained upward shifts (CUSUM) against each series' own baseline; each alert says when the shift began.")
         for title, desc, action in recs:
             st.markdown(f"""
             <div style='background:#fffbe6;border-left:6px solid #ff9800;border-radius:8px;padding:1em 1.2em;margin-bottom:1em;box-shadow:0 2px 8px #0001;'>
@@ -767,54 +1081,219 @@ if preprocessed is not None:
             """, unsafe_allow_html=True)
         if not recs:
             st.markdown("<div style='background:#e8f5e9;border-left:6px solid #4caf50;border-radius:8px;padding:1em 1.2em;margin-bottom:1em;box-shadow:0 2px 8px #0001;'><b>✅ All Good!</b> No critical issues detected. Keep up the great work!</div>", unsafe_allow_html=True)
+        else:
+            shifts = drift.drift_shifts(preprocessed, dataset_version)
+            with st.expander("Shift details"):
+                st.dataframe(shifts.round(2), use_container_width=True)
+                st.download_button("Download Shifts CSV", shifts.to_csv(index=False).encode('utf-8'), file_name="kpi_shifts.csv", mime="text/csv")
         st.markdown("</div>", unsafe_allow_html=True)
         # 4. Actionable Insights Matrix (improved)
         st.markdown("<div class='feature-card' style='margin-bottom:2em;'>", unsafe_allow_html=True)
         st.subheader("Actionable Insights Matrix 🧭")
-        st.write("All agents across key metrics. Focus on red cells for biggest wins. Hover for action tips.")
-        if 'full_name' in preprocessed.columns and 'call_outcome' in preprocessed.columns and 'length_in_min' in preprocessed.columns:
-            matrix_df = preprocessed.copy()
-            matrix_df['Agent'] = matrix_df['full_name'].apply(lambda x: x.split()[0] if isinstance(x,str) else x)
-            # Metrics
-            aht = matrix_df[matrix_df['call_outcome']=='Answered'].groupby('Agent')['length_in_min'].mean()
-            drop_rate = matrix_df.groupby('Agent').apply(lambda x: (x['call_outcome']=='Dropped').mean()*100)
-            call_vol = matrix_df.groupby('Agent').size()
-            # Team averages
-            team_aht = aht.mean()
-            team_drop = drop_rate.mean()
-            team_vol = call_vol.mean()
-            # Build matrix
-            import numpy as np
-            import pandas as pd
-            matrix = pd.DataFrame({
-                'AHT (min)': aht,
-                'Drop Rate (%)': drop_rate,
-                'Call Volume': call_vol
-            })
-            matrix.loc['Team Avg'] = [team_aht, team_drop, team_vol]
-            # Color coding by deviation from average
-            def color_cell(val, col, idx):
-                if idx == 'Team Avg':
-                    return 'background:#e3f2fd;color:#1976d2;font-weight:700;'
-                if col == 'AHT (min)':
-                    if val > team_aht + 0.5: return 'background:#ffebee;color:#c62828;font-weight:700;'  # red
-                    elif val > team_aht: return 'background:#fff8e1;color:#ff9800;font-weight:600;'  # orange
-                    else: return 'background:#e8f5e9;color:#388e3c;font-weight:600;'  # green
-                if col == 'Drop Rate (%)':
-                    if val > team_drop + 5: return 'background:#ffebee;color:#c62828;font-weight:700;'
-                    elif val > team_drop: return 'background:#fff8e1;color:#ff9800;font-weight:600;'
-                    else: return 'background:#e8f5e9;color:#388e3c;font-weight:600;'
-                if col == 'Call Volume':
-                    if val > team_vol * 1.2: return 'background:#e3f2fd;color:#1976d2;font-weight:600;'
-                    else: return ''
-                return ''
-            styled = matrix.style.apply(lambda s: [color_cell(v, s.name, idx) for idx, v in zip(matrix.index, s)], axis=0)
-            st.dataframe(styled, use_container_width=True, height=380)
+        st.write("All agents across key metrics. Focus on red cells for biggest wins.")
+        insights = business_intel.insights_matrix(preprocessed, dataset_version)
+        if insights is not None:
+            matrix, team = insights
+            metric_cols = ['AHT (min)', 'Drop Rate (%)', 'Call Volume']
+            bands = {col: f"{col} band" for col in metric_cols}
+            team_row = pd.DataFrame([{'Agent': 'Team Avg', **team.to_dict(), **{band: 'team' for band in bands.values()}}])
+            grid.paginated_grid(matrix, 'insights_matrix', ['Agent'] + metric_cols, 'Drop Rate (%)', ascending=False, bands=bands, pinned=team_row)
+            st.download_button("Download Insights Matrix CSV", matrix.to_csv(index=False).encode('utf-8'), file_name="actionable_insights_matrix.csv", mime="text/csv")
             # Action tips summary
-            st.caption("Red/orange = above average. Green = best-in-class. Team Avg row for comparison. Focus on red cells for biggest wins. Hover for action tips.")
+            st.caption("Red/orange = above average. Green = best-in-class. Team Avg row for comparison. Focus on red cells for biggest wins.")
         else:
             st.info("Not enough data for actionable insights matrix.")
         st.markdown("</div>", unsafe_allow_html=True)
+        # 5. Campaign & List Performance
+        st.markdown("<div class='feature-card' style='margin-bottom:2em;'>", unsafe_allow_html=True)
+        st.subheader("Campaign & List Performance 📣")
+        st.write("Contact rate, answer rate, dials per lead and list exhaustion for every campaign and dialing list.")
+        campaign_stats = business_intel.campaign_analytics(preprocessed, dataset_version)
+        if campaign_stats is None or 'campaign_id' not in preprocessed.columns:
+            st.info("No campaign data available for campaign analytics.")
+        else:
+            campaigns_df = campaign_stats['campaigns']
+            fig = px.bar(campaigns_df, x='campaign_id', y=['contact_rate', 'answer_rate', 'exhaustion_rate'], barmode='group', title='Campaign Rates (%)', labels={'campaign_id': 'Campaign', 'value': '%', 'variable': ''}, color_discrete_sequence=['#4f8cff', '#7ed957', '#ff9800'])
+            fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+            st.plotly_chart(fig, use_container_width=True)
+            talk_dist = campaign_stats['talk_time_distribution'].melt(id_vars='campaign_id', var_name='Talk Time', value_name='Share (%)')
+            fig = px.bar(talk_dist, x='campaign_id', y='Share (%)', color='Talk Time', title='Talk Time Distribution by Campaign', labels={'campaign_id': 'Campaign'}, color_discrete_sequence=px.colors.sequential.Oranges[2:])
+            fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+            st.plotly_chart(fig, use_container_width=True)
+            st.write("**Campaigns**")
+            st.dataframe(campaigns_df, use_container_width=True)
+            st.download_button("Download Campaign Stats CSV", campaigns_df.to_csv(index=False).encode('utf-8'), file_name="campaign_stats.csv", mime="text/csv")
+            with st.expander("Show List Breakdown"):
+                st.dataframe(campaign_stats['lists'], use_container_width=True)
+                st.download_button("Download List Stats CSV", campaign_stats['lists'].to_csv(index=False).encode('utf-8'), file_name="list_stats.csv", mime="text/csv")
+            st.caption("Contact = answered or dropped (a live party was reached). A lead is exhausted once answered or dialed 3+ times.")
+        st.markdown("</div>", unsafe_allow_html=True)
+    with tab6:
+        st.markdown("""
+        <div class='hero-section' style='margin-bottom:2em;'>
+            <div class='hero-icon'>🔁</div>
+            <div class='hero-content'>
+                <h1>Repeat Dials & Multi-Call Sessions</h1>
+                <p>Follow every phone number across attempts: how often it was dialed, how long customers waited between attempts, which drops were answered later and where calls were handed to another agent.</p>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        if 'phone_number_dialed' not in preprocessed.columns:
+            st.info("No phone_number_dialed column available for repeat-dial analysis.")
+        else:
+            gap_minutes = st.slider("Session Gap (min)", min_value=5, max_value=24*60, value=60, step=5, help="Attempts to the same number further apart than this start a new session.")
+            numbers = sessionization.number_summary(preprocessed, gap_minutes)
+            sessions = sessionization.session_summary(preprocessed, gap_minutes)
+            recovered = sessionization.drop_then_answer(preprocessed, gap_minutes)
+            if numbers is None or numbers.empty:
+                st.info("Not enough data for repeat-dial analysis.")
+            else:
+                multi_numbers = int((numbers['total_attempts'] > 1).sum())
+                median_response = recovered['response_time_minutes'].median() if not recovered.empty else None
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.markdown(f"""
+                    <div class='metric-card'>
+                        <div class='metric-icon'>📱</div>
+                        <div class='metric-number'>{len(numbers):,}</div>
+                        <div class='metric-label'>Numbers Dialed</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                with col2:
+                    st.markdown(f"""
+                    <div class='metric-card'>
+                        <div class='metric-icon'>🔁</div>
+                        <div class='metric-number'>{multi_numbers:,}</div>
+                        <div class='metric-label'>Numbers Dialed More Than Once</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                with col3:
+                    st.markdown(f"""
+                    <div class='metric-card'>
+                        <div class='metric-icon'>✅</div>
+                        <div class='metric-number'>{len(recovered):,}</div>
+                        <div class='metric-label'>Drops Answered Later</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                with col4:
+                    st.markdown(f"""
+                    <div class='metric-card'>
+                        <div class='metric-icon'>⏳</div>
+                        <div class='metric-number'>{f"{median_response:.1f}" if median_response is not None else '--'}</div>
+                        <div class='metric-label'>Median Drop → Answer (min)</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+                st.markdown("<div class='section'></div>", unsafe_allow_html=True)
+                st.subheader("Attempts per Number")
+                attempts_dist = numbers['total_attempts'].value_counts().sort_index()
+                fig = px.bar(x=attempts_dist.index, y=attempts_dist.values, labels={'x':'Attempts','y':'Numbers'}, title='Numbers by Attempt Count', color_discrete_sequence=['#ff9800'])
+                fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"{int(sessions['handoffs'].sum()):,} agent hand-offs across {len(sessions):,} sessions.")
+                with st.expander("Show Multi-Call Numbers"):
+                    st.dataframe(numbers[numbers['total_attempts'] > 1], use_container_width=True)
+                    st.download_button("Download Multi-Call Report CSV", numbers.to_csv(index=False).encode('utf-8'), file_name="multi_call_report.csv", mime="text/csv")
+                with st.expander("Show Dropped Calls Answered Later"):
+                    st.dataframe(recovered, use_container_width=True)
+                    st.download_button("Download Drop → Answer CSV", recovered.to_csv(index=False).encode('utf-8'), file_name="dropped_calls_answered_later.csv", mime="text/csv")
+            # Callback latency per campaign / agent / hour
+            st.markdown("<div class='feature-card' style='margin-bottom:1.5em;'>", unsafe_allow_html=True)
+            st.subheader("Callback Latency ⏱️")
+            st.write("How long it takes to reach a number again after a dropped, busy or unanswered attempt.")
+            events = callback_latency.callback_events(preprocessed, dataset_version)
+            if events is None or events.empty:
+                st.info("No dropped or unanswered attempts to measure callback latency.")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    latency_group = st.selectbox("Group Latency By", list(callback_latency.GROUP_COLUMNS.keys()))
+                with col2:
+                    latency_outcomes = st.multiselect("Failed Outcomes", callback_latency.FAILED_OUTCOMES, default=callback_latency.FAILED_OUTCOMES)
+                events = events[events['call_outcome'].isin(latency_outcomes)]
+                if events.empty:
+                    st.info("No attempts match the selected outcomes.")
+                else:
+                    latency = callback_latency.latency_summary(events, by=callback_latency.GROUP_COLUMNS[latency_group])
+                    group_col = callback_latency.GROUP_COLUMNS[latency_group]
+                    fig = px.bar(latency, x=group_col, y=['median_minutes_to_next_attempt', 'median_minutes_to_answer'], barmode='group', title=f'Median Callback Latency by {latency_group}', labels={group_col: latency_group, 'value': 'Minutes', 'variable': ''}, color_discrete_sequence=['#ff9800', '#4f8cff'])
+                    fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(f"{events['next_answer_time'].notna().mean()*100:.1f}% of failed attempts were answered later; median wait {events['minutes_to_answer'].median():.1f} min.")
+                    st.dataframe(latency, use_container_width=True)
+                    st.download_button("Download Callback Latency CSV", latency.to_csv(index=False).encode('utf-8'), file_name=f"callback_latency_by_{latency_group.lower()}.csv", mime="text/csv")
+            st.markdown("</div>", unsafe_allow_html=True)
+    with tab7:
+        st.markdown("""
+        <div class='hero-section' style='margin-bottom:2em;'>
+            <div class='hero-icon'>🎧</div>
+            <div class='hero-content'>
+                <h1>Audio Insights</h1>
+                <p>Cluster call recordings by their audio profile, flag unusual calls and rank the ones that need review first.</p>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+        if audio_file is None:
+            st.info("Upload an audio feature table in the sidebar to score call recordings.")
+        elif audio_features is None or audio_features.empty:
+            st.info("The audio feature table is empty or could not be read.")
+        elif audio_missing:
+            st.warning(f"⚠️ The audio feature table cannot be scored: it is missing {', '.join(f'`{col}`' for col in audio_missing)}. Export it with `python -m modules.audio_features <folder>` or the notebook's enhanced_audio_features.csv.")
+        elif audio_scored is None:
+            st.info("Audio scoring requires scikit-learn. Install it to enable this tab.")
+        else:
+            st.button("🔄 Refit Audio Models", key='refit_audio_models', help="Models are fitted once and reused for new recordings; refit after a large batch of new calls.")
+            review = audio_scoring.priority_calls(audio_scored)
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div class='metric-icon'>🎙️</div>
+                    <div class='metric-number'>{len(audio_scored):,}</div>
+                    <div class='metric-label'>Recordings</div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col2:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div class='metric-icon'>🔥</div>
+                    <div class='metric-number'>{int((audio_scored['priority_level'] == 'HIGH').sum()):,}</div>
+                    <div class='metric-label'>High Priority</div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col3:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div class='metric-icon'>⚠️</div>
+                    <div class='metric-number'>{int(audio_scored['is_anomaly'].sum()):,}</div>
+                    <div class='metric-label'>Anomalous Calls</div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col4:
+                st.markdown(f"""
+                <div class='metric-card'>
+                    <div class='metric-icon'>📋</div>
+                    <div class='metric-number'>{len(review):,}</div>
+                    <div class='metric-label'>Calls to Review</div>
+                </div>
+                """, unsafe_allow_html=True)
+            st.markdown("<div class='section'></div>", unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                priority_dist = audio_scored['priority_level'].value_counts().reindex(list(audio_scoring.PRIORITY_WEIGHTS), fill_value=0)
+                fig = px.bar(x=priority_dist.index, y=priority_dist.values, labels={'x':'Priority','y':'Calls'}, title='Call Priority Distribution', color_discrete_sequence=['#ff9800'])
+                fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+                st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                fig = px.scatter(audio_scored, x='pca_x', y='pca_y', color=audio_scored['kmeans_cluster'].astype(str), symbol=audio_scored['is_anomaly'].map({0: 'Normal', 1: 'Anomaly'}), hover_data=['filename', 'priority_level'], title='Recording Clusters (PCA Projection)', labels={'color': 'Cluster', 'symbol': ''})
+                fig.update_layout(plot_bgcolor='rgba(255,255,255,0.25)', paper_bgcolor='rgba(255,255,255,0.25)')
+                st.plotly_chart(fig, use_container_width=True)
+            st.subheader("Priority Calls for Review")
+            st.dataframe(review, use_container_width=True)
+            st.download_button("Download Priority Calls CSV", review.to_csv(index=False).encode('utf-8'), file_name="priority_calls_for_review.csv", mime="text/csv")
+            with st.expander("Show All Scored Recordings"):
+                st.dataframe(audio_scored, use_container_width=True)
+                st.download_button("Download Scored Recordings CSV", audio_scored.to_csv(index=False).encode('utf-8'), file_name="audio_analysis_results.csv", mime="text/csv")
+            st.caption(f"Models fitted on {scorer.model_id.split('-')[1]} recordings; new recordings are scored with the saved models.")
 else:
     # Mesmerizing dark-themed landing page
     st.markdown("""
@@ -1,4 +1,5 @@
 import pandas as pd
+from modules import sanitizer
 
 # Path to the June dump Excel file
 excel_path = "callcenter_dashboard/Dialer dump- June'25 (5).xlsx"
@@ -6,8 +7,9 @@ excel_path = "callcenter_dashboard/Dialer dump- June'25 (5).xlsx"
 # Read Sheet1
 df = pd.read_excel(excel_path, sheet_name="Sheet1")
 
-# Remove empty or summary rows (keep only rows with valid dates in the first column)
-df_clean = df[df[df.columns[0]].astype(str).str.match(r"^\d{4}-\d{2}-\d{2}")]
+# Remove empty, summary and duplicate rows and quarantine invalid ones, same as the dashboard
+df_clean, quarantined = sanitizer.sanitize(df)
+print(sanitizer.quality_report(df_clean).to_string(index=False))
 
 # If there are fewer than 100 rows, use all; else, sample 100
 if len(df_clean) > 100:
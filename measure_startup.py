@@ -0,0 +1,89 @@
+"""Measure the dashboard's cold start: the Streamlit import and the first landing-page render.
+
+Each run starts a fresh interpreter and renders `app.py` headlessly with Streamlit's AppTest,
+so module imports are cold (apart from the OS file cache). Also checks that no heavy optional
+library is imported before data is loaded.
+
+    python measure_startup.py --runs 5 --target 3.0 --imports 15
+
+Exits with status 1 when the median landing time exceeds `--target` seconds or a heavy
+library was imported by the landing page.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+# Libraries only the loaded-data views (or optional features) need. Streamlit itself imports
+# plotly.graph_objects for its chart theme, so plotly.express stands in for the app's plotting
+HEAVY_MODULES = ['plotly.express', 'sklearn', 'scipy', 'duckdb', 'librosa', 'matplotlib', 'fpdf', 'pptx', 'openpyxl', 'polars']
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+rendered = time.perf_counter()
+print(json.dumps({
+    'streamlit_import': imported - start,
+    'landing_render': rendered - imported,
+    'total': rendered - start,
+    'exceptions': [str(e.value) for e in at.exception],
+    'heavy': [m for m in sys.argv[2].split(',') if m in sys.modules],
+}))
+'''
+
+def run_once(app_path: str, importtime: bool = False) -> dict:
+    """Render the landing page in a fresh interpreter and return its timings."""
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD, app_path, ','.join(HEAVY_MODULES)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(app_path))
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"landing page run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(lines[-1])
+    result['importtime'] = proc.stderr if importtime else ''
+    return result
+
+def slowest_imports(importtime: str, n: int) -> list:
+    """Return the `n` top-level imports with the largest cumulative time from `-X importtime` output."""
+    rows = []
+    for line in importtime.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):  # top-level imports only
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default=APP_PATH, help='Streamlit script to measure')
+    parser.add_argument('--runs', type=int, default=3, help='fresh-interpreter runs (median is reported)')
+    parser.add_argument('--target', type=float, default=3.0, help='landing page budget in seconds')
+    parser.add_argument('--imports', type=int, default=0, help='also list the N slowest top-level imports')
+    args = parser.parse_args()
+
+    runs = [run_once(args.app, importtime=args.imports > 0 and i == 0) for i in range(args.runs)]
+    for i, run in enumerate(runs, 1):
+        print(f"run {i}: streamlit import {run['streamlit_import']:.2f}s, landing render {run['landing_render']:.2f}s, total {run['total']:.2f}s")
+    median = statistics.median(run['total'] for run in runs)
+    heavy = sorted(set().union(*(run['heavy'] for run in runs)))
+    exceptions = runs[0]['exceptions']
+    print(f"median cold start: {median:.2f}s (target {args.target:.2f}s)")
+    if heavy:
+        print(f"heavy libraries imported by the landing page: {', '.join(heavy)}")
+    if exceptions:
+        print(f"landing page raised: {exceptions}")
+    if args.imports:
+        print("slowest top-level imports (cumulative):")
+        for seconds, name in slowest_imports(runs[0]['importtime'], args.imports):
+            print(f"  {seconds:6.3f}s  {name}")
+    return 0 if median <= args.target and not heavy and not exceptions else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
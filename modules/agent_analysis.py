@@ -1,24 +1,27 @@
 import pandas as pd
 from typing import Optional
 import streamlit as st
+from modules import compute_backend
 
 @st.cache_data
-def agent_performance(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+def agent_performance(df: pd.DataFrame, backend: Optional[str] = None) -> Optional[pd.DataFrame]:
     """Return a DataFrame with detailed agent performance metrics and rankings."""
+    backend = compute_backend.resolve(df, backend)
     # Agent call counts and outcome breakdown
-    agent_outcomes = df.pivot_table(index='full_name', columns='call_outcome', aggfunc='size', fill_value=0)
+    agent_outcomes = compute_backend.aggregate(df, ['full_name', 'call_outcome'], {'calls': ('call_outcome', 'size')}, backend=backend)
+    agent_outcomes = agent_outcomes['calls'].unstack(fill_value=0)
     agent_outcomes['total_calls'] = agent_outcomes.sum(axis=1)
     if 'Answered' not in agent_outcomes.columns: agent_outcomes['Answered'] = 0
     if 'Dropped' not in agent_outcomes.columns: agent_outcomes['Dropped'] = 0
 
     # Agent talk time statistics for answered calls
-    answered_df = df[df['call_outcome'] == 'Answered']
-    agent_talk_stats = answered_df.groupby('full_name').agg(
-        avg_talk_time_min=('length_in_min', 'mean'),
-        median_talk_time_min=('length_in_min', 'median'),
-        total_talk_time_hours=('length_in_min', lambda x: x.sum() / 60),
-        std_talk_time_min=('length_in_min', 'std')
-    )
+    agent_talk_stats = compute_backend.aggregate(df, ['full_name'], {
+        'avg_talk_time_min': ('length_in_min', 'mean'),
+        'median_talk_time_min': ('length_in_min', 'median'),
+        'total_talk_time_hours': ('length_in_min', 'sum'),
+        'std_talk_time_min': ('length_in_min', 'std'),
+    }, where=('call_outcome', 'Answered'), backend=backend)
+    agent_talk_stats['total_talk_time_hours'] /= 60
 
     # Combine all stats
     agent_stats = agent_outcomes.join(agent_talk_stats).fillna(0)
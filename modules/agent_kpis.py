@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+import streamlit as st
+
+WINDOWS = (7, 30)
+METRICS = {'AHT (min)': 'aht', 'Answer Rate (%)': 'answer_rate', 'Volume (calls)': 'calls'}
+
+def daily_matrix(df: pd.DataFrame, group_col: str = 'full_name') -> Optional[Tuple[pd.Index, pd.DatetimeIndex, Dict[str, np.ndarray]]]:
+    """Per-group daily calls, answered, dropped calls and answered talk minutes as (groups x days) arrays.
+
+    Days run over the full calendar range, so days without calls are zero columns and a window
+    of `w` columns is always `w` calendar days.
+    """
+    calls = df[[group_col, 'call_dateTime', 'call_outcome', 'length_in_min']].dropna(subset=['call_dateTime'])
+    if calls.empty:
+        return None
+    groups = calls[group_col]
+    group_codes, labels = pd.factorize(groups.astype(str) if groups.dtype == object else groups, sort=True)
+    days = calls['call_dateTime'].to_numpy(dtype='datetime64[D]')
+    first_day = days.min()
+    day_codes = (days - first_day).astype(np.int64)
+    n_days = int(day_codes.max()) + 1
+    flat = group_codes * n_days + day_codes
+    shape = (len(labels), n_days)
+    size = shape[0] * n_days
+    answered = (calls['call_outcome'] == 'Answered').to_numpy()
+    dropped = (calls['call_outcome'] == 'Dropped').to_numpy()
+    talk = np.where(answered, calls['length_in_min'].to_numpy(dtype=float), 0.0)
+    daily = {
+        'calls': np.bincount(flat, minlength=size).reshape(shape),
+        'answered': np.bincount(flat, weights=answered, minlength=size).reshape(shape),
+        'dropped': np.bincount(flat, weights=dropped, minlength=size).reshape(shape),
+        'talk_min': np.bincount(flat, weights=np.nan_to_num(talk), minlength=size).reshape(shape),
+    }
+    dates = pd.date_range(pd.Timestamp(first_day), periods=n_days, freq='D')
+    return pd.Index(labels, name=group_col), dates, daily
+
+def _window_sums(daily: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-day sums for every agent and day from one cumulative sum.
+
+    sum(d - window + 1 .. d) = cumsum[d + 1] - cumsum[d + 1 - window]: each step adds the new
+    day and subtracts the day that left the window, for all agents at once.
+    """
+    cs = np.zeros((daily.shape[0], daily.shape[1] + 1))
+    np.cumsum(daily, axis=1, out=cs[:, 1:])
+    end = np.arange(1, daily.shape[1] + 1)
+    return cs[:, end] - cs[:, np.maximum(end - window, 0)]
+
+@st.cache_data
+def rolling_agent_kpis(_df: pd.DataFrame, version: str, windows: Tuple[int, ...] = WINDOWS) -> Optional[pd.DataFrame]:
+    """Return a tidy agent x date table of rolling volume, answer rate and AHT with daily ranks.
+
+    For each window `w` (days): `calls_{w}d`, `answer_rate_{w}d`, `aht_{w}d` and the agent's rank
+    that day by AHT (shortest = 1, agents with answered calls only) and by volume. Rows where the
+    agent had no calls in the longest window are omitted. Cached per dataset `version`.
+    """
+    matrix = daily_matrix(_df)
+    if matrix is None:
+        return None
+    agents, dates, daily = matrix
+    columns = {'calls': daily['calls'].ravel(), 'answered': daily['answered'].ravel().astype(int)}
+    for w in windows:
+        calls = _window_sums(daily['calls'], w)
+        answered = _window_sums(daily['answered'], w)
+        talk = _window_sums(daily['talk_min'], w)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            answer_rate = np.where(calls > 0, answered / calls * 100, np.nan)
+            aht = np.where(answered > 0, talk / answered, np.nan)
+        # Ranks across agents for every day at once (axis 0), NaN for agents without data
+        aht_rank = pd.DataFrame(aht).rank(axis=0, method='min').to_numpy()
+        volume_rank = pd.DataFrame(np.where(calls > 0, calls, np.nan)).rank(axis=0, method='min', ascending=False).to_numpy()
+        columns.update({
+            f'calls_{w}d': calls.ravel().astype(int),
+            f'answer_rate_{w}d': answer_rate.ravel(),
+            f'aht_{w}d': aht.ravel(),
+            f'aht_rank_{w}d': aht_rank.ravel(),
+            f'volume_rank_{w}d': volume_rank.ravel(),
+        })
+    kpis = pd.DataFrame({
+        'full_name': np.repeat(agents.to_numpy(), len(dates)),
+        'date': np.tile(dates.to_numpy(), len(agents)),
+        **columns,
+    })
+    return kpis[kpis[f'calls_{max(windows)}d'] > 0].reset_index(drop=True)
+
+def kpi_sparklines(kpis: pd.DataFrame, metric: str = 'aht_7d', days: int = 30) -> Dict[str, List[float]]:
+    """Return the last `days` calendar days of `metric` per agent as plain lists for sparklines."""
+    if kpis is None or kpis.empty:
+        return {}
+    end = kpis['date'].max()
+    recent = kpis[kpis['date'] > end - pd.Timedelta(days=days)]
+    wide = recent.pivot(index='full_name', columns='date', values=metric)
+    wide = wide.reindex(columns=pd.date_range(end - pd.Timedelta(days=days - 1), end, freq='D'))
+    return {agent: values[~np.isnan(values)].tolist() for agent, values in zip(wide.index, wide.to_numpy(dtype=float))}
@@ -1,16 +1,16 @@
 import pandas as pd
 from typing import Optional
 import streamlit as st
+from modules import compute_backend
 
 @st.cache_data
-def detect_anomalies(df: pd.DataFrame, n: int = 10) -> Optional[pd.DataFrame]:
+def detect_anomalies(df: pd.DataFrame, n: int = 10, backend: Optional[str] = None) -> Optional[pd.DataFrame]:
     """Return a DataFrame of anomalous calls based on call duration (IQR method)."""
     answered_df = df[df['call_outcome'] == 'Answered']
     if answered_df.empty:
         return None
     duration_series = answered_df['length_in_min']
-    Q1 = duration_series.quantile(0.25)
-    Q3 = duration_series.quantile(0.75)
+    Q1, Q3 = compute_backend.quantiles(df, 'length_in_min', [0.25, 0.75], where=('call_outcome', 'Answered'), backend=backend)
     IQR = Q3 - Q1
     lower_bound = Q1 - 1.5 * IQR
     upper_bound = Q3 + 1.5 * IQR
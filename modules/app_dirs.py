@@ -0,0 +1,23 @@
+import os
+
+# Everything the app persists for itself (result cache, models, ingest state) lives under one
+# directory owned by the user running the dashboard, not in the shared, world-writable temp dir
+APP_DATA_DIR = os.environ.get('CALLCENTER_DATA_DIR', os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'callcenter'))
+
+def is_private(path: str) -> bool:
+    """Return True when `path` is owned by the current user and not writable by group or others."""
+    stat = os.stat(path)
+    return (not hasattr(os, 'getuid') or stat.st_uid == os.getuid()) and not stat.st_mode & 0o022
+
+def private_dir(path: str) -> str:
+    """Create `path` with mode 0700 if needed and return it.
+
+    Raises PermissionError when the directory belongs to another user, since its files could
+    have been planted; a directory we own but left open is tightened to 0700.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, 'getuid') and os.stat(path).st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user; set a private directory instead")
+    if os.stat(path).st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from modules import app_dirs
+
+try:
+    import librosa
+    import soundfile as sf
+    from scipy.signal import find_peaks, savgol_filter
+except ImportError:  # audio extraction is optional; the call-log dashboard does not need it
+    librosa = None
+
+# Cached features are trusted on read (they feed scoring), so they live in a directory only the app user can write
+FEATURE_CACHE_DIR = os.environ.get('CALLCENTER_AUDIO_CACHE_DIR', os.path.join(app_dirs.APP_DATA_DIR, 'audio_features'))
+AUDIO_WORKERS = int(os.environ.get('CALLCENTER_AUDIO_WORKERS', os.cpu_count() or 1))
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.ogg')
+# Bump when a feature definition changes so cached rows from older code are not reused
+FEATURE_VERSION = 1
+
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+BLOCK_FRAMES = 256  # ~3 s of audio per block at 44.1 kHz; memory per worker stays flat for any call length
+N_MFCC = 13
+LONG_PAUSE_SEC = 2.0
+
+# Column names follow the notebook's flattened `enhanced_audio_features.csv`
+SPECTRAL_COLUMNS = ['spectral_centroid', 'spectral_bandwidth', 'spectral_rolloff', 'spectral_zcr', 'spectral_spectral_flatness']
+MFCC_COLUMNS = [f"spectral_mfcc_mean_{i}" for i in range(N_MFCC)]
+FEATURE_COLUMNS = [
+    'general_duration', 'general_sample_rate',
+    'energy_rms', 'energy_rms_std', 'energy_variance', 'energy_energy_entropy', 'energy_dynamic_range',
+    'spectral_centroid', 'spectral_centroid_std', 'spectral_bandwidth', 'spectral_rolloff', 'spectral_zcr',
+    *MFCC_COLUMNS, 'spectral_spectral_flatness',
+    'rhythm_speaking_rate', 'rhythm_avg_utterance_length', 'rhythm_utterance_variability', 'rhythm_regularity',
+    'silence_ratio', 'silence_count', 'silence_avg_duration', 'silence_max_duration',
+    'silence_long_pause_count', 'silence_total_long_pause_time',
+    'temporal_num_peaks', 'temporal_num_valleys', 'temporal_peak_prominence', 'temporal_energy_range', 'temporal_energy_trend',
+]
+SCHEMA = pa.schema(
+    [('filename', pa.string()), ('short_filename', pa.string()), ('content_hash', pa.string())]
+    + [(col, pa.float64()) for col in FEATURE_COLUMNS]
+)
+
+def is_available() -> bool:
+    """Return True when the audio stack (librosa, soundfile) is installed."""
+    return librosa is not None
+
+def short_filename(filename: str) -> str:
+    """Short label for a recording, as used in the notebook's plots (e.g. '20250_09709')."""
+    base_name = os.path.splitext(filename)[0]
+    if len(base_name) > 10:
+        parts = base_name.split('_')
+        if len(parts) > 1:
+            return f"{parts[0][:5]}_{parts[1][:5]}"
+        return base_name[:10]
+    return base_name
+
+def content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha256 of the file contents (and feature version), read in chunks."""
+    digest = hashlib.sha256(f"v{FEATURE_VERSION}:".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Lengths of consecutive True runs in a boolean array."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+def _stream_aggregates(path: str) -> Dict:
+    """Read `path` block by block and keep running sums of the per-frame spectral features.
+
+    Frames are computed with `center=False` on blocks that librosa.stream overlaps by
+    `FRAME_LENGTH - HOP_LENGTH` samples, so each frame is seen exactly once. Only the per-frame
+    RMS contour is kept in full (one float per hop) for the percentile-based pause analysis.
+    """
+    sr = librosa.get_samplerate(path)
+    n_samples = sf.info(path).frames
+    stream = librosa.stream(path, block_length=BLOCK_FRAMES, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, mono=True, dtype=np.float32)
+    mel_basis = None
+    n_frames = 0
+    sums = dict.fromkeys(SPECTRAL_COLUMNS, 0.0)
+    centroid_sq = 0.0
+    mfcc_sum = np.zeros(N_MFCC)
+    rms_blocks = []
+    for block in stream:
+        if len(block) < FRAME_LENGTH:
+            continue
+        S = np.abs(librosa.stft(block, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False))
+        if mel_basis is None:
+            mel_basis = librosa.filters.mel(sr=sr, n_fft=FRAME_LENGTH)
+        centroid = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
+        sums['spectral_centroid'] += centroid.sum()
+        centroid_sq += np.square(centroid, dtype=np.float64).sum()
+        sums['spectral_bandwidth'] += librosa.feature.spectral_bandwidth(S=S, sr=sr)[0].sum()
+        sums['spectral_rolloff'] += librosa.feature.spectral_rolloff(S=S, sr=sr)[0].sum()
+        sums['spectral_spectral_flatness'] += librosa.feature.spectral_flatness(S=S)[0].sum()
+        sums['spectral_zcr'] += librosa.feature.zero_crossing_rate(block, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False)[0].sum()
+        mel = librosa.power_to_db(mel_basis @ S ** 2)
+        mfcc_sum += librosa.feature.mfcc(S=mel, n_mfcc=N_MFCC).sum(axis=1)
+        rms_blocks.append(librosa.feature.rms(y=block, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False)[0])
+        n_frames += S.shape[1]
+    return {
+        'sr': sr,
+        'n_samples': n_samples,
+        'n_frames': n_frames,
+        'sums': sums,
+        'centroid_sq': centroid_sq,
+        'mfcc_sum': mfcc_sum,
+        'rms': np.concatenate(rms_blocks) if rms_blocks else np.zeros(0, dtype=np.float32),
+    }
+
+def _energy_entropy(rms: np.ndarray) -> float:
+    hist, _ = np.histogram(rms, bins=50, density=True)
+    hist = hist[hist > 0]
+    return float(-np.sum(hist * np.log2(hist)))
+
+def extract_features(path: str) -> Dict[str, float]:
+    """Return the energy, spectral, MFCC, pause/rhythm and energy-contour features of one recording."""
+    agg = _stream_aggregates(path)
+    sr, n, rms = agg['sr'], agg['n_frames'], agg['rms'].astype(np.float64)
+    features = dict.fromkeys(FEATURE_COLUMNS, np.nan)
+    features['general_duration'] = agg['n_samples'] / sr
+    features['general_sample_rate'] = sr
+    if n == 0:
+        return features
+
+    for col, total in agg['sums'].items():
+        features[col] = total / n
+    features['spectral_centroid_std'] = np.sqrt(max(agg['centroid_sq'] / n - features['spectral_centroid'] ** 2, 0))
+    features.update(zip(MFCC_COLUMNS, agg['mfcc_sum'] / n))
+
+    features['energy_rms'] = rms.mean()
+    features['energy_rms_std'] = rms.std()
+    features['energy_variance'] = rms.var()
+    features['energy_energy_entropy'] = _energy_entropy(rms)
+    features['energy_dynamic_range'] = rms.max() - rms.min()
+
+    # Pauses: frames at or below the recording's 20th RMS percentile count as silence
+    voiced = rms > np.percentile(rms, 20)
+    frame_sec = HOP_LENGTH / sr
+    silences = _runs(~voiced) * frame_sec
+    utterances = _runs(voiced) * frame_sec
+    long_pauses = silences[silences > LONG_PAUSE_SEC]
+    features['silence_ratio'] = 1 - voiced.mean()
+    features['silence_count'] = len(silences)
+    features['silence_avg_duration'] = silences.mean() if len(silences) else 0
+    features['silence_max_duration'] = silences.max() if len(silences) else 0
+    features['silence_long_pause_count'] = len(long_pauses)
+    features['silence_total_long_pause_time'] = long_pauses.sum()
+    features['rhythm_speaking_rate'] = len(utterances) / features['general_duration'] if features['general_duration'] > 0 else 0
+    features['rhythm_avg_utterance_length'] = utterances.mean() if len(utterances) else 0
+    features['rhythm_utterance_variability'] = utterances.std() if len(utterances) > 1 else 0
+    features['rhythm_regularity'] = 1 / (utterances.std() + 1e-8) if len(utterances) > 1 else 0.5
+
+    # Energy contour: peaks/valleys of the smoothed RMS curve and its linear trend
+    smooth = savgol_filter(rms, window_length=min(21, len(rms) // 2 * 2 + 1), polyorder=2) if len(rms) > 4 else rms
+    peaks, _ = find_peaks(smooth, height=np.percentile(smooth, 60))
+    valleys, _ = find_peaks(-smooth, height=-np.percentile(smooth, 40))
+    features['temporal_num_peaks'] = len(peaks)
+    features['temporal_num_valleys'] = len(valleys)
+    features['temporal_peak_prominence'] = smooth[peaks].mean() if len(peaks) else 0
+    features['temporal_energy_range'] = features['energy_dynamic_range']
+    features['temporal_energy_trend'] = np.polyfit(np.arange(len(rms)), rms, 1)[0] if len(rms) > 1 else 0
+    return {col: float(value) for col, value in features.items()}
+
+def _process_file(path: str, cache_dir: str) -> Dict:
+    """Worker: hash the file, return its cached features or extract and cache them."""
+    row = {'filename': os.path.basename(path), 'short_filename': short_filename(os.path.basename(path))}
+    try:
+        row['content_hash'] = content_hash(path)
+        cache_path = os.path.join(cache_dir, f"{row['content_hash']}.json")
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                return {**row, **json.load(f), 'cached': True}
+        features = extract_features(path)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(features, f)
+        os.replace(tmp_path, cache_path)
+        return {**row, **features, 'cached': False}
+    except Exception as e:  # one unreadable recording must not stop a nightly batch
+        return {**row, 'error': str(e)}
+
+def list_recordings(folder: str) -> List[str]:
+    """Return the audio files directly inside `folder`, sorted by name."""
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith(AUDIO_EXTENSIONS)
+    )
+
+def extract_folder(folder: str, output_path: str, max_workers: int = AUDIO_WORKERS, cache_dir: str = FEATURE_CACHE_DIR,
+                   batch_size: int = 256, progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Extract features for every recording in `folder` into the Parquet table `output_path`.
+
+    Files are processed by a pool of `max_workers` processes; results already in the content-hash
+    cache are reused. Rows are written in batches of `batch_size` as they complete, so the table
+    never has to be held in memory. Returns counts and the per-file errors.
+    """
+    if not is_available():
+        raise ImportError("Audio feature extraction requires librosa and soundfile")
+    app_dirs.private_dir(cache_dir)
+    paths = list_recordings(folder)
+    summary = {'files': len(paths), 'extracted': 0, 'cached': 0, 'failed': 0, 'errors': {}}
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    batch = []
+
+    def flush(writer):
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=SCHEMA))
+            batch.clear()
+
+    with pq.ParquetWriter(tmp_path, SCHEMA) as writer, ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_process_file, path, cache_dir) for path in paths]
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = future.result()
+            if 'error' in row:
+                summary['failed'] += 1
+                summary['errors'][row['filename']] = row['error']
+            else:
+                summary['cached' if row.pop('cached') else 'extracted'] += 1
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    flush(writer)
+            if progress:
+                progress(done, len(paths))
+        flush(writer)
+    os.replace(tmp_path, output_path)
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Extract call-recording audio features into a Parquet table.")
+    parser.add_argument('folder', help="folder containing the recordings")
+    parser.add_argument('--output', default='audio_features.parquet', help="Parquet file to write")
+    parser.add_argument('--workers', type=int, default=AUDIO_WORKERS, help="worker processes (default: CPU count)")
+    parser.add_argument('--cache-dir', default=FEATURE_CACHE_DIR, help="per-file feature cache directory")
+    args = parser.parse_args(argv)
+    summary = extract_folder(args.folder, args.output, max_workers=args.workers, cache_dir=args.cache_dir,
+                             progress=lambda done, total: print(f"\r{done}/{total} recordings", end='', flush=True))
+    print(f"\n{summary['extracted']} extracted, {summary['cached']} from cache, {summary['failed']} failed -> {args.output}")
+    for filename, error in summary['errors'].items():
+        print(f"  {filename}: {error}")
+
+if __name__ == '__main__':
+    main()
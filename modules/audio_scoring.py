@@ -0,0 +1,243 @@
+import hashlib
+import importlib.util
+import os
+import time
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+import streamlit as st
+from modules import app_dirs
+
+MODEL_DIR = os.environ.get('CALLCENTER_AUDIO_MODEL_DIR', os.path.join(app_dirs.APP_DATA_DIR, 'audio_models'))
+MODEL_FILE = 'audio_scorer.joblib'
+# SHA-256 of the model file, recorded next to it at save time and checked before unpickling
+DIGEST_SUFFIX = '.sha256'
+ID_COLUMNS = ['filename', 'short_filename', 'content_hash', 'emotion_label', 'emotion_confidence']
+# Columns written by scoring (or by the notebook's final_analysis_results.csv) are never model inputs
+SCORE_COLUMNS = [
+    'is_anomaly', 'anomaly_score', 'priority_score', 'priority_level', 'urgency_score', 'risk_score',
+    'priority_numeric', 'composite_priority', 'kmeans_cluster', 'dbscan_cluster',
+    'pca_x', 'pca_y', 'umap_x', 'umap_y', 'tsne_x', 'tsne_y',
+]
+EMOTION_WEIGHTS = {'angry': 5, 'frustrated': 4, 'sad': 3, 'confused': 3, 'excited': 2, 'happy': 1, 'calm': 0, 'neutral': 0}
+PRIORITY_WEIGHTS = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
+# Feature columns the notebook's priority rules read; a table without them cannot be scored
+REQUIRED_COLUMNS = ['general_duration', 'energy_rms', 'silence_long_pause_count']
+REVIEW_COLUMNS = ['filename', 'emotion_label', 'priority_level', 'composite_priority', 'is_anomaly', 'general_duration']
+
+def is_available() -> bool:
+    """Return True when scikit-learn and joblib are installed.
+
+    Audio scoring is optional and scikit-learn is slow to import, so it is only located here
+    and imported when a scorer is fitted or loaded.
+    """
+    return all(importlib.util.find_spec(name) is not None for name in ('sklearn', 'joblib'))
+
+@st.cache_data
+def load_feature_table(uploaded_file) -> Optional[pd.DataFrame]:
+    """Load an audio feature table (Parquet from `audio_features`, or the notebook's CSV exports)."""
+    try:
+        if uploaded_file.name.endswith('.parquet'):
+            return pd.read_parquet(uploaded_file)
+        return pd.read_csv(uploaded_file)
+    except Exception as e:
+        st.error(f"❌ Error loading audio features: {e}")
+        return None
+
+def missing_columns(features: pd.DataFrame) -> List[str]:
+    """Return the `REQUIRED_COLUMNS` absent from `features` (empty when it can be scored)."""
+    return [col for col in REQUIRED_COLUMNS if col not in features.columns]
+
+def feature_columns(features: pd.DataFrame) -> List[str]:
+    """Numeric audio feature columns, excluding identifiers and previous scoring output."""
+    return [
+        col for col in features.select_dtypes(include='number').columns
+        if col not in ID_COLUMNS and col not in SCORE_COLUMNS and not col.startswith('anomaly_')
+    ]
+
+class AudioScorer:
+    """Standardiser, clustering, projection and anomaly models for the audio feature table.
+
+    Everything is fitted in mini-batches (`partial_fit`) so memory stays bounded by `batch_size`
+    rows; the Isolation Forest only ever looks at `max_samples` rows per tree and is fitted on a
+    random sample. A fitted scorer is persisted with joblib and scores new recordings with one
+    vectorized pass per batch, without refitting.
+    """
+
+    def __init__(self, n_clusters: int = 4, contamination: float = 0.15, batch_size: int = 4096,
+                 sample_size: int = 50_000, random_state: int = 42):
+        self.n_clusters = n_clusters
+        self.contamination = contamination
+        self.batch_size = batch_size
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.model_id = None
+
+    def _matrix(self, features: pd.DataFrame) -> np.ndarray:
+        X = features.reindex(columns=self.feature_columns).to_numpy(dtype=float)
+        return np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def _batches(self, n: int) -> List[np.ndarray]:
+        # Even splits so no trailing batch is smaller than the clusters/components it must fit
+        return np.array_split(np.arange(n), max(1, -(-n // self.batch_size)))
+
+    def is_compatible(self, features: pd.DataFrame) -> bool:
+        """True when every feature the models were fitted on is present in `features`."""
+        return set(self.feature_columns) <= set(features.columns)
+
+    def fit(self, features: pd.DataFrame) -> 'AudioScorer':
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import IncrementalPCA
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        if missing_columns(features):
+            raise ValueError(f"audio feature table is missing {', '.join(missing_columns(features))}")
+        self.feature_columns = feature_columns(features)
+        X = self._matrix(features)
+        batches = self._batches(len(X))
+        self.scaler = StandardScaler()
+        for idx in batches:
+            self.scaler.partial_fit(X[idx])
+        n_clusters = min(self.n_clusters, len(X))
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=self.batch_size, random_state=self.random_state, n_init=3)
+        self.pca = IncrementalPCA(n_components=min(2, len(self.feature_columns), min(len(idx) for idx in batches)))
+        for idx in batches:
+            Z = self.scaler.transform(X[idx])
+            self.kmeans.partial_fit(Z)
+            self.pca.partial_fit(Z)
+
+        rng = np.random.default_rng(self.random_state)
+        sample = self.scaler.transform(X[rng.choice(len(X), min(len(X), self.sample_size), replace=False)])
+        self.iforest = IsolationForest(contamination=self.contamination, random_state=self.random_state).fit(sample)
+        self.low, self.high = np.percentile(sample, [5, 95], axis=0)
+
+        # Rule thresholds from the notebook's priority labels, frozen so new calls are scored consistently
+        self.thresholds = {
+            'duration_low': features['general_duration'].quantile(0.25) * 0.5,
+            'duration_high': features['general_duration'].quantile(0.75) * 1.5,
+            'energy_high': features['energy_rms'].quantile(0.9),
+            'pauses_high': features['silence_long_pause_count'].quantile(0.8),
+        }
+        self.model_id = f"{int(time.time())}-{len(X)}"
+        return self
+
+    def score(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Return `features` with anomaly flags, cluster, 2-D projection and priority columns."""
+        if missing_columns(features):
+            raise ValueError(f"audio feature table is missing {', '.join(missing_columns(features))}")
+        X = self._matrix(features)
+        parts = {name: [] for name in ['iso', 'score', 'stat', 'perc', 'cluster', 'pca']}
+        for idx in self._batches(len(X)):
+            Z = self.scaler.transform(X[idx])
+            raw = self.iforest.score_samples(Z)
+            parts['iso'].append(raw < self.iforest.offset_)  # same as predict() == -1, one forest pass
+            parts['score'].append(-raw)
+            parts['stat'].append((np.abs(Z) > 3).any(axis=1))
+            parts['perc'].append(((Z < self.low) | (Z > self.high)).sum(axis=1) > Z.shape[1] * 0.3)
+            parts['cluster'].append(self.kmeans.predict(Z))
+            parts['pca'].append(self.pca.transform(Z))
+        iso, anomaly_score, stat, perc, cluster, pca = (np.concatenate(parts[name]) for name in parts)
+        # Ensemble: an anomaly needs at least two of the three detectors to agree
+        ensemble = (iso.astype(int) + stat + perc) >= 2
+        scored = features.drop(columns=[c for c in features.columns if c in SCORE_COLUMNS or c.startswith('anomaly_')]).assign(
+            anomaly_isolation_forest=iso.astype(int),
+            anomaly_statistical=stat.astype(int),
+            anomaly_percentile=perc.astype(int),
+            anomaly_ensemble=ensemble.astype(int),
+            is_anomaly=ensemble.astype(int),
+            anomaly_score=anomaly_score,
+            kmeans_cluster=cluster,
+            pca_x=pca[:, 0],
+            pca_y=pca[:, 1] if pca.shape[1] > 1 else 0.0,
+        )
+        return self._prioritise(scored)
+
+    def _prioritise(self, scored: pd.DataFrame) -> pd.DataFrame:
+        """Notebook priority rules: emotion, anomaly, extreme duration, high energy and long pauses."""
+        t = self.thresholds
+        emotion = scored['emotion_label'].map(EMOTION_WEIGHTS).fillna(0) if 'emotion_label' in scored.columns else 0
+        duration = scored['general_duration']
+        points = (
+            emotion
+            + scored['is_anomaly'] * 3
+            + ((duration < t['duration_low']) | (duration > t['duration_high'])) * 2
+            + (scored['energy_rms'] > t['energy_high']) * 2
+            + (scored['silence_long_pause_count'] > t['pauses_high']) * 1
+        ).to_numpy(dtype=float)
+        priority_level = np.select([points >= 7, points >= 4], ['HIGH', 'MEDIUM'], 'LOW')
+        urgency = np.select([points >= 6, points >= 3], [2, 1], 0)
+        risk = (points >= 5).astype(int)
+        priority_numeric = pd.Series(priority_level, index=scored.index).map(PRIORITY_WEIGHTS)
+        return scored.assign(
+            priority_score=points,
+            priority_level=priority_level,
+            urgency_score=urgency,
+            risk_score=risk,
+            priority_numeric=priority_numeric,
+            composite_priority=priority_numeric * 0.4 + urgency * 0.3 + risk * 0.2 + scored['is_anomaly'] * 0.1,
+        )
+
+    def save(self, path: str) -> None:
+        """Write the scorer to `path` in a private directory, with its digest next to it."""
+        import joblib
+        app_dirs.private_dir(os.path.dirname(path))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        with open(f"{path}{DIGEST_SUFFIX}.{os.getpid()}.tmp", 'w') as f:
+            f.write(_digest(tmp_path))
+        os.replace(f"{path}{DIGEST_SUFFIX}.{os.getpid()}.tmp", f"{path}{DIGEST_SUFFIX}")
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> 'AudioScorer':
+        """Load a scorer saved by `save`.
+
+        joblib files are pickles and run code when loaded, so this raises PermissionError unless
+        the file and its digest are owned by the current user, not writable by anyone else, and
+        the file matches the digest recorded when it was saved.
+        """
+        import joblib
+        digest_path = f"{path}{DIGEST_SUFFIX}"
+        if not all(os.path.exists(p) and app_dirs.is_private(p) for p in (os.path.dirname(path), path, digest_path)):
+            raise PermissionError(f"{path} is not a private model file of this user")
+        with open(digest_path) as f:
+            if f.read().strip() != _digest(path):
+                raise PermissionError(f"{path} does not match the digest recorded when it was saved")
+        return joblib.load(path)
+
+def _digest(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+@st.cache_resource
+def _load_scorer(path: str, mtime: float) -> Optional[AudioScorer]:
+    # `mtime` is part of the cache key, so a refit written by any session is picked up. A file
+    # that fails the ownership or digest check is ignored and the scorer is refitted over it
+    if not os.path.exists(path):
+        return None
+    try:
+        return AudioScorer.load(path)
+    except PermissionError:
+        return None
+
+def get_scorer(features: pd.DataFrame, refit: bool = False, directory: str = MODEL_DIR) -> AudioScorer:
+    """Return the persisted scorer, fitting and saving a new one when missing, incompatible or `refit`."""
+    path = os.path.join(directory, MODEL_FILE)
+    scorer = None if refit else _load_scorer(path, os.path.getmtime(path) if os.path.exists(path) else 0.0)
+    if scorer is None or not scorer.is_compatible(features):
+        scorer = AudioScorer().fit(features)
+        scorer.save(path)
+    return scorer
+
+@st.cache_data
+def score_calls(_features: pd.DataFrame, version: str, _scorer: AudioScorer, model_id: str) -> pd.DataFrame:
+    """Score the feature table with `_scorer`; cached per feature-table `version` and scorer `model_id`."""
+    return _scorer.score(_features)
+
+def priority_calls(scored: pd.DataFrame) -> pd.DataFrame:
+    """Calls for review: HIGH priority or anomalous, highest composite priority first."""
+    review = scored[(scored['priority_level'] == 'HIGH') | (scored['is_anomaly'] == 1)]
+    return review.sort_values('composite_priority', ascending=False)[[c for c in REVIEW_COLUMNS if c in review.columns]]
@@ -1 +1,129 @@
-# Placeholder for business intelligence features 
\ No newline at end of file
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+import streamlit as st
+from modules import drift
+
+TALK_TIME_BINS = [0, 1, 3, 5, 10, np.inf]
+TALK_TIME_LABELS = ['<1 min', '1-3 min', '3-5 min', '5-10 min', '10+ min']
+CONTACT_OUTCOMES = ['Answered', 'Dropped']
+
+def _codes(df: pd.DataFrame, col: str, default: str):
+    """Return integer codes and their labels for a grouping column, or a single default group if missing."""
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=np.int64), pd.Index([default])
+    codes, uniques = pd.factorize(df[col], sort=True, use_na_sentinel=False)
+    return codes, pd.Index(uniques).fillna(default)
+
+def _rates(frame: pd.DataFrame) -> pd.DataFrame:
+    """Add rate columns to a frame of summed campaign/list counters."""
+    frame['answer_rate'] = frame['answered'] / frame['dials'] * 100
+    frame['contact_rate'] = frame['contacts'] / frame['dials'] * 100
+    frame['dials_per_lead'] = frame['dials'] / frame['leads']
+    frame['exhaustion_rate'] = frame['exhausted_leads'] / frame['leads'] * 100
+    frame['avg_talk_time_min'] = (frame['talk_time_min'] / frame['answered']).where(frame['answered'] > 0, 0)
+    return frame
+
+@st.cache_data
+def campaign_analytics(_df: pd.DataFrame, version: str, max_attempts: int = 3) -> Optional[Dict[str, pd.DataFrame]]:
+    """Compute campaign and list KPIs from one grouped pass over categorical codes.
+
+    Calls are reduced once to a (campaign, list, lead) table plus a talk-time histogram;
+    the campaign and list views are re-aggregated from those small tables. A lead is the
+    dialed phone number (falling back to `vendor_lead_code`) and counts as exhausted once
+    answered or dialed `max_attempts` times. `_df` is not hashed: results are cached per
+    dataset `version` so the dashboard and headless reports share one computation.
+    """
+    df = _df
+    if df is None or df.empty:
+        return None
+    lead_col = 'phone_number_dialed' if 'phone_number_dialed' in df.columns else 'vendor_lead_code'
+    campaign_codes, campaigns = _codes(df, 'campaign_id', 'Unknown')
+    list_codes, lists = _codes(df, 'list_id', 'Unknown')
+    lead_codes, _ = _codes(df, lead_col, 'Unknown')
+    answered = (df['call_outcome'] == 'Answered').to_numpy()
+    contacts = df['call_outcome'].isin(CONTACT_OUTCOMES).to_numpy()
+    talk = np.where(answered, df['length_in_min'].fillna(0).to_numpy(dtype=float), 0.0)
+
+    # One pass: per-lead counters and a (campaign, talk bin) histogram of answered calls
+    leads = pd.DataFrame({
+        'campaign': campaign_codes, 'list': list_codes, 'lead': lead_codes,
+        'answered': answered, 'contacts': contacts, 'talk_time_min': talk,
+    }).groupby(['campaign', 'list', 'lead'], sort=False).agg(
+        dials=('answered', 'size'), answered=('answered', 'sum'),
+        contacts=('contacts', 'sum'), talk_time_min=('talk_time_min', 'sum')).reset_index()
+    leads['leads'] = 1
+    leads['exhausted_leads'] = ((leads['answered'] > 0) | (leads['dials'] >= max_attempts)).astype(int)
+    n_bins = len(TALK_TIME_LABELS)
+    talk_bin = np.clip(np.digitize(talk, TALK_TIME_BINS[1:-1]), 0, n_bins - 1)
+    flat = campaign_codes * n_bins + talk_bin
+    hist = np.bincount(flat[answered], minlength=len(campaigns) * n_bins).reshape(len(campaigns), n_bins)
+
+    counters = ['dials', 'answered', 'contacts', 'talk_time_min', 'leads', 'exhausted_leads']
+    by_list = _rates(leads.groupby(['campaign', 'list'], sort=True)[counters].sum())
+    by_campaign = _rates(leads.groupby('campaign', sort=True)[counters].sum())
+    by_list.index = pd.MultiIndex.from_arrays([
+        campaigns[by_list.index.get_level_values('campaign')], lists[by_list.index.get_level_values('list')]],
+        names=['campaign_id', 'list_id'])
+    by_campaign.index = pd.Index(campaigns[by_campaign.index], name='campaign_id')
+
+    talk_dist = pd.DataFrame(hist, index=pd.Index(campaigns, name='campaign_id'), columns=TALK_TIME_LABELS)
+    talk_share = talk_dist.div(talk_dist.sum(axis=1).replace(0, np.nan), axis=0).fillna(0) * 100
+    return {
+        'campaigns': by_campaign.reset_index(),
+        'lists': by_list.reset_index(),
+        'talk_time_distribution': talk_share.reset_index(),
+    }
+
+ALERT_TEXT = {
+    ('Agent', 'AHT (min)'): ("⏱️ AHT Drift: <b>{series}</b>", "Coach {series} for efficiency; look at what changed around {start}."),
+    ('Agent', 'Drop Rate (%)'): ("🚨 Drop Rate Drift: <b>{series}</b>", "Review call handling and support for {series}."),
+    ('Hour slot', 'AHT (min)'): ("⏱️ Team AHT Drift: <b>{series} slot</b>", "Review call routing, staffing, or process for this slot."),
+    ('Hour slot', 'Drop Rate (%)'): ("🚨 Team Drop Rate Drift: <b>{series} slot</b>", "Check staffing and queue coverage for this slot."),
+}
+
+@st.cache_data
+def executive_alerts(_df: pd.DataFrame, version: str) -> List[Tuple[str, str, str]]:
+    """Return (title, description, action) alerts for agent and hourly-slot KPIs that have shifted upward.
+
+    One alert per shift still in progress (see `drift.drift_shifts`), dated from when it began, so
+    stable outliers are not re-flagged on every run.
+    """
+    shifts = drift.drift_shifts(_df, version)
+    recs = []
+    if shifts is None:
+        return recs
+    for row in shifts.itertuples(index=False):
+        title, action = ALERT_TEXT[(row.scope, row.kpi)]
+        start = f"{row.shift_start:%a %d %b}"
+        unit = ' min' if row.kpi == 'AHT (min)' else '%'
+        recs.append((
+            title.format(series=row.series),
+            f"{row.kpi.split(' (')[0]} up from {row.baseline:.2f}{unit} to <b>{row.current:.2f}{unit}</b> since <b>{start}</b> (confirmed {row.detected:%d %b})",
+            action.format(series=row.series, start=start),
+        ))
+    return recs
+
+@st.cache_data
+def insights_matrix(_df: pd.DataFrame, version: str) -> Optional[Tuple[pd.DataFrame, pd.Series]]:
+    """Return per-agent AHT, drop rate and call volume with their colour bands, and the team averages.
+
+    Agents are keyed by full name (first names collide once there are hundreds). Each metric gets a
+    `<metric> band` column ('bad', 'warn', 'good' or 'high', see `grid.BAND_STYLES`) from its
+    deviation from the team average (the mean over agents), computed for all agents at once. Cached
+    per dataset `version`.
+    """
+    if not {'full_name', 'call_outcome', 'length_in_min'}.issubset(_df.columns):
+        return None
+    agent = _df['full_name'].astype(str).str.strip().where(_df['full_name'].notna())
+    answered = _df['call_outcome'] == 'Answered'
+    matrix = pd.DataFrame({
+        'AHT (min)': _df['length_in_min'][answered].groupby(agent[answered]).mean(),
+        'Drop Rate (%)': (_df['call_outcome'] == 'Dropped').groupby(agent).mean() * 100,
+        'Call Volume': agent.groupby(agent).size(),
+    })
+    team = matrix.mean()
+    matrix['AHT (min) band'] = np.select([matrix['AHT (min)'] > team['AHT (min)'] + 0.5, matrix['AHT (min)'] > team['AHT (min)']], ['bad', 'warn'], 'good')
+    matrix['Drop Rate (%) band'] = np.select([matrix['Drop Rate (%)'] > team['Drop Rate (%)'] + 5, matrix['Drop Rate (%)'] > team['Drop Rate (%)']], ['bad', 'warn'], 'good')
+    matrix['Call Volume band'] = np.where(matrix['Call Volume'] > team['Call Volume'] * 1.2, 'high', '')
+    return matrix.rename_axis('Agent').reset_index(), team
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+import streamlit as st
+from modules import app_dirs
+from modules.dataset_store import to_arrow
+
+# Call history (phone numbers, agent names) is kept in a directory only the dashboard user can read
+CALL_STORE_DIR = os.environ.get('CALLCENTER_CALL_STORE_DIR', os.path.join(app_dirs.APP_DATA_DIR, 'calls'))
+PARTITION_BY_CAMPAIGN = os.environ.get('CALLCENTER_PARTITION_BY_CAMPAIGN', '0') == '1'
+MANIFEST = '_manifest.json'
+STAT_COLUMNS = ['call_dateTime', 'length_in_min', 'full_name']
+
+def _day(values) -> Optional[str]:
+    return None if values is None else str(pd.Timestamp(values).date())
+
+class CallStore:
+    """Persistent history of preprocessed calls in date-partitioned Parquet files.
+
+    Each stored dump is split into `<directory>/date=YYYY-MM-DD/[campaign=<id>/]<dataset_id>.parquet`
+    and every partition is listed in `_manifest.json` with its row count, min/max of
+    `STAT_COLUMNS` and its agents. Reads prune on the manifest alone, so a one-week query only
+    opens the files of that week whatever the size of the archive.
+    """
+
+    def __init__(self, directory: str = CALL_STORE_DIR, partition_by_campaign: bool = PARTITION_BY_CAMPAIGN):
+        self.directory = directory
+        self.partition_by_campaign = partition_by_campaign
+        self._lock = threading.Lock()
+        app_dirs.private_dir(directory)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST)
+
+    def manifest(self) -> List[Dict]:
+        """Return the partition entries of the store (empty if nothing is stored yet)."""
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)['partitions']
+
+    def _save_manifest(self, partitions: List[Dict]) -> None:
+        path = self._manifest_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'partitions': partitions}, f)
+        os.replace(tmp_path, path)
+
+    def version(self) -> str:
+        """Return a fingerprint of the manifest that changes whenever partitions are written."""
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return 'empty'
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return any(entry['dataset'] == dataset_id for entry in self.manifest())
+
+    def write(self, df: pd.DataFrame, dataset_id: str) -> int:
+        """Partition `df` by call date (and campaign) and record it in the manifest; return partitions written.
+
+        Writing the same `dataset_id` again is a no-op. Rows without a call date cannot be placed
+        in a partition and are not stored.
+        """
+        with self._lock:
+            partitions = self.manifest()
+            if any(entry['dataset'] == dataset_id for entry in partitions):
+                return 0
+            calls = df[df['call_dateTime'].notna()]
+            if calls.empty:
+                return 0
+            keys = pd.DataFrame({'day': calls['call_dateTime'].to_numpy(dtype='datetime64[D]')})
+            by_campaign = self.partition_by_campaign and 'campaign_id' in calls.columns
+            if by_campaign:
+                keys['campaign'] = calls['campaign_id'].fillna('Unknown').astype(str).to_numpy()
+            # Sorting once by partition key makes every partition a contiguous, zero-copy slice
+            order = np.lexsort([keys[col].to_numpy() for col in reversed(keys.columns)])
+            calls = calls.take(order).reset_index(drop=True)
+            keys = keys.take(order).reset_index(drop=True)
+            table = to_arrow(calls)
+            stats = calls[[col for col in STAT_COLUMNS if col in calls.columns]]
+            new_entries = []
+            for key, rows in keys.groupby(list(keys.columns), sort=True).indices.items():
+                day, campaign = (key if by_campaign else (key, None))
+                day = str(pd.Timestamp(day).date())
+                folder = os.path.join(f"date={day}", f"campaign={campaign}") if by_campaign else f"date={day}"
+                os.makedirs(os.path.join(self.directory, folder), exist_ok=True)
+                rel_path = os.path.join(folder, f"{dataset_id}.parquet")
+                path = os.path.join(self.directory, rel_path)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                pq.write_table(table.slice(rows[0], len(rows)), tmp_path)
+                os.replace(tmp_path, path)
+                part = stats.iloc[rows[0]:rows[0] + len(rows)]
+                new_entries.append({
+                    'path': rel_path, 'dataset': dataset_id, 'date': day, 'campaign': campaign, 'rows': int(len(rows)),
+                    'min': {col: str(part[col].min()) for col in part.columns},
+                    'max': {col: str(part[col].max()) for col in part.columns},
+                    'agents': sorted(map(str, part['full_name'].dropna().unique())) if 'full_name' in part.columns else [],
+                })
+            self._save_manifest(partitions + new_entries)
+            return len(new_entries)
+
+    def partitions(self, start=None, end=None, agents: Optional[Iterable[str]] = None,
+                   campaigns: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Return the manifest entries overlapping [start, end] (inclusive dates) and the given agents/campaigns."""
+        start, end = _day(start), _day(end)
+        agents = set(agents) if agents else None
+        campaigns = set(map(str, campaigns)) if campaigns else None
+        selected = []
+        for entry in self.manifest():
+            if (start and entry['date'] < start) or (end and entry['date'] > end):
+                continue
+            if campaigns and entry['campaign'] is not None and entry['campaign'] not in campaigns:
+                continue
+            if agents and agents.isdisjoint(entry['agents']):
+                continue
+            selected.append(entry)
+        return selected
+
+    def read(self, start=None, end=None, agents: Optional[Iterable[str]] = None,
+             campaigns: Optional[Iterable[str]] = None, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Return the stored calls between `start` and `end` (inclusive) for `agents`/`campaigns`.
+
+        Only partitions kept by `partitions` are opened; agent and campaign filters are then
+        applied to their rows.
+        """
+        entries = self.partitions(start, end, agents, campaigns)
+        if not entries:
+            return None
+        paths = [os.path.join(self.directory, entry['path']) for entry in entries]
+        schema = pa.unify_schemas([pq.read_schema(path) for path in paths], promote_options='permissive')
+        dataset = pads.dataset(paths, schema=schema, format='parquet')
+        condition = None
+        if agents:
+            condition = pads.field('full_name').isin(list(agents))
+        if campaigns and 'campaign_id' in schema.names:
+            in_campaigns = pads.field('campaign_id').cast(pa.string()).isin(list(map(str, campaigns)))
+            condition = in_campaigns if condition is None else condition & in_campaigns
+        df = dataset.to_table(columns=columns, filter=condition).to_pandas()
+        return df.sort_values('call_dateTime', kind='stable', ignore_index=True) if 'call_dateTime' in df.columns else df
+
+    def date_bounds(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Return the first and last stored call dates, or None if the store is empty."""
+        dates = [entry['date'] for entry in self.manifest()]
+        return (pd.Timestamp(min(dates)).date(), pd.Timestamp(max(dates)).date()) if dates else None
+
+    def agents(self) -> List[str]:
+        """Return every agent name in the store."""
+        return sorted(set().union(*(entry['agents'] for entry in self.manifest())))
+
+    def query_version(self, start=None, end=None, agents: Optional[Iterable[str]] = None) -> str:
+        """Return a cache key for a read: the manifest version plus the query."""
+        query = json.dumps([self.version(), _day(start), _day(end), sorted(agents or [])])
+        return hashlib.sha1(query.encode()).hexdigest()[:16]
+
+@st.cache_resource
+def get_call_store() -> CallStore:
+    """Return the process-wide call store shared by all sessions."""
+    return CallStore()
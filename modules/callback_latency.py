@@ -0,0 +1,60 @@
+import pandas as pd
+from typing import Optional
+import streamlit as st
+
+FAILED_OUTCOMES = ['Dropped', 'No Answer', 'Busy']
+GROUP_COLUMNS = {'Campaign': 'campaign_id', 'Agent': 'full_name', 'Hour': 'hour'}
+
+@st.cache_data
+def callback_events(_df: pd.DataFrame, version: str) -> Optional[pd.DataFrame]:
+    """For every dropped / unanswered attempt, find the next attempt and the next answered attempt to the same number.
+
+    Both lookups are forward as-of joins on call time by phone number. `_df` is not hashed:
+    results are cached per dataset `version` (see `data_loader.dataset_version`).
+    """
+    df = _df
+    if 'phone_number_dialed' not in df.columns or 'call_dateTime' not in df.columns:
+        return None
+    cols = [c for c in ['phone_number_dialed', 'call_dateTime', 'call_outcome', 'full_name', 'campaign_id', 'hour'] if c in df.columns]
+    calls = df[cols].dropna(subset=['phone_number_dialed', 'call_dateTime'])
+    if pd.api.types.is_numeric_dtype(calls['phone_number_dialed']):
+        calls = calls.assign(phone_number_dialed=calls['phone_number_dialed'].astype('int64'))
+    else:
+        calls = calls.assign(phone_number_dialed=calls['phone_number_dialed'].astype(str).str.strip())
+    if 'campaign_id' not in calls.columns:
+        calls['campaign_id'] = 'Unknown'
+    if 'hour' not in calls.columns:
+        calls['hour'] = calls['call_dateTime'].dt.hour
+    calls = calls.sort_values('call_dateTime', kind='mergesort')
+
+    failed = calls[calls['call_outcome'].isin(FAILED_OUTCOMES)]
+    if failed.empty:
+        return None
+    attempts = calls[['phone_number_dialed', 'call_dateTime', 'call_outcome', 'full_name']].rename(columns={
+        'call_dateTime': 'next_attempt_time', 'call_outcome': 'next_outcome', 'full_name': 'next_agent'})
+    answers = calls.loc[calls['call_outcome'] == 'Answered', ['phone_number_dialed', 'call_dateTime', 'full_name']].rename(columns={
+        'call_dateTime': 'next_answer_time', 'full_name': 'answer_agent'})
+    events = pd.merge_asof(failed, attempts, left_on='call_dateTime', right_on='next_attempt_time',
+                           by='phone_number_dialed', direction='forward', allow_exact_matches=False)
+    events = pd.merge_asof(events, answers, left_on='call_dateTime', right_on='next_answer_time',
+                           by='phone_number_dialed', direction='forward', allow_exact_matches=False)
+    events['minutes_to_next_attempt'] = (events['next_attempt_time'] - events['call_dateTime']).dt.total_seconds() / 60
+    events['minutes_to_answer'] = (events['next_answer_time'] - events['call_dateTime']).dt.total_seconds() / 60
+    return events.reset_index(drop=True)
+
+def latency_summary(events: pd.DataFrame, by: str = 'campaign_id') -> pd.DataFrame:
+    """Aggregate callback latency distributions (count, reach rates, mean/median/p90 minutes) per `by` column."""
+    grouped = events.groupby(by, sort=True, observed=True)
+    summary = grouped.agg(
+        failed_attempts=('call_dateTime', 'size'),
+        reattempted=('next_attempt_time', 'count'),
+        answered_later=('next_answer_time', 'count'),
+        avg_minutes_to_next_attempt=('minutes_to_next_attempt', 'mean'),
+        median_minutes_to_next_attempt=('minutes_to_next_attempt', 'median'),
+        avg_minutes_to_answer=('minutes_to_answer', 'mean'),
+        median_minutes_to_answer=('minutes_to_answer', 'median'))
+    summary['p90_minutes_to_next_attempt'] = grouped['minutes_to_next_attempt'].quantile(0.9)
+    summary['p90_minutes_to_answer'] = grouped['minutes_to_answer'].quantile(0.9)
+    summary['reattempt_rate'] = summary['reattempted'] / summary['failed_attempts'] * 100
+    summary['reach_rate'] = summary['answered_later'] / summary['failed_attempts'] * 100
+    return summary.reset_index()
@@ -0,0 +1,197 @@
+import argparse
+import importlib.util
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+BACKENDS = ('pandas', 'polars')
+# 'auto' keeps pandas for small dumps (conversion overhead dominates) and uses Polars from
+# POLARS_MIN_ROWS rows; 'pandas' or 'polars' pins the engine. Polars uses every core unless
+# POLARS_MAX_THREADS is set
+COMPUTE_BACKEND = os.environ.get('CALLCENTER_COMPUTE_BACKEND', 'auto')
+POLARS_MIN_ROWS = int(os.environ.get('CALLCENTER_POLARS_MIN_ROWS', 200_000))
+# Checked in order, so the first matching keyword wins ('NO ANSWER' before the 'ANSWER' it contains)
+OUTCOME_KEYWORDS = [('NO ANSWER', 'No Answer'), ('ANSWER', 'Answered'), ('DROP', 'Dropped'), ('BUSY', 'Busy')]
+AGGREGATIONS = ('size', 'count', 'sum', 'mean', 'median', 'std', 'min', 'max', 'nunique')
+
+# Polars copies of the columns of each live pandas frame (by id, dropped when the frame is freed)
+_polars_columns: Dict[int, Dict[str, object]] = {}
+_polars_lock = threading.Lock()
+
+def polars_available() -> bool:
+    """Return True when Polars is installed; it is imported on first use."""
+    return importlib.util.find_spec('polars') is not None
+
+def resolve(df: pd.DataFrame, backend: Optional[str] = None) -> str:
+    """Return the engine to run on `df`: `backend` (default `COMPUTE_BACKEND`), with 'auto' picked by row count.
+
+    Polars falls back to pandas when it is not installed.
+    """
+    backend = backend or COMPUTE_BACKEND
+    if backend not in BACKENDS + ('auto',):
+        raise ValueError(f"unknown compute backend {backend!r}; expected one of {', '.join(BACKENDS)} or 'auto'")
+    if backend == 'auto':
+        backend = 'polars' if len(df) >= POLARS_MIN_ROWS else 'pandas'
+    return backend if backend == 'pandas' or polars_available() else 'pandas'
+
+def _to_polars(df: pd.DataFrame, columns: Sequence[str]):
+    """Return `columns` of `df` as a Polars LazyFrame, converting each column only once per frame.
+
+    Every query on a dataset (all the aggregates of all the analyses run on it) reuses the
+    converted columns, so `pl.from_pandas` is paid once. Frames are treated as immutable, like the
+    shared frames of `dataset_store`: a column replaced in place is not converted again.
+    """
+    import polars as pl
+    columns = list(dict.fromkeys(columns))
+    with _polars_lock:
+        converted = _polars_columns.get(id(df))
+        if converted is None:
+            converted = _polars_columns[id(df)] = {}
+            weakref.finalize(df, _polars_columns.pop, id(df), None)
+        missing = [col for col in columns if col not in converted]
+        if missing:
+            new = pl.from_pandas(df[missing])
+            converted.update({col: new.get_column(col) for col in missing})
+        return pl.DataFrame([converted[col] for col in columns]).lazy()
+
+def aggregate(df: pd.DataFrame, by: Sequence[str], aggs: Dict[str, Tuple[str, str]],
+              where: Optional[Tuple[str, object]] = None, backend: Optional[str] = None) -> pd.DataFrame:
+    """Group `df` by `by` and return one column per `aggs` entry (`name: (column, AGGREGATIONS item)`).
+
+    `where` keeps only rows with `column == value` first. Same semantics on both engines as a
+    default pandas groupby: rows with a null key are dropped, groups are sorted by key and `std`
+    uses ddof=1. An empty `by` aggregates the whole frame into one row.
+    """
+    by = list(by)
+    columns = by + [col for col, _ in aggs.values()] + ([where[0]] if where else [])
+    if resolve(df, backend) == 'pandas':
+        data = df[list(dict.fromkeys(columns))]
+        if where:
+            data = data[data[where[0]] == where[1]]
+        if not by:
+            return pd.DataFrame({name: [len(data) if func == 'size' else data[col].agg(func)] for name, (col, func) in aggs.items()})
+        return data.groupby(by).agg(**{name: (col, func) for name, (col, func) in aggs.items()})
+
+    import polars as pl
+    data = _to_polars(df, columns)
+    if where:
+        data = data.filter(pl.col(where[0]) == where[1])
+    exprs = [pl.len().alias(name) if func == 'size' else (pl.col(col).n_unique() if func == 'nunique' else getattr(pl.col(col), func)()).alias(name)
+             for name, (col, func) in aggs.items()]
+    if not by:
+        return data.select(exprs).collect().to_pandas()
+    # pandas' nunique ignores nulls
+    exprs = [pl.col(col).drop_nulls().n_unique().alias(name) if func == 'nunique' else expr
+             for expr, (name, (col, func)) in zip(exprs, aggs.items())]
+    result = data.drop_nulls(by).group_by(by).agg(exprs).sort(by).collect().to_pandas()
+    for name, (_, func) in aggs.items():
+        if func in ('size', 'count', 'nunique'):
+            result[name] = result[name].astype('int64')
+    if len(by) > 1:
+        return result.set_index(by)
+    # set_index would widen a numeric key such as the int32 `hour`; keep the dtype pandas groups by
+    result.index = pd.Index(result.pop(by[0]), dtype=df[by[0]].dtype, name=by[0])
+    return result
+
+def quantiles(df: pd.DataFrame, column: str, qs: Sequence[float], where: Optional[Tuple[str, object]] = None,
+              backend: Optional[str] = None) -> List[float]:
+    """Return the linear-interpolated quantiles `qs` of `df[column]`, ignoring nulls.
+
+    `where` keeps only rows with `column == value` first, as in `aggregate`.
+    """
+    if resolve(df, backend) == 'pandas':
+        values = df.loc[df[where[0]] == where[1], column] if where else df[column]
+        return [values.quantile(q) for q in qs]
+    import polars as pl
+    data = _to_polars(df, [column] + ([where[0]] if where else []))
+    if where:
+        data = data.filter(pl.col(where[0]) == where[1])
+    result = data.select([pl.col(column).quantile(q, interpolation='linear').alias(str(i)) for i, q in enumerate(qs)]).collect()
+    return list(result.row(0))
+
+def categorize_outcomes(status: pd.Series, backend: Optional[str] = None) -> pd.Series:
+    """Map dialer status strings to call outcomes by `OUTCOME_KEYWORDS`; nulls are 'Unknown', the rest 'Other'."""
+    if resolve(status.to_frame(), backend) == 'pandas':
+        text = status.astype(str)
+        conditions = [status.isna().to_numpy()] + [text.str.contains(key, regex=False).to_numpy() for key, _ in OUTCOME_KEYWORDS]
+        outcomes = np.select(conditions, ['Unknown'] + [outcome for _, outcome in OUTCOME_KEYWORDS], default='Other')
+        return pd.Series(outcomes, index=status.index, name=status.name)
+    import polars as pl
+    values = pl.from_pandas(status.rename('status')).to_frame().lazy()
+    expr = pl.when(pl.col('status').is_null()).then(pl.lit('Unknown'))
+    for key, outcome in OUTCOME_KEYWORDS:
+        expr = expr.when(pl.col('status').cast(pl.String).str.contains(key, literal=True)).then(pl.lit(outcome))
+    outcomes = values.select(expr.otherwise(pl.lit('Other'))).collect().to_series().to_numpy()
+    return pd.Series(outcomes.astype(object), index=status.index, name=status.name)
+
+def profile(df: pd.DataFrame, backends: Sequence[str] = BACKENDS, repeat: int = 3) -> pd.DataFrame:
+    """Time preprocessing and each cached analysis on `df` per backend and check the results match pandas.
+
+    Returns one row per (step, backend) with the best of `repeat` wall times in seconds and
+    whether the result equals the pandas one.
+    """
+    from modules import agent_analysis, anomaly, eda, preprocessing, time_analysis
+    steps = {
+        'preprocess_data': lambda data, b: preprocessing.preprocess_data.__wrapped__(data.copy(), backend=b),
+        'overview_stats': lambda data, b: eda.overview_stats.__wrapped__(data, backend=b),
+        'agent_performance': lambda data, b: agent_analysis.agent_performance.__wrapped__(data, backend=b),
+        'time_patterns': lambda data, b: time_analysis.time_patterns.__wrapped__(data, backend=b),
+        'detect_anomalies': lambda data, b: anomaly.detect_anomalies.__wrapped__(data, n=10, backend=b),
+    }
+    preprocessed = steps['preprocess_data'](df, 'pandas')
+    rows = []
+    for step, run in steps.items():
+        data = df if step == 'preprocess_data' else preprocessed
+        reference = None
+        for backend in backends:
+            if backend == 'polars' and not polars_available():
+                rows.append({'step': step, 'backend': backend, 'seconds': None, 'matches_pandas': None})
+                continue
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = run(data, backend)
+                timings.append(time.perf_counter() - start)
+            reference = result if backend == 'pandas' else reference
+            rows.append({'step': step, 'backend': backend, 'seconds': min(timings),
+                         'matches_pandas': None if reference is None else backend == 'pandas' or _equal(result, reference)})
+    return pd.DataFrame(rows)
+
+def _equal(a, b) -> bool:
+    """Compare analysis results (frames, series, tuples and dicts of them) up to float rounding."""
+    if isinstance(a, (tuple, list)):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    try:
+        if isinstance(a, pd.DataFrame):
+            pd.testing.assert_frame_equal(a, b)
+        elif isinstance(a, pd.Series):
+            pd.testing.assert_series_equal(a, b)
+        elif isinstance(a, float):
+            return np.isclose(a, b, equal_nan=True)
+        else:
+            return a == b
+    except AssertionError:
+        return False
+    return True
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Profile the analytics modules on a dump with each compute backend.")
+    parser.add_argument('file', help="call data dump (CSV or Excel)")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS, help="backends to compare")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per step (the best is reported)")
+    args = parser.parse_args(argv)
+    from modules import data_loader, sanitizer
+    df, _ = sanitizer.sanitize(data_loader.read_file(args.file))
+    print(f"{len(df):,} rows; configured backend '{COMPUTE_BACKEND}' runs this dump on {resolve(df)} "
+          f"(polars {'installed' if polars_available() else 'not installed'}, auto threshold {POLARS_MIN_ROWS:,} rows)")
+    results = profile(df, args.backends, args.repeat)
+    print(results.to_string(index=False, float_format=lambda s: f"{s:.3f}"))
+
+if __name__ == '__main__':
+    main()
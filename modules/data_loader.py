@@ -1,16 +1,52 @@
+import hashlib
+import io
+import os
 import pandas as pd
 import streamlit as st
-from typing import Optional
+from typing import Optional, Tuple
+from modules import call_store
+
+def read_file(source) -> pd.DataFrame:
+    """Read a CSV or Excel dump ('Sheet1') from a path or a file object with a `name`; raises on failure."""
+    name = source if isinstance(source, str) else source.name
+    if name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(source, sheet_name='Sheet1')
+    return pd.read_csv(source)
 
 @st.cache_data
 def load_data(uploaded_file) -> Optional[pd.DataFrame]:
     """Load CSV or Excel file from Streamlit uploader with error handling and caching. Always load 'Sheet1' for Excel files."""
     try:
-        if uploaded_file.name.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(uploaded_file, sheet_name='Sheet1')
-        else:
-            df = pd.read_csv(uploaded_file)
-        return df
+        return read_file(uploaded_file)
     except Exception as e:
         st.error(f"❌ Error loading file: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+@st.cache_resource
+def read_asset(path: str) -> Optional[bytes]:
+    """Return the contents of a static file (CSS, bundled sample data), read from disk once per process."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+@st.cache_data
+def load_sample_data(path: str) -> Optional[pd.DataFrame]:
+    """Load the bundled sample CSV from its cached bytes."""
+    data = read_asset(path)
+    return pd.read_csv(io.BytesIO(data)) if data is not None else None
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """Return a short content fingerprint of a loaded dataset, used to key per-dataset caches."""
+    digest = hashlib.sha1(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+@st.cache_data
+def load_call_history(start, end, agents: Tuple[str, ...], store_version: str) -> Optional[pd.DataFrame]:
+    """Load stored calls between `start` and `end` (inclusive) for `agents` (all agents if empty).
+
+    Only the call-store partitions overlapping the query are read; `store_version` keys the cache
+    to the store manifest so newly stored dumps are picked up.
+    """
+    return call_store.get_call_store().read(start, end, agents or None)
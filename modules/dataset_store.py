@@ -0,0 +1,126 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+from modules import app_dirs
+
+# Full preprocessed dumps (phone numbers, agent names): kept in a directory only the dashboard user can read
+STORE_DIR = os.environ.get('CALLCENTER_STORE_DIR', os.path.join(app_dirs.APP_DATA_DIR, 'datasets'))
+MAX_OPEN_DATASETS = int(os.environ.get('CALLCENTER_MAX_OPEN_DATASETS', 8))
+# Least recently used Arrow files are deleted once the store holds more than this
+MAX_STORE_BYTES = int(float(os.environ.get('CALLCENTER_MAX_STORE_GB', 20)) * 2**30)
+
+def to_arrow(df: pd.DataFrame, preserve_index: bool = False) -> pa.Table:
+    """Convert a frame to an Arrow table, storing raw-dump columns that mix numbers and text as text."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=preserve_index)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        mixed = {
+            col: df[col].astype(str).where(df[col].notna())
+            for col in df.columns
+            if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')
+        }
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=preserve_index)
+
+class DatasetStore:
+    """Process-wide registry of preprocessed datasets backed by memory-mapped Arrow IPC files.
+
+    Each dataset is written once to `<directory>/<dataset_id>.arrow` and opened with a memory
+    map, so numeric columns are zero-copy views of the page cache and every session referencing
+    the same `dataset_id` shares one frame. At most `max_open` frames stay open; older ones are
+    re-mapped from disk on the next request. Files beyond `max_bytes` in total are evicted least
+    recently used first, except those of open frames.
+    """
+
+    def __init__(self, directory: str = STORE_DIR, max_open: int = MAX_OPEN_DATASETS, max_bytes: int = MAX_STORE_BYTES):
+        self.directory = directory
+        self.max_open = max_open
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        app_dirs.private_dir(directory)
+
+    def _path(self, dataset_id: str) -> str:
+        return os.path.join(self.directory, f"{dataset_id}.arrow")
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._frames or os.path.exists(self._path(dataset_id))
+
+    def put(self, dataset_id: str, df: pd.DataFrame) -> str:
+        """Persist `df` under `dataset_id` (no-op if already stored) and return the id."""
+        with self._lock:
+            path = self._path(dataset_id)
+            if not os.path.exists(path):
+                table = to_arrow(df)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                os.replace(tmp_path, path)
+                self.evict()
+            else:
+                os.utime(path)
+        return dataset_id
+
+    def get(self, dataset_id: Optional[str]) -> Optional[pd.DataFrame]:
+        """Return `dataset_id`'s frame, opening its memory map on first use.
+
+        The columns are shared with every other session, so the frame is a shallow copy: adding or
+        replacing columns stays local, but values must not be edited in place without `.copy()`.
+        """
+        if dataset_id is None:
+            return None
+        with self._lock:
+            path = self._path(dataset_id)
+            if dataset_id in self._frames:
+                self._frames.move_to_end(dataset_id)
+                df = self._frames[dataset_id]
+            elif os.path.exists(path):
+                with pa.memory_map(path, 'r') as source:
+                    table = pa.ipc.open_file(source).read_all()
+                df = table.to_pandas(split_blocks=True)
+                self._remember(dataset_id, df)
+            else:
+                return None
+            # The file's mtime is its last use, for eviction
+            if os.path.exists(path):
+                os.utime(path)
+            return df.copy(deep=False)
+
+    def _remember(self, dataset_id: str, df: pd.DataFrame) -> None:
+        self._frames[dataset_id] = df
+        self._frames.move_to_end(dataset_id)
+        while len(self._frames) > self.max_open:
+            self._frames.popitem(last=False)
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete the least recently used Arrow files beyond `max_bytes` (default `self.max_bytes`); return how many were deleted."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        files = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith('.arrow')),
+                       key=lambda entry: entry.stat().st_mtime, reverse=True)
+        kept, deleted = 0, 0
+        for entry in files:
+            size = entry.stat().st_size
+            # The most recently used file is always kept, so a fresh dataset is never evicted by its own put
+            if kept and kept + size > max_bytes and entry.name[:-len('.arrow')] not in self._frames:
+                os.remove(entry.path)
+                deleted += 1
+            else:
+                kept += size
+        return deleted
+
+    def paths(self, dataset_ids: Optional[list] = None) -> list:
+        """Return the Arrow file paths of `dataset_ids` (default: every persisted dataset)."""
+        ids = self.datasets() if dataset_ids is None else dataset_ids
+        return [self._path(dataset_id) for dataset_id in ids if os.path.exists(self._path(dataset_id))]
+
+    def datasets(self) -> list:
+        """Return the ids of all datasets persisted in the store directory."""
+        return sorted(name[:-len('.arrow')] for name in os.listdir(self.directory) if name.endswith('.arrow'))
+
+@st.cache_resource
+def get_store() -> DatasetStore:
+    """Return the process-wide dataset store shared by all sessions."""
+    return DatasetStore()
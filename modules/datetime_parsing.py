@@ -0,0 +1,102 @@
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Tuple
+from pandas.tseries.api import guess_datetime_format
+
+SAMPLE_SIZE = 500
+BLANK_VALUES = ['', 'nan', 'NaN', 'NaT', 'None', 'null']
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d', '%d.%m.%Y', '%Y%m%d']
+TIME_FORMATS = ['%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p', '%H%M%S']
+CLOCK_PATTERN = r'\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?'
+DATETIME_FORMATS = [f"{d} {t}" for d in DATE_FORMATS for t in TIME_FORMATS[:2]] + DATE_FORMATS
+
+def _strings(values: pd.Index) -> pd.Index:
+    return pd.Index(values).astype(str).str.strip()
+
+def infer_format(values: Iterable, candidates: Iterable[str] = DATETIME_FORMATS) -> Optional[str]:
+    """Return the format that parses the most of a sample of `values`, or None if none parses any.
+
+    Candidates are pandas' guesses for a few sample values followed by `candidates`; each is tried
+    on up to `SAMPLE_SIZE` values, so the cost does not grow with the column.
+    """
+    sample = _strings(pd.Index(values).dropna()[:SAMPLE_SIZE])
+    sample = sample[sample != '']
+    if sample.empty:
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # dayfirst hints; every guess is validated on the sample below
+        guesses = [guess_datetime_format(value) for value in sample[:20]]
+    best, best_count = None, 0
+    for fmt in dict.fromkeys([g for g in guesses if g] + list(candidates)):
+        count = pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best
+
+def _missing(codes: np.ndarray, strings: pd.Index) -> np.ndarray:
+    """Rows whose input is null or blank (these are reported as missing, not unparseable)."""
+    blank = np.append(strings.isin(BLANK_VALUES), True)
+    return blank[codes]
+
+def _report(parsed: pd.Series, missing: np.ndarray, fmt: Optional[str]) -> Dict:
+    return {
+        'rows': int(len(parsed)),
+        'missing': int(missing.sum()),
+        'unparseable': int((parsed.isna().to_numpy() & ~missing).sum()),
+        'format': fmt,
+    }
+
+def _broadcast(codes: np.ndarray, parsed: np.ndarray, missing) -> np.ndarray:
+    # Code -1 (null input) picks the appended NaT
+    return np.append(parsed, missing)[codes]
+
+def _parse_datetimes(values: pd.Series, candidates: Iterable[str]) -> Tuple[pd.Series, np.ndarray, Optional[str]]:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, values.isna().to_numpy(), 'datetime64'
+    codes, uniques = pd.factorize(values)
+    strings = _strings(uniques)
+    fmt = infer_format(strings, candidates)
+    parsed = pd.to_datetime(strings, format=fmt or 'mixed', errors='coerce').to_numpy(dtype='datetime64[ns]')
+    result = pd.Series(_broadcast(codes, parsed, np.datetime64('NaT', 'ns')), index=values.index, name=values.name)
+    return result, _missing(codes, strings), fmt
+
+def _parse_times(values: pd.Series) -> Tuple[pd.Series, np.ndarray, str]:
+    if pd.api.types.is_timedelta64_dtype(values):
+        return values, values.isna().to_numpy(), 'timedelta64'
+    codes, uniques = pd.factorize(values)
+    strings = _strings(uniques)
+    clock = np.asarray(strings.str.fullmatch(CLOCK_PATTERN), dtype=bool)
+    parsed = pd.to_timedelta(strings.where(clock), errors='coerce').to_numpy(dtype='timedelta64[ns]')
+    fmt = '%H:%M:%S'
+    failed = np.isnat(parsed) & ~strings.isin(BLANK_VALUES)
+    if failed.any():
+        # e.g. '02:15:07 PM' or full timestamps: parse as datetimes and keep the time of day
+        fmt = infer_format(strings[failed], TIME_FORMATS + DATETIME_FORMATS) or 'mixed'
+        as_datetime = pd.to_datetime(strings[failed], format=fmt, errors='coerce')
+        parsed[failed] = (as_datetime - as_datetime.normalize()).to_numpy(dtype='timedelta64[ns]')
+    result = pd.Series(_broadcast(codes, parsed, np.timedelta64('NaT', 'ns')), index=values.index, name=values.name)
+    return result, _missing(codes, strings), fmt
+
+def parse_datetimes(values: pd.Series, candidates: Iterable[str] = DATETIME_FORMATS) -> Tuple[pd.Series, Dict]:
+    """Parse a date or datetime column, converting each distinct value once; return (datetimes, report).
+
+    The report counts `missing` (null/blank) and `unparseable` rows separately and names the
+    inferred `format`; unparseable values become NaT.
+    """
+    result, missing, fmt = _parse_datetimes(values, candidates)
+    return result, _report(result, missing, fmt)
+
+def parse_times(values: pd.Series) -> Tuple[pd.Series, Dict]:
+    """Parse a time-of-day column into timedeltas since midnight, converting each distinct value once."""
+    result, missing, fmt = _parse_times(values)
+    return result, _report(result, missing, fmt)
+
+def combine_date_time(dates: pd.Series, times: pd.Series) -> Tuple[pd.Series, Dict]:
+    """Combine separate date and time columns as parsed date + parsed time-of-day, without building strings."""
+    date_part, date_missing, date_fmt = _parse_datetimes(dates, DATE_FORMATS + DATETIME_FORMATS)
+    time_part, time_missing, time_fmt = _parse_times(times)
+    combined = date_part.dt.normalize() + time_part
+    return combined, _report(combined, date_missing | time_missing, f"{date_fmt} + {time_fmt}")
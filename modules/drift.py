@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+import streamlit as st
+from modules import agent_kpis
+
+BASELINE_DAYS = 14
+MIN_BASELINE_DAYS = 5
+MIN_DAILY_CALLS = 3
+CUSUM_K = 1.0
+CUSUM_H = 8.0
+# (scope, group column, kpi, sigma floor): the floor keeps near-constant baselines (e.g. a 0% drop
+# rate) from turning a single bad day into a huge z-score
+SERIES = [
+    ('Agent', 'full_name', 'AHT (min)', 0.25),
+    ('Agent', 'full_name', 'Drop Rate (%)', 2.0),
+    ('Hour slot', 'hour', 'AHT (min)', 0.25),
+    ('Hour slot', 'hour', 'Drop Rate (%)', 2.0),
+]
+
+def cusum(values: np.ndarray, counts: np.ndarray, baseline_days: int = BASELINE_DAYS, k: float = CUSUM_K,
+          h: float = CUSUM_H, sigma_floor=0.0) -> Dict[str, np.ndarray]:
+    """One-sided (upward) CUSUM over every row of a (series x days) array at once; NaN marks no data.
+
+    Each row's baseline is the call-weighted mean of its first `baseline_days` observed days (at
+    most half of them), and each day is standardised by its own standard error (per-call spread over
+    the baseline / sqrt of that day's calls, floored at `sigma_floor`), so quiet days count for
+    less. Then `S_t = max(0, S_{t-1} + z_t - k)` is updated for all rows per day (days without data
+    leave S unchanged). A row alarms when S exceeds `h`; the shift is taken to start on the first
+    day of that excursion above zero. Returns per-row `mu`, `sigma` (per call), `score` (final S),
+    `start` and `alarm` (day indexes of the current excursion, -1 if none) and `active` (still
+    alarmed on the last day).
+    """
+    n, n_days = values.shape
+    observed = ~np.isnan(values)
+    # At most half of a row's observed days form its baseline, so short dumps still have days to monitor
+    limit = np.minimum(baseline_days, observed.sum(axis=1) // 2)
+    in_baseline = observed & (np.cumsum(observed, axis=1) <= limit[:, None])
+    usable = limit >= MIN_BASELINE_DAYS
+    weights = np.where(in_baseline, counts, 0.0)
+    x = np.nan_to_num(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu = (weights * x).sum(axis=1) / weights.sum(axis=1)
+        # Var(day mean) ~ sigma^2 / calls, so calls * squared deviation estimates the per-call variance
+        sigma = np.sqrt((weights * (x - mu[:, None]) ** 2).sum(axis=1) / in_baseline.sum(axis=1))
+        day_sigma = np.fmax(sigma[:, None] / np.sqrt(counts), np.reshape(sigma_floor, (-1, 1)))
+        z = (values - mu[:, None]) / day_sigma
+    step = observed & ~in_baseline & usable[:, None]
+
+    score = np.zeros(n)
+    start = np.full(n, -1)
+    alarm = np.full(n, -1)
+    for t in range(n_days):
+        s = np.where(step[:, t], np.maximum(score + z[:, t] - k, 0.0), score)
+        began = (score == 0) & (s > 0)
+        start[began] = t
+        alarm[(s > h) & (alarm < 0)] = t
+        reset = s == 0
+        start[reset] = -1
+        alarm[reset] = -1
+        score = s
+    return {'mu': mu, 'sigma': sigma, 'score': score, 'start': start, 'alarm': alarm, 'active': alarm >= 0}
+
+def _kpi(daily: Dict[str, np.ndarray], kpi: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Daily AHT or drop rate per series and the calls behind it, NaN on days with too few calls to judge."""
+    numerator, counts = (daily['talk_min'], daily['answered']) if kpi == 'AHT (min)' else (daily['dropped'] * 100, daily['calls'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts >= MIN_DAILY_CALLS, numerator / counts, np.nan), counts
+
+@st.cache_data
+def drift_shifts(_df: pd.DataFrame, version: str, baseline_days: int = BASELINE_DAYS,
+                 k: float = CUSUM_K, h: float = CUSUM_H) -> Optional[pd.DataFrame]:
+    """Return the upward KPI shifts still in progress for agents and hourly slots, most severe first.
+
+    Daily AHT and drop rate for every agent and every hour-of-day slot are stacked into one
+    (series x days) array and run through `cusum` together. Each row gives where the shift is
+    (`scope`, `series`, `kpi`), when it began (`shift_start`) and was confirmed (`detected`), and the
+    `baseline` and `current` (call-weighted since the start) levels. Cached per dataset `version`.
+    """
+    required = {'full_name', 'hour', 'call_dateTime', 'call_outcome', 'length_in_min'}
+    if not required.issubset(_df.columns):
+        return None
+    matrices = {col: agent_kpis.daily_matrix(_df, col) for col in ('full_name', 'hour')}
+    if any(m is None for m in matrices.values()):
+        return None
+    dates = matrices['full_name'][1]
+    blocks, weights, floors, labels = [], [], [], []
+    for scope, col, kpi, floor in SERIES:
+        names, _, daily = matrices[col]
+        values, counts = _kpi(daily, kpi)
+        blocks.append(values)
+        weights.append(counts)
+        floors.append(np.full(len(names), floor))
+        series = [f"{int(n):02d}:00" for n in names] if col == 'hour' else list(names)
+        labels.extend((scope, name, kpi) for name in series)
+    values, counts = np.vstack(blocks), np.vstack(weights)
+    result = cusum(values, counts, baseline_days, k, h, np.concatenate(floors))
+
+    rows = np.flatnonzero(result['active'])
+    if rows.size == 0:
+        return pd.DataFrame(columns=['scope', 'series', 'kpi', 'shift_start', 'detected', 'baseline', 'current', 'change', 'cusum'])
+    start = result['start'][rows]
+    since_start = (np.arange(values.shape[1]) >= start[:, None]) & ~np.isnan(values[rows])
+    w = np.where(since_start, counts[rows], 0.0)
+    current = (w * np.nan_to_num(values[rows])).sum(axis=1) / w.sum(axis=1)
+    baseline = result['mu'][rows]
+    shifts = pd.DataFrame([labels[r] for r in rows], columns=['scope', 'series', 'kpi'])
+    shifts = shifts.assign(
+        shift_start=dates[start], detected=dates[result['alarm'][rows]],
+        baseline=baseline, current=current, change=current - baseline, cusum=result['score'][rows])
+    return shifts.sort_values('cusum', ascending=False).reset_index(drop=True)
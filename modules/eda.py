@@ -1,28 +1,43 @@
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import streamlit as st
+from modules import compute_backend
+
+def _mode(df: pd.DataFrame, col: str, backend: str):
+    """Most frequent value of `col` (the smallest on ties, like `Series.mode()[0]`), None if all null."""
+    if col not in df.columns:
+        return None
+    sizes = compute_backend.aggregate(df, [col], {'calls': (col, 'size')}, backend=backend)['calls']
+    return sizes.idxmax() if not sizes.empty else None
 
 @st.cache_data
-def overview_stats(df: pd.DataFrame) -> Dict[str, Any]:
-    """Compute detailed overview statistics and call outcome distribution."""
-    answered_df = df[df['call_outcome'] == 'Answered']
+def overview_stats(df: pd.DataFrame, backend: Optional[str] = None) -> Dict[str, Any]:
+    """Compute detailed overview statistics and call outcome distribution on the configured compute backend."""
+    backend = compute_backend.resolve(df, backend)
+    talk = compute_backend.aggregate(df, [], {
+        'answered': ('length_in_min', 'size'), 'mean': ('length_in_min', 'mean'), 'sum': ('length_in_min', 'sum'),
+        'min': ('length_in_min', 'min'), 'max': ('length_in_min', 'max'), 'median': ('length_in_min', 'median'),
+    }, where=('call_outcome', 'Answered'), backend=backend).iloc[0]
+    answered_any = talk['answered'] > 0
     total_calls = len(df)
-    avg_talk_time = answered_df['length_in_min'].mean()
-    total_talk_time = answered_df['length_in_min'].sum()
-    unique_agents = df['full_name'].nunique()
+    avg_talk_time = talk['mean'] if answered_any else float('nan')
+    total_talk_time = talk['sum'] if answered_any else 0.0
+    unique_agents = int(compute_backend.aggregate(df, [], {'agents': ('full_name', 'nunique')}, backend=backend).iloc[0]['agents'])
     date_range = (df['date'].min(), df['date'].max())
-    outcome_dist = df['call_outcome'].value_counts(normalize=True) * 100
-    outcome_counts = df['call_outcome'].value_counts()
-    min_talk_time = answered_df['length_in_min'].min() if not answered_df.empty else 0
-    max_talk_time = answered_df['length_in_min'].max() if not answered_df.empty else 0
-    median_talk_time = answered_df['length_in_min'].median() if not answered_df.empty else 0
+    # Sorted by key first, so equal counts keep a stable (alphabetical) order on every backend
+    outcome_counts = compute_backend.aggregate(df, ['call_outcome'], {'count': ('call_outcome', 'size')}, backend=backend)['count']
+    outcome_counts = outcome_counts.sort_values(ascending=False, kind='stable')
+    outcome_dist = (outcome_counts / outcome_counts.sum() * 100).rename('proportion')
+    min_talk_time = talk['min'] if answered_any else 0
+    max_talk_time = talk['max'] if answered_any else 0
+    median_talk_time = talk['median'] if answered_any else 0
     answered_count = outcome_counts.get('Answered', 0)
     dropped_count = outcome_counts.get('Dropped', 0)
     answered_rate = outcome_dist.get('Answered', 0)
     dropped_rate = outcome_dist.get('Dropped', 0)
     # Busiest hour and day
-    busiest_hour = df['hour'].mode()[0] if 'hour' in df.columns and not df['hour'].isnull().all() else None
-    busiest_day = df['day_of_week'].mode()[0] if 'day_of_week' in df.columns and not df['day_of_week'].isnull().all() else None
+    busiest_hour = _mode(df, 'hour', backend)
+    busiest_day = _mode(df, 'day_of_week', backend)
     # Summary string
     summary = f"Total Calls: {total_calls:,}\n" \
               f"Answered: {answered_count:,} ({answered_rate:.1f}%) | Dropped: {dropped_count:,} ({dropped_rate:.1f}%)\n" \
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import pandas as pd
+import streamlit as st
+from modules import agent_analysis, anomaly, app_dirs, business_intel, eda, time_analysis
+
+EXPORT_DIR = os.environ.get('CALLCENTER_EXPORT_DIR', os.path.join(app_dirs.APP_DATA_DIR, 'exports'))
+EXPORT_WORKERS = int(os.environ.get('CALLCENTER_EXPORT_WORKERS', 2))
+# Least recently used report folders beyond this many are deleted
+MAX_EXPORTS = int(os.environ.get('CALLCENTER_MAX_EXPORTS', 20))
+FORMATS = {'pdf': 'PDF', 'xlsx': 'Excel', 'pptx': 'PowerPoint'}
+MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+}
+
+def _plain(text: str) -> str:
+    """Strip the HTML markup used by dashboard alerts for plain-text report output."""
+    return re.sub(r'<[^>]+>', '', str(text))
+
+def _latin1(text: str) -> str:
+    """Classic FPDF core fonts only cover Latin-1; drop emoji and other characters outside it."""
+    return _plain(text).encode('latin-1', 'ignore').decode('latin-1').strip()
+
+def _report_content(df: pd.DataFrame, version: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Collect every report section from the (cached) analytics modules."""
+    stats = eda.overview_stats(df)
+    agents = agent_analysis.agent_performance(df)
+    hourly_stats, daily_stats = time_analysis.time_patterns(df)
+    anomalies = anomaly.detect_anomalies(df, n=options.get('anomaly_rows', 25))
+    alerts = business_intel.executive_alerts(df, version)
+    campaigns = business_intel.campaign_analytics(df, version)
+    overview = pd.DataFrame([
+        ('Total Calls', f"{stats['total_calls']:,}"),
+        ('Unique Agents', stats['unique_agents']),
+        ('Date Range', f"{stats['date_range'][0]} to {stats['date_range'][1]}"),
+        ('Answered', f"{stats['answered_count']:,} ({stats['answered_rate']:.1f}%)"),
+        ('Dropped', f"{stats['dropped_count']:,} ({stats['dropped_rate']:.1f}%)"),
+        ('Avg Talk Time (min)', f"{stats['avg_talk_time']:.2f}"),
+        ('Median Talk Time (min)', f"{stats['median_talk_time']:.2f}"),
+        ('Total Talk Time (hrs)', f"{stats['total_talk_time'] / 60:.2f}"),
+        ('Busiest Hour', stats['busiest_hour']),
+        ('Busiest Day', stats['busiest_day']),
+    ], columns=['Metric', 'Value'])
+    leaderboard = agents[['full_name', 'total_calls', 'answer_rate', 'avg_talk_time_min', 'median_talk_time_min', 'rank_by_avg_talk_time']]
+    return {
+        'stats': stats,
+        'overview': overview,
+        'leaderboard': leaderboard,
+        'hourly': hourly_stats.reset_index(),
+        'daily': daily_stats.reset_index(),
+        'anomalies': anomalies if anomalies is not None else pd.DataFrame(),
+        'alerts': pd.DataFrame([[_plain(t), _plain(d), _plain(a)] for t, d, a in alerts], columns=['Alert', 'Detail', 'Action']),
+        'campaigns': campaigns['campaigns'] if campaigns else pd.DataFrame(),
+    }
+
+def _render_charts(content: Dict[str, Any], out_dir: str) -> Dict[str, str]:
+    """Render static PNG charts with matplotlib's object API (thread-safe, no pyplot state)."""
+    from matplotlib.figure import Figure
+
+    charts = {}
+    def save(name, title, draw):
+        fig = Figure(figsize=(8, 4), dpi=110)
+        ax = fig.add_subplot(111)
+        draw(ax)
+        ax.set_title(title)
+        fig.tight_layout()
+        path = os.path.join(out_dir, f"{name}.png")
+        fig.savefig(path)
+        charts[name] = path
+
+    outcome_counts = content['stats']['outcome_counts']
+    if not outcome_counts.empty:
+        save('outcomes', 'Call Outcomes', lambda ax: ax.pie(outcome_counts.values, labels=outcome_counts.index, autopct='%1.1f%%', wedgeprops={'width': 0.5}))
+    if not content['hourly'].empty:
+        save('hourly', 'Hourly Call Volume', lambda ax: ax.bar(content['hourly']['hour'], content['hourly']['total_calls'], color='#ff9800'))
+    if not content['daily'].empty:
+        save('daily', 'Daily Call Volume', lambda ax: ax.bar(content['daily']['day_of_week'].str[:3], content['daily']['total_calls'], color='#ff9800'))
+    top_agents = content['leaderboard'][content['leaderboard']['avg_talk_time_min'] > 0].head(15)
+    if not top_agents.empty:
+        save('agents', 'Agent AHT (min, best 15)', lambda ax: ax.barh(top_agents['full_name'].astype(str)[::-1], top_agents['avg_talk_time_min'][::-1], color='#4f8cff'))
+    return charts
+
+def _write_xlsx(content: Dict[str, Any], charts: Dict[str, str], path: str) -> None:
+    from openpyxl.drawing.image import Image
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        content['overview'].to_excel(writer, sheet_name='Overview', index=False)
+        content['leaderboard'].to_excel(writer, sheet_name='Agent Leaderboard', index=False)
+        content['hourly'].to_excel(writer, sheet_name='Hourly', index=False)
+        content['daily'].to_excel(writer, sheet_name='Daily', index=False)
+        content['anomalies'].to_excel(writer, sheet_name='Anomalies', index=False)
+        content['alerts'].to_excel(writer, sheet_name='Alerts', index=False)
+        if not content['campaigns'].empty:
+            content['campaigns'].to_excel(writer, sheet_name='Campaigns', index=False)
+        if charts:
+            sheet = writer.book.create_sheet('Charts')
+            for i, chart_path in enumerate(charts.values()):
+                sheet.add_image(Image(chart_path), f"A{1 + i * 24}")
+
+def _write_pdf(content: Dict[str, Any], charts: Dict[str, str], path: str) -> None:
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, 15)
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 18)
+    pdf.cell(0, 12, 'Call Center Analytics Report', 0, 1)
+    def heading(text):
+        pdf.set_font('Arial', 'B', 13)
+        pdf.cell(0, 10, _latin1(text), 0, 1)
+        pdf.set_font('Arial', '', 9)
+    def table(frame, columns, widths, rows=30):
+        pdf.set_font('Arial', 'B', 9)
+        for col, w in zip(columns, widths):
+            pdf.cell(w, 6, _latin1(col), 1, 0)
+        pdf.ln()
+        pdf.set_font('Arial', '', 8)
+        for _, row in frame.head(rows).iterrows():
+            for col, w in zip(columns, widths):
+                value = row[col]
+                pdf.cell(w, 6, _latin1(f"{value:.2f}" if isinstance(value, float) else value)[:int(w / 1.8)], 1, 0)
+            pdf.ln()
+    heading('Overview')
+    for _, row in content['overview'].iterrows():
+        pdf.cell(0, 6, _latin1(f"{row['Metric']}: {row['Value']}"), 0, 1)
+    for chart_path in charts.values():
+        if pdf.get_y() > 180:
+            pdf.add_page()
+        pdf.image(chart_path, x=10, w=180)
+    pdf.add_page()
+    heading('Agent Leaderboard (by AHT)')
+    table(content['leaderboard'], ['full_name', 'total_calls', 'answer_rate', 'avg_talk_time_min', 'median_talk_time_min'], [60, 25, 30, 35, 35])
+    pdf.add_page()
+    heading('Executive Alerts')
+    if content['alerts'].empty:
+        pdf.cell(0, 6, 'No critical issues detected.', 0, 1)
+    for _, row in content['alerts'].head(40).iterrows():
+        pdf.set_font('Arial', 'B', 9)
+        pdf.multi_cell(0, 5, _latin1(row['Alert']))
+        pdf.set_font('Arial', '', 9)
+        pdf.multi_cell(0, 5, _latin1(f"{row['Detail']} - {row['Action']}"))
+    if not content['anomalies'].empty:
+        heading('Anomalous Calls')
+        table(content['anomalies'], ['call_dateTime', 'full_name', 'length_in_min', 'anomaly_score'], [50, 60, 35, 35])
+    pdf.output(path, 'F')
+
+def _write_pptx(content: Dict[str, Any], charts: Dict[str, str], path: str) -> None:
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = 'Call Center Analytics Report'
+    slide.placeholders[1].text = f"{content['stats']['date_range'][0]} to {content['stats']['date_range'][1]}"
+    def bullets(title, lines):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title
+        body = slide.placeholders[1].text_frame
+        body.text = lines[0] if lines else ''
+        for line in lines[1:]:
+            body.add_paragraph().text = line
+        for paragraph in body.paragraphs:
+            for run in paragraph.runs:
+                run.font.size = Pt(14)
+    bullets('Overview', [f"{row['Metric']}: {row['Value']}" for _, row in content['overview'].iterrows()])
+    for name, chart_path in charts.items():
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = name.title()
+        slide.shapes.add_picture(chart_path, Inches(0.5), Inches(1.5), width=Inches(9))
+    leaders = content['leaderboard'].head(12)
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = 'Agent Leaderboard (by AHT)'
+    columns = ['full_name', 'total_calls', 'answer_rate', 'avg_talk_time_min']
+    grid = slide.shapes.add_table(len(leaders) + 1, len(columns), Inches(0.5), Inches(1.5), Inches(9), Inches(0.3) * (len(leaders) + 1)).table
+    for j, col in enumerate(columns):
+        grid.cell(0, j).text = col
+    for i, (_, row) in enumerate(leaders.iterrows(), start=1):
+        for j, col in enumerate(columns):
+            value = row[col]
+            grid.cell(i, j).text = f"{value:.2f}" if isinstance(value, float) else str(value)
+    alerts = content['alerts'].head(8)
+    bullets('Executive Alerts', [f"{row['Alert']} - {row['Detail']}" for _, row in alerts.iterrows()] or ['No critical issues detected.'])
+    prs.save(path)
+
+WRITERS = {'pdf': _write_pdf, 'xlsx': _write_xlsx, 'pptx': _write_pptx}
+
+class ReportExporter:
+    """Background report builder: renders PDF / Excel / PowerPoint reports in a worker pool.
+
+    Reports are keyed by dataset version and option set; files are written under
+    `<directory>/<key>/` (a directory private to the dashboard user) and reused, so a repeated
+    request completes immediately. Report folders beyond `max_exports` are evicted least recently
+    used first.
+    """
+
+    def __init__(self, directory: str = EXPORT_DIR, max_workers: int = EXPORT_WORKERS, max_exports: int = MAX_EXPORTS):
+        self.directory = directory
+        self.max_exports = max_exports
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-export')
+        self._jobs = {}
+        self._lock = threading.Lock()
+        app_dirs.private_dir(directory)
+
+    @staticmethod
+    def job_key(version: str, formats: List[str], options: Dict[str, Any]) -> str:
+        payload = json.dumps({'version': version, 'formats': sorted(formats), 'options': options}, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def _files(self, key: str, formats: List[str]) -> Dict[str, str]:
+        return {fmt: os.path.join(self.directory, key, f"call_center_report.{fmt}") for fmt in formats}
+
+    def submit(self, df: pd.DataFrame, version: str, formats: List[str], options: Optional[Dict[str, Any]] = None) -> str:
+        """Queue a report build (or reuse a cached / in-flight one) and return its job id."""
+        options = options or {}
+        key = self.job_key(version, formats, options)
+        files = self._files(key, formats)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job and job['state'] in ('queued', 'running'):
+                return key
+            # A finished report is reused while its files exist (they may have been evicted since)
+            if all(os.path.exists(path) for path in files.values()):
+                os.utime(os.path.join(self.directory, key))
+                if not job or job['state'] != 'done':
+                    self._jobs[key] = {'state': 'done', 'progress': 1.0, 'stage': 'Cached', 'files': files, 'error': None}
+                return key
+            self._jobs[key] = {'state': 'queued', 'progress': 0.0, 'stage': 'Queued', 'files': files, 'error': None}
+        self._pool.submit(self._build, key, df, version, formats, options)
+        return key
+
+    def status(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job state: state, progress (0-1), stage, files and error."""
+        with self._lock:
+            job = self._jobs.get(key)
+            return dict(job) if job else None
+
+    def _update(self, key: str, **fields) -> None:
+        with self._lock:
+            self._jobs[key].update(fields)
+
+    def _build(self, key: str, df: pd.DataFrame, version: str, formats: List[str], options: Dict[str, Any]) -> None:
+        files = self._files(key, formats)
+        out_dir = os.path.join(self.directory, key)
+        os.makedirs(out_dir, exist_ok=True)
+        steps = 2 + len(formats)
+        try:
+            self._update(key, state='running', stage='Computing analytics', progress=0.0)
+            content = _report_content(df, version, options)
+            charts = {}
+            if options.get('charts', True):
+                self._update(key, stage='Rendering charts', progress=1 / steps)
+                charts = _render_charts(content, out_dir)
+            for i, fmt in enumerate(formats):
+                self._update(key, stage=f"Writing {FORMATS[fmt]}", progress=(2 + i) / steps)
+                tmp_path = os.path.join(out_dir, f"call_center_report.tmp.{fmt}")
+                WRITERS[fmt](content, charts, tmp_path)
+                os.replace(tmp_path, files[fmt])
+            self._update(key, state='done', stage='Done', progress=1.0)
+        except Exception as e:
+            self._update(key, state='failed', stage='Failed', error=str(e))
+        self.evict()
+
+    def evict(self, max_exports: Optional[int] = None) -> int:
+        """Delete the least recently used report folders beyond `max_exports`, sparing jobs in progress; return how many were deleted."""
+        max_exports = self.max_exports if max_exports is None else max_exports
+        with self._lock:
+            busy = {key for key, job in self._jobs.items() if job['state'] in ('queued', 'running')}
+            folders = sorted((entry for entry in os.scandir(self.directory) if entry.is_dir() and entry.name not in busy),
+                             key=lambda entry: entry.stat().st_mtime, reverse=True)
+            for entry in folders[max_exports:]:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                self._jobs.pop(entry.name, None)
+        return max(len(folders) - max_exports, 0)
+
+@st.cache_resource
+def get_exporter() -> ReportExporter:
+    """Return the process-wide report exporter shared by all sessions."""
+    return ReportExporter()
@@ -0,0 +1,64 @@
+import math
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100]
+# Cell styles for the colour-band rule columns computed next to each metric
+BAND_STYLES = {
+    'bad': 'background:#ffebee;color:#c62828;font-weight:700;',
+    'warn': 'background:#fff8e1;color:#ff9800;font-weight:600;',
+    'good': 'background:#e8f5e9;color:#388e3c;font-weight:600;',
+    'high': 'background:#e3f2fd;color:#1976d2;font-weight:600;',
+    'team': 'background:#e3f2fd;color:#1976d2;font-weight:700;',
+}
+
+def sort_page(df: pd.DataFrame, sort_by: str, ascending: bool = True, page: int = 1, page_size: int = PAGE_SIZES[0]) -> pd.DataFrame:
+    """Return page `page` (1-based) of `df` sorted by `sort_by`, nulls last."""
+    order = df[sort_by].reset_index(drop=True).sort_values(ascending=ascending, na_position='last', kind='stable').index.to_numpy()
+    start = (page - 1) * page_size
+    return df.iloc[order[start:start + page_size]]
+
+def band_styles(view: pd.DataFrame, bands: Dict[str, str]) -> pd.DataFrame:
+    """Return the CSS for each cell of `view`: `BAND_STYLES` of the band column of every banded metric."""
+    css = pd.DataFrame('', index=view.index, columns=view.columns)
+    for col, band_col in bands.items():
+        css[col] = view[band_col].map(BAND_STYLES).fillna('').to_numpy()
+    return css
+
+def paginated_grid(df: pd.DataFrame, key: str, sort_columns: List[str], default_sort: str, ascending: bool = True,
+                   bands: Optional[Dict[str, str]] = None, pinned: Optional[pd.DataFrame] = None,
+                   column_config: Optional[Dict] = None, hidden: Sequence[str] = ()) -> pd.DataFrame:
+    """Render `df` as a sortable table paged on the server, so only the current page reaches the browser.
+
+    `bands` maps metric columns to their band rule columns (styled by `BAND_STYLES`, then hidden),
+    and `pinned` rows (e.g. team averages) are shown above every page. Returns the rendered page.
+    """
+    bands = bands or {}
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        sort_by = st.selectbox("Sort By", sort_columns, index=sort_columns.index(default_sort), key=f"{key}_sort")
+    with col2:
+        order = st.selectbox("Order", ["Ascending", "Descending"], index=0 if ascending else 1, key=f"{key}_order")
+    with col3:
+        page_size = st.selectbox("Rows per Page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, math.ceil(len(df) / page_size))
+    # Back to page 1 whenever the rows (e.g. filters), page size or sort change, so the page input
+    # never keeps a page number that no longer exists
+    signature = (len(df), page_size, sort_by, order)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_page"] = 1
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    view = sort_page(df, sort_by, order == "Ascending", page, page_size)
+    if pinned is not None:
+        view = pd.concat([pinned, view], ignore_index=True)
+    shown = view.drop(columns=list(hidden) + list(bands.values()))
+    styled = shown.style.format(precision=2)
+    if bands:
+        styled = styled.apply(lambda _: band_styles(view, bands)[shown.columns], axis=None)
+    st.dataframe(styled, use_container_width=True, hide_index=True, column_config=column_config)
+    first = (page - 1) * page_size
+    st.caption(f"Rows {min(first + 1, len(df)):,}-{min(first + page_size, len(df)):,} of {len(df):,} (page {page} of {pages}).")
+    return view
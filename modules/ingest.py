@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+import pandas as pd
+import streamlit as st
+from modules import app_dirs, call_store, data_loader, dataset_store, preprocessing, result_cache, sanitizer
+
+DROP_DIR = os.environ.get('CALLCENTER_DROP_DIR')
+POLL_SECONDS = float(os.environ.get('CALLCENTER_DROP_POLL_SECONDS', 30))
+FILE_TYPES = ('.csv', '.xlsx', '.xls')
+STATE_FILE = 'ingest_state.json'
+STATUS_COLUMNS = ['file', 'state', 'rows', 'calls_from', 'calls_to', 'dropped_at', 'ingested_at', 'lag_sec', 'dataset', 'error']
+
+class DropFolderWatcher:
+    """Background ingestion of dialer dumps dropped into a folder (e.g. the nightly SFTP drop).
+
+    A daemon thread polls `directory` every `poll_seconds`. A file is ingested once its size and
+    modification time are unchanged between two polls (so half-uploaded files are skipped),
+    through the dashboard's own path: `data_loader.read_file` -> `sanitizer.sanitize` ->
+    `preprocessing.preprocess_data`. The result is written to the dataset and call stores and
+    `result_cache.ANALYSES` are precomputed, so opening the dump in the dashboard is instant.
+    Per-file state (including ingestion lag) is kept in `<results_dir>/ingest_state.json`, so
+    restarts do not re-ingest unchanged files.
+    """
+
+    def __init__(self, directory: str, poll_seconds: float = POLL_SECONDS, results_dir: str = result_cache.RESULTS_DIR):
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self._state_path = os.path.join(results_dir, STATE_FILE)
+        self._files = self._load_state()
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_scan = None
+        os.makedirs(directory, exist_ok=True)
+        app_dirs.private_dir(results_dir)
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self._state_path):
+            return {}
+        with open(self._state_path) as f:
+            files = json.load(f)
+        # An ingestion interrupted by a restart is retried
+        return {path: entry for path, entry in files.items() if entry['state'] in ('done', 'failed')}
+
+    def _save_state(self) -> None:
+        tmp_path = f"{self._state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._files, f)
+        os.replace(tmp_path, self._state_path)
+
+    def _update(self, path: str, **fields) -> None:
+        with self._lock:
+            self._files.setdefault(path, {}).update(fields)
+            self._save_state()
+
+    def start(self) -> 'DropFolderWatcher':
+        """Start the polling thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='drop-folder-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.scan()
+            self._stop.wait(self.poll_seconds)
+
+    def scan(self) -> int:
+        """Ingest every new or changed file that has stopped growing; return how many were ingested."""
+        candidates = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not name.lower().endswith(FILE_TYPES) or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            signature = (stat.st_size, stat.st_mtime)
+            known = self._files.get(path)
+            if known and known['state'] in ('done', 'failed') and (known['size'], known['mtime']) == signature:
+                continue
+            if self._seen.get(path) == signature:
+                candidates.append((stat.st_mtime, path, signature))
+            else:
+                self._seen[path] = signature
+                self._update(path, file=name, state='pending', size=stat.st_size, mtime=stat.st_mtime, dropped_at=stat.st_mtime)
+        for _, path, signature in sorted(candidates):
+            self.ingest(path, signature)
+        self.last_scan = time.time()
+        return len(candidates)
+
+    def ingest(self, path: str, signature: Optional[tuple] = None) -> Optional[str]:
+        """Load, sanitize, preprocess, store and precompute one dump; return its dataset id."""
+        size, mtime = signature or (os.path.getsize(path), os.path.getmtime(path))
+        self._update(path, file=os.path.basename(path), state='running', size=size, mtime=mtime, dropped_at=mtime, error=None)
+        try:
+            df, quarantine = sanitizer.sanitize(data_loader.read_file(path))
+            preprocessed = preprocessing.preprocess_data(df)
+            if preprocessed is None:
+                raise ValueError("preprocessing failed")
+            version = dataset_store.get_store().put(data_loader.dataset_version(preprocessed), preprocessed)
+            call_store.get_call_store().write(preprocessed, version)
+            result_cache.precompute(preprocessed, version)
+            result_cache.save(version, 'quarantine', quarantine)
+            times = preprocessed['call_dateTime'].dropna()
+            self._update(
+                path, state='done', dataset=version, rows=int(len(preprocessed)), ingested_at=time.time(),
+                calls_from=str(times.min().date()) if not times.empty else None,
+                calls_to=str(times.max().date()) if not times.empty else None)
+            return version
+        except Exception as e:
+            self._update(path, state='failed', ingested_at=time.time(), error=str(e))
+            return None
+
+    def status(self) -> pd.DataFrame:
+        """Return one row per file seen: state, rows, call date span, drop/ingest times and lag."""
+        with self._lock:
+            files = pd.DataFrame([dict(entry) for entry in self._files.values()])
+        if files.empty:
+            return pd.DataFrame(columns=STATUS_COLUMNS)
+        files = files.reindex(columns=STATUS_COLUMNS)
+        files['lag_sec'] = files['ingested_at'] - files['dropped_at']
+        for col in ('dropped_at', 'ingested_at'):
+            files[col] = pd.to_datetime(files[col], unit='s').dt.floor('s')
+        return files[STATUS_COLUMNS].sort_values('dropped_at', ascending=False, ignore_index=True)
+
+@st.cache_resource
+def get_watcher() -> Optional[DropFolderWatcher]:
+    """Return the process-wide drop-folder watcher, started on first use; None if `CALLCENTER_DROP_DIR` is unset."""
+    return DropFolderWatcher(DROP_DIR).start() if DROP_DIR else None
@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import csv
+import io
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import streamlit as st
+from modules import compute_backend, datetime_parsing
+
+# The feed is enabled by a socket address ('host:port') and/or a CSV file to tail. Both carry the
+# dialer dump's CSV columns, header line first
+LIVE_SOCKET = os.environ.get('CALLCENTER_LIVE_SOCKET')
+LIVE_CSV = os.environ.get('CALLCENTER_LIVE_CSV')
+POLL_SECONDS = float(os.environ.get('CALLCENTER_LIVE_POLL_SECONDS', 1))
+REFRESH_SECONDS = float(os.environ.get('CALLCENTER_LIVE_REFRESH_SECONDS', 5))
+WINDOWS = {'Last 15 min': 15, 'Last 60 min': 60}
+RING_MINUTES = 60
+FIELDS = ('calls', 'answered', 'dropped', 'talk_sec')
+CHUNK_BYTES = 1 << 20
+# A source that fails (missing file, port in use, ...) is retried after poll_seconds, doubling up to this
+MAX_BACKOFF_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+class WindowedCounts:
+    """Call counts for a team or agent: per-minute buckets of the last `RING_MINUTES` plus today's totals.
+
+    Memory is fixed (a `RING_MINUTES x FIELDS` ring and one row for today) however many events
+    arrive. A bucket is reset when its ring slot is reused by a newer minute; events older than the
+    ring only count towards today.
+    """
+
+    def __init__(self):
+        self.buckets = np.zeros((RING_MINUTES, len(FIELDS)))
+        self.minutes = np.full(RING_MINUTES, -1, dtype=np.int64)
+        self.today = np.zeros(len(FIELDS))
+        self.day = -1
+        self.last_minute = -1
+        self.last_outcome = None
+
+    def add(self, minute: int, values: np.ndarray, outcome: Optional[str] = None) -> None:
+        """Add `values` (one per `FIELDS`) for the calls of minute `minute` (minutes since the epoch)."""
+        day = minute // 1440
+        if day > self.day:
+            self.day, self.today = day, np.zeros(len(FIELDS))
+        if day == self.day:
+            self.today += values
+        slot = minute % RING_MINUTES
+        if minute > self.minutes[slot]:
+            self.minutes[slot] = minute
+            self.buckets[slot] = 0
+        if minute == self.minutes[slot]:
+            self.buckets[slot] += values
+        if minute >= self.last_minute:
+            self.last_minute, self.last_outcome = minute, outcome or self.last_outcome
+
+    def window(self, now_minute: int, span: int) -> np.ndarray:
+        """Return the `FIELDS` totals of the `span` minutes up to and including `now_minute`."""
+        recent = (self.minutes > now_minute - span) & (self.minutes <= now_minute)
+        return self.buckets[recent].sum(axis=0)
+
+    def totals(self, now_minute: int) -> np.ndarray:
+        """Return today's `FIELDS` totals (zero once `now_minute` is on a later day)."""
+        return self.today if now_minute // 1440 == self.day else np.zeros(len(FIELDS))
+
+def kpis(values: np.ndarray) -> Dict[str, float]:
+    """Answer rate, drop rate and AHT (talk time of answered calls, minutes) from `FIELDS` totals."""
+    calls, answered, dropped, talk_sec = values
+    return {
+        'calls': int(calls),
+        'answer_rate': float(answered / calls * 100) if calls else 0.0,
+        'drop_rate': float(dropped / calls * 100) if calls else 0.0,
+        'aht_min': float(talk_sec / answered / 60) if answered else 0.0,
+    }
+
+def call_events(header: List[str], rows: List[List[str]]) -> pd.DataFrame:
+    """Turn dump-format CSV rows into call events: minute, full_name, call_outcome and FIELDS values.
+
+    Dates, status and talk time are read as `preprocess_data` reads a dump, and outcomes use the
+    same `compute_backend.categorize_outcomes`. Rows without a parseable call time are dropped.
+    """
+    df = pd.DataFrame([row[:len(header)] + [''] * (len(header) - len(row)) for row in rows], columns=header)
+    if 'call_dateTime' in df.columns:
+        times, _ = datetime_parsing.parse_datetimes(df['call_dateTime'])
+    elif 'call_date' in df.columns and 'Time' in df.columns:
+        times, _ = datetime_parsing.combine_date_time(df['call_date'], df['Time'])
+    else:
+        return pd.DataFrame(columns=['minute', 'full_name', 'call_outcome'] + list(FIELDS))
+    status = df['status'].astype(str).str.upper().str.strip() if 'status' in df.columns else pd.Series('ANSWERED', index=df.index)
+    outcome = compute_backend.categorize_outcomes(status, backend='pandas')
+    length = pd.to_numeric(df['length_in_sec'], errors='coerce').fillna(0) if 'length_in_sec' in df.columns else pd.Series(0.0, index=df.index)
+    agent = df['full_name'].replace('', np.nan).fillna('Unknown Agent') if 'full_name' in df.columns else pd.Series('Unknown Agent', index=df.index)
+    answered = (outcome == 'Answered').to_numpy()
+    events = pd.DataFrame({
+        'minute': times.to_numpy(dtype='datetime64[m]').astype('int64'),
+        'full_name': agent.to_numpy(),
+        'call_outcome': outcome.to_numpy(),
+        'calls': 1.0,
+        'answered': answered.astype(float),
+        'dropped': (outcome == 'Dropped').to_numpy().astype(float),
+        'talk_sec': np.where(answered, length.to_numpy(dtype=float), 0.0),
+    })
+    return events[times.notna().to_numpy()]
+
+class _Lines:
+    """Split a byte stream into CSV rows; the first row is the header.
+
+    Only complete rows are parsed: the stream is cut at its last newline outside quotes (an even
+    number of '"' before it, as doubled quotes keep the count even), so a quoted field spanning
+    lines or chunks stays whole.
+    """
+
+    def __init__(self):
+        self.header = None
+        self._rest = b''
+
+    def feed(self, chunk: bytes) -> List[List[str]]:
+        data = self._rest + chunk
+        cut = data.rfind(b'\n')
+        quotes = data.count(b'"', 0, cut) if cut >= 0 else 0
+        while cut >= 0 and quotes % 2:
+            previous = data.rfind(b'\n', 0, cut)
+            quotes -= data.count(b'"', previous + 1, cut)
+            cut = previous
+        complete, self._rest = data[:cut + 1], data[cut + 1:]
+        rows = [row for row in csv.reader(io.StringIO(complete.decode('utf-8', errors='replace'), newline=''))
+                if len(row) > 1 or (row and row[0].strip())]
+        if self.header is None and rows:
+            self.header, rows = [col.strip() for col in rows[0]], rows[1:]
+        return rows
+
+class LiveFeed:
+    """Near-real-time call KPIs from a dialer event stream (a local socket and/or a tailed CSV).
+
+    An asyncio loop in a daemon thread reads both sources as they grow and folds each batch of
+    events into `WindowedCounts` for the team and each agent, so memory stays flat however long
+    the shift runs. `snapshot` reads those counters only; nothing is re-read from disk. Windows end
+    at the current (local, like the dump's call times) minute, or at the newest event if the feed
+    runs ahead of the clock, so they keep rolling and idle agents show as idle when no calls arrive.
+    A source that fails is logged, reported in the status and retried with backoff (a rotated or
+    truncated CSV is re-opened from the start); a batch that cannot be parsed is skipped.
+    """
+
+    def __init__(self, socket_address: Optional[str] = LIVE_SOCKET, csv_path: Optional[str] = LIVE_CSV,
+                 poll_seconds: float = POLL_SECONDS):
+        self.socket_address = socket_address
+        self.csv_path = csv_path
+        self.poll_seconds = poll_seconds
+        self.team = WindowedCounts()
+        self.agents: Dict[str, WindowedCounts] = {}
+        self.events = 0
+        self.rejected = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> 'LiveFeed':
+        """Start the feed thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name='live-feed', daemon=True)
+            self._thread.start()
+        return self
+
+    async def _main(self) -> None:
+        tasks = []
+        if self.socket_address:
+            tasks.append(self._serve(self.socket_address))
+        if self.csv_path:
+            tasks.append(self._tail(self.csv_path))
+        await asyncio.gather(*tasks)
+
+    def _failed(self, source: str, error: Exception) -> None:
+        """Log a source or batch error and show it in the feed status; the feed keeps running."""
+        logger.warning("live feed %s: %s", source, error)
+        self.error = f"{source}: {error}"
+
+    def _feed(self, source: str, lines: '_Lines', chunk: bytes) -> None:
+        # A batch that cannot be parsed is skipped, not fatal
+        try:
+            rows = lines.feed(chunk)
+            self.ingest(lines.header, rows)
+        except Exception as e:
+            self._failed(source, e)
+        else:
+            self.error = None
+
+    async def _serve(self, address: str) -> None:
+        host, port = address.rsplit(':', 1)
+        delay = self.poll_seconds
+        while True:
+            try:
+                server = await asyncio.start_server(self._client, host, int(port))
+            except OSError as e:
+                self._failed(address, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF_SECONDS)
+                continue
+            async with server:
+                await server.serve_forever()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lines = _Lines()
+        try:
+            while chunk := await reader.read(CHUNK_BYTES):
+                self._feed(self.socket_address, lines, chunk)
+        except OSError as e:
+            self._failed(self.socket_address, e)
+        finally:
+            writer.close()
+
+    async def _tail(self, path: str) -> None:
+        f, lines, delay = None, None, self.poll_seconds
+        while True:
+            try:
+                if f is None:
+                    f, lines = open(path, 'rb'), _Lines()
+                chunk = f.read(CHUNK_BYTES)
+                if chunk:
+                    self._feed(path, lines, chunk)
+                    await asyncio.sleep(0)
+                    continue
+                # At the end: re-open when `path` is now another file (rotated) or was truncated
+                if _replaced(path, f):
+                    f.close()
+                    f = None
+                    continue
+            except OSError as e:
+                # Missing (not created yet, or between rotation and the new file) or unreadable
+                self._failed(path, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF_SECONDS)
+                continue
+            delay = self.poll_seconds
+            await asyncio.sleep(self.poll_seconds)
+
+    def ingest(self, header: Optional[List[str]], rows: List[List[str]]) -> int:
+        """Fold a batch of dump-format rows into the counters; return how many were accepted."""
+        if not header or not rows:
+            return 0
+        events = call_events(header, rows)
+        # One update per agent-minute (and the latest outcome of each) instead of one per call
+        grouped = events.groupby(['full_name', 'minute'], sort=True)
+        sums = grouped[list(FIELDS)].sum()
+        last = grouped['call_outcome'].last()
+        team = events.groupby('minute', sort=True)[list(FIELDS)].sum()
+        with self._lock:
+            for minute, values in zip(team.index, team.to_numpy()):
+                self.team.add(int(minute), values)
+            for (agent, minute), values, outcome in zip(sums.index, sums.to_numpy(), last.to_numpy()):
+                self.agents.setdefault(agent, WindowedCounts()).add(int(minute), values, outcome)
+            # Agents idle since before today are dropped, so the roster does not grow across days
+            self.agents = {agent: counts for agent, counts in self.agents.items() if counts.day >= self.team.day}
+            self.events += len(events)
+            self.rejected += len(rows) - len(events)
+        return len(events)
+
+    def snapshot(self) -> Dict:
+        """Return team KPIs per window (`WINDOWS` and 'Today'), the per-agent activity table and feed status."""
+        with self._lock:
+            now = max(_wall_minute(), self.team.last_minute)
+            windows = {name: kpis(self.team.window(now, span)) for name, span in WINDOWS.items()}
+            windows['Today'] = kpis(self.team.totals(now))
+            agents = []
+            for agent, counts in self.agents.items():
+                today = kpis(counts.totals(now))
+                agents.append({
+                    'full_name': agent,
+                    'calls_15_min': int(counts.window(now, 15)[0]),
+                    'calls_60_min': int(counts.window(now, 60)[0]),
+                    'calls_today': today['calls'],
+                    'answer_rate_today': today['answer_rate'],
+                    'aht_min_today': today['aht_min'],
+                    'last_call': pd.Timestamp(counts.last_minute, unit='m'),
+                    'last_outcome': counts.last_outcome,
+                    'idle_min': now - counts.last_minute,
+                })
+            status = {'events': self.events, 'rejected': self.rejected, 'error': self.error,
+                      'as_of': pd.Timestamp(now, unit='m') if self.team.last_minute >= 0 else None}
+        agents = pd.DataFrame(agents, columns=['full_name', 'calls_15_min', 'calls_60_min', 'calls_today', 'answer_rate_today',
+                                               'aht_min_today', 'last_call', 'last_outcome', 'idle_min'])
+        return {'windows': windows, 'agents': agents.sort_values('calls_today', ascending=False, ignore_index=True), 'status': status}
+
+def _replaced(path: str, f) -> bool:
+    """True when `path` names another file than the open `f` (rotated) or is shorter than what was read."""
+    current, opened = os.stat(path), os.fstat(f.fileno())
+    return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino) or current.st_size < f.tell()
+
+def _wall_minute() -> int:
+    """The current local wall-clock minute, in the minutes-since-epoch of `call_events`."""
+    return int(np.datetime64(pd.Timestamp.now(), 'm').astype('int64'))
+
+@st.cache_resource
+def get_live_feed() -> Optional[LiveFeed]:
+    """Return the process-wide live feed, started on first use; None unless `CALLCENTER_LIVE_SOCKET` or `CALLCENTER_LIVE_CSV` is set."""
+    return LiveFeed().start() if LIVE_SOCKET or LIVE_CSV else None
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a dialer dump as a live feed, shifted to the current time.")
+    parser.add_argument('dump', help="dialer dump CSV (dump columns, header first)")
+    parser.add_argument('--socket', help="send to this 'host:port' (the dashboard's CALLCENTER_LIVE_SOCKET)")
+    parser.add_argument('--csv', help="append to this CSV (the dashboard's CALLCENTER_LIVE_CSV)")
+    parser.add_argument('--speed', type=float, default=60.0, help="replay speed-up (call time / wall time)")
+    args = parser.parse_args(argv)
+    if not args.socket and not args.csv:
+        parser.error("give --socket and/or --csv")
+    dump = pd.read_csv(args.dump, dtype=str, keep_default_na=False)
+    if 'call_dateTime' in dump.columns:
+        times, _ = datetime_parsing.parse_datetimes(dump['call_dateTime'])
+    else:
+        times, _ = datetime_parsing.combine_date_time(dump['call_date'], dump['Time'])
+    dump = dump.drop(columns=[col for col in ('call_date', 'Time') if col in dump.columns])
+    dump = dump.assign(call_dateTime=times)[times.notna()].sort_values('call_dateTime', ignore_index=True)
+    # Offsets from the first call set the pace; timestamps are moved to today
+    offsets = (dump['call_dateTime'] - dump['call_dateTime'].iloc[0]).dt.total_seconds().to_numpy() / args.speed
+    dump['call_dateTime'] = (dump['call_dateTime'] + (pd.Timestamp.now().floor('s') - dump['call_dateTime'].iloc[0])).dt.strftime('%Y-%m-%d %H:%M:%S')
+    sinks, headers = [], []
+    if args.socket:
+        import socket
+        host, port = args.socket.rsplit(':', 1)
+        sinks.append(socket.create_connection((host, int(port))).makefile('w', newline=''))
+        headers.append(True)
+    if args.csv:
+        headers.append(not os.path.exists(args.csv) or os.path.getsize(args.csv) == 0)
+        sinks.append(open(args.csv, 'a', newline=''))
+    writers = [csv.writer(sink) for sink in sinks]
+    for writer, header in zip(writers, headers):
+        if header:
+            writer.writerow(dump.columns)
+    start = time.monotonic()
+    for i, (row, due) in enumerate(zip(dump.itertuples(index=False), offsets), start=1):
+        time.sleep(max(0.0, due - (time.monotonic() - start)))
+        for sink, writer in zip(sinks, writers):
+            writer.writerow(row)
+            sink.flush()
+        print(f"\r{i}/{len(dump)} calls sent", end='', flush=True)
+    print()
+    for sink in sinks:
+        sink.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+import streamlit as st
+
+@st.cache_data
+def agent_timeline(_df: pd.DataFrame, version: str, session_gap_minutes: float = 30) -> Optional[pd.DataFrame]:
+    """Return every call ordered per agent with its end time, idle gap before it and work-session id.
+
+    Calls are sorted once by (agent, start); the end of each call is start + `length_in_sec` and the
+    idle gap is measured from the latest end so far for that agent, so overlapping calls do not count
+    as idle. A gap longer than `session_gap_minutes` starts a new session. Cached per dataset `version`.
+    """
+    df = _df
+    if 'full_name' not in df.columns or 'call_dateTime' not in df.columns:
+        return None
+    calls = df[['full_name', 'call_dateTime', 'call_outcome', 'length_in_sec']].dropna(subset=['call_dateTime'])
+    if calls.empty:
+        return None
+    codes, _ = pd.factorize(calls['full_name'])
+    start_ns = calls['call_dateTime'].to_numpy(dtype='datetime64[ns]').view('int64')
+    order = np.lexsort((start_ns, codes))
+    calls = calls.iloc[order].reset_index(drop=True)
+    codes = codes[order]
+    n = len(calls)
+
+    # Seconds relative to the first call; agents are offset by more than the whole span so one
+    # running maximum over the array never leaks across agents
+    start = (start_ns[order] - start_ns.min()) / 1e9
+    end = start + np.clip(calls['length_in_sec'].to_numpy(dtype=float), 0, None)
+    offset = codes * (end.max() + 1)
+    latest_end = np.maximum.accumulate(end + offset) - offset
+    first_call = np.ones(n, dtype=bool)
+    first_call[1:] = codes[1:] != codes[:-1]
+    gap = np.full(n, np.nan)
+    gap[1:] = start[1:] - latest_end[:-1]
+    gap[first_call] = np.nan
+    new_session = first_call | (gap > session_gap_minutes * 60)
+
+    calls['call_end'] = calls['call_dateTime'] + pd.to_timedelta(end - start, unit='s')
+    calls['idle_gap_min'] = np.where(new_session, np.nan, np.clip(gap, 0, None) / 60)
+    calls['overlaps_previous'] = ~first_call & (gap < 0)
+    calls['session_id'] = np.cumsum(new_session) - 1
+    calls['start_sec'] = start
+    calls['latest_end_sec'] = latest_end
+    return calls
+
+@st.cache_data
+def agent_occupancy(_df: pd.DataFrame, version: str, session_gap_minutes: float = 30) -> Optional[pd.DataFrame]:
+    """Return per-agent sessions, logged-in time, talk time, idle gaps, occupancy and calls per productive hour."""
+    calls = agent_timeline(_df, version, session_gap_minutes)
+    if calls is None:
+        return None
+    sessions = calls.groupby('session_id', sort=False).agg(
+        full_name=('full_name', 'first'),
+        start=('start_sec', 'min'),
+        end=('latest_end_sec', 'max'))
+    sessions['logged_in_sec'] = sessions['end'] - sessions['start']
+    per_session = sessions.groupby('full_name', sort=False).agg(
+        sessions=('logged_in_sec', 'size'),
+        logged_in_hours=('logged_in_sec', 'sum'))
+    per_session['logged_in_hours'] /= 3600
+
+    calls = calls.assign(talk_sec=calls['length_in_sec'].clip(lower=0))
+    stats = calls.groupby('full_name', sort=False).agg(
+        total_calls=('call_dateTime', 'size'),
+        talk_hours=('talk_sec', 'sum'),
+        avg_idle_gap_min=('idle_gap_min', 'mean'),
+        median_idle_gap_min=('idle_gap_min', 'median'),
+        max_idle_gap_min=('idle_gap_min', 'max'),
+        overlapping_calls=('overlaps_previous', 'sum'),
+        first_call=('call_dateTime', 'min'),
+        last_call=('call_dateTime', 'max'))
+    stats['talk_hours'] /= 3600
+    stats = stats.join(per_session)
+    stats['idle_hours'] = (stats['logged_in_hours'] - stats['talk_hours']).clip(lower=0)
+    logged_in = stats['logged_in_hours'].where(stats['logged_in_hours'] > 0)
+    stats['occupancy'] = (stats['talk_hours'] / logged_in * 100).clip(upper=100)
+    stats['calls_per_productive_hour'] = stats['total_calls'] / logged_in
+    stats = stats.fillna({'occupancy': 0, 'calls_per_productive_hour': 0, 'avg_idle_gap_min': 0, 'median_idle_gap_min': 0, 'max_idle_gap_min': 0})
+    report_cols = [
+        'total_calls', 'sessions', 'logged_in_hours', 'talk_hours', 'idle_hours', 'occupancy',
+        'calls_per_productive_hour', 'avg_idle_gap_min', 'median_idle_gap_min', 'max_idle_gap_min',
+        'overlapping_calls', 'first_call', 'last_call'
+    ]
+    return stats[report_cols].sort_values('occupancy', ascending=False).reset_index()
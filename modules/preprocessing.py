@@ -1,9 +1,10 @@
 import pandas as pd
 from typing import Optional
 import streamlit as st
+from modules import compute_backend, datetime_parsing
 
 @st.cache_data
-def preprocess_data(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+def preprocess_data(df: pd.DataFrame, backend: Optional[str] = None) -> Optional[pd.DataFrame]:
     """Clean and preprocess the call center data."""
     try:
         # Standardize column names for sample data
@@ -17,11 +18,14 @@ def preprocess_data(df: pd.DataFrame) -> Optional[pd.DataFrame]:
         df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
 
         # Handle date and time columns
+        # Parse reports (rows, missing, unparseable, format) ride along in df.attrs; a report from
+        # the column mapper is kept since it describes the user's original columns
         if 'call_date' in df.columns and 'Time' in df.columns:
-            df['call_dateTime'] = pd.to_datetime(
-                df['call_date'].astype(str) + ' ' + df['Time'].astype(str), errors='coerce')
+            df['call_dateTime'], report = datetime_parsing.combine_date_time(df['call_date'], df['Time'])
+            df.attrs.setdefault('datetime_report', report)
         elif 'call_dateTime' in df.columns:
-            df['call_dateTime'] = pd.to_datetime(df['call_dateTime'])
+            df['call_dateTime'], report = datetime_parsing.parse_datetimes(df['call_dateTime'])
+            df.attrs.setdefault('datetime_report', report)
         else:
             df['call_dateTime'] = pd.date_range(start='2024-01-01', periods=len(df), freq='H')
 
@@ -39,15 +43,7 @@ def preprocess_data(df: pd.DataFrame) -> Optional[pd.DataFrame]:
             else:
                 df['status'] = 'ANSWERED'
 
-        def categorize_call_outcome(status):
-            if pd.isna(status): return 'Unknown'
-            status_str = str(status)
-            if 'ANSWER' in status_str: return 'Answered'
-            if 'DROP' in status_str: return 'Dropped'
-            if 'BUSY' in status_str: return 'Busy'
-            if 'NO ANSWER' in status_str: return 'No Answer'
-            return 'Other'
-        df['call_outcome'] = df['status'].apply(categorize_call_outcome)
+        df['call_outcome'] = compute_backend.categorize_outcomes(df['status'], backend=backend)
 
         # Handle call duration
         if 'length_in_sec' in df.columns:
@@ -0,0 +1,76 @@
+import pandas as pd
+from typing import Optional
+import streamlit as st
+
+MATCH_TOLERANCE_MINUTES = 10
+PHONE_DIGITS = 10
+# Recording file names look like `20250501-105020_09709511122-all.mp3`: start time, then dialed number
+FILENAME_PATTERN = r'(?P<rec_date>\d{8})-(?P<rec_time>\d{6})_(?P<rec_phone>\d+)'
+DIALER_COLUMNS = ['call_dateTime', 'user', 'full_name', 'campaign_id', 'call_outcome', 'length_in_sec']
+
+def phone_key(numbers: pd.Series) -> pd.Series:
+    """Normalise phone numbers to their last 10 digits as nullable integers (drops trunk '0' / country code)."""
+    if pd.api.types.is_numeric_dtype(numbers):
+        return (pd.to_numeric(numbers, errors='coerce') % 10 ** PHONE_DIGITS).astype('Int64')
+    digits = numbers.astype(str).str.replace(r'\D', '', regex=True).str[-PHONE_DIGITS:]
+    return pd.to_numeric(digits.where(digits != ''), errors='coerce').astype('Int64')
+
+def parse_recording_names(filenames: pd.Series) -> pd.DataFrame:
+    """Extract recording start time and dialed number from recording file names."""
+    parts = filenames.astype(str).str.extract(FILENAME_PATTERN)
+    return pd.DataFrame({
+        'recording_time': pd.to_datetime(parts['rec_date'] + parts['rec_time'], format='%Y%m%d%H%M%S', errors='coerce').astype('datetime64[ns]'),
+        'phone_key': phone_key(parts['rec_phone']),
+    }, index=filenames.index)
+
+@st.cache_data
+def dialer_index(_df: pd.DataFrame, version: str) -> Optional[pd.DataFrame]:
+    """Return dialer rows keyed by (phone_key, user, call_dateTime), sorted by time for as-of joins."""
+    if 'phone_number_dialed' not in _df.columns or 'call_dateTime' not in _df.columns:
+        return None
+    calls = _df[[col for col in DIALER_COLUMNS if col in _df.columns]].assign(phone_key=phone_key(_df['phone_number_dialed']))
+    calls = calls.dropna(subset=['phone_key', 'call_dateTime'])
+    # Both join keys in ns: frames read back from the Arrow/Parquet stores may carry other units
+    calls = calls.astype({'phone_key': 'int64', 'call_dateTime': 'datetime64[ns]'})
+    return calls.sort_values('call_dateTime', kind='stable').reset_index(drop=True)
+
+@st.cache_data
+def match_recordings(_df: pd.DataFrame, version: str, _recordings: pd.DataFrame, recordings_version: str,
+                     tolerance_minutes: float = MATCH_TOLERANCE_MINUTES) -> Optional[pd.DataFrame]:
+    """Link each recording to the dialer call to the same number that started nearest to it.
+
+    One sorted as-of join by phone number with a `tolerance_minutes` window, so matching is
+    O((calls + recordings) log n) instead of comparing every pair. Recordings that also carry a
+    `user` column are matched on (phone, agent). Unmatched recordings keep empty dialer columns.
+    Cached per dialer `version` and `recordings_version`.
+    """
+    index = dialer_index(_df, version)
+    if index is None or 'filename' not in _recordings.columns:
+        return None
+    recordings = _recordings.join(parse_recording_names(_recordings['filename']))
+    parsed = recordings.dropna(subset=['recording_time', 'phone_key']).astype({'phone_key': 'int64'})
+    by = ['phone_key', 'user'] if 'user' in _recordings.columns and 'user' in index.columns else 'phone_key'
+    matched = pd.merge_asof(
+        parsed.sort_values('recording_time', kind='stable'),
+        index,
+        left_on='recording_time', right_on='call_dateTime', by=by, direction='nearest',
+        tolerance=pd.Timedelta(minutes=tolerance_minutes), suffixes=('', '_dialer'))
+    matched['match_offset_sec'] = (matched['recording_time'] - matched['call_dateTime']).dt.total_seconds()
+    unparsed = recordings.loc[~recordings.index.isin(parsed.index)]
+    return pd.concat([matched, unparsed], ignore_index=True)
+
+def agent_audio_summary(matched: pd.DataFrame) -> pd.DataFrame:
+    """Per-agent audio profile of matched recordings: energy, pauses and, when scored, priority/anomaly counts."""
+    linked = matched.dropna(subset=['full_name'])
+    aggs = {'recordings': ('filename', 'size')}
+    for name, col in [('avg_duration_sec', 'general_duration'), ('avg_energy_rms', 'energy_rms'),
+                      ('avg_silence_ratio', 'silence_ratio'), ('avg_long_pauses', 'silence_long_pause_count')]:
+        if col in linked.columns:
+            aggs[name] = (col, 'mean')
+    if 'is_anomaly' in linked.columns:
+        aggs['anomalous_recordings'] = ('is_anomaly', 'sum')
+    if 'priority_level' in linked.columns:
+        linked = linked.assign(high_priority=linked['priority_level'].eq('HIGH'))
+        aggs['high_priority_recordings'] = ('high_priority', 'sum')
+        aggs['avg_composite_priority'] = ('composite_priority', 'mean')
+    return linked.groupby('full_name').agg(**aggs).sort_values('recordings', ascending=False).reset_index()
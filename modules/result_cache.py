@@ -0,0 +1,141 @@
+import datetime
+import json
+import os
+import shutil
+from typing import Any, Callable, Optional
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+from modules import agent_analysis, anomaly, app_dirs, eda, time_analysis
+from modules.dataset_store import to_arrow
+
+RESULTS_DIR = os.environ.get('CALLCENTER_RESULTS_DIR', os.path.join(app_dirs.APP_DATA_DIR, 'results'))
+# Least recently used result sets beyond this many dataset versions are deleted
+MAX_RESULT_SETS = int(os.environ.get('CALLCENTER_MAX_RESULT_SETS', 50))
+META_FILE = 'result.json'
+# Dashboard results that are precomputed for ingested dumps and persisted per dataset version
+ANALYSES = {
+    'overview': eda.overview_stats,
+    'agent_performance': agent_analysis.agent_performance,
+    'time_patterns': time_analysis.time_patterns,
+    'anomalies': lambda df: anomaly.detect_anomalies(df, n=10),
+}
+
+def _path(version: str, name: str, directory: str = RESULTS_DIR) -> str:
+    return os.path.join(directory, version, name)
+
+def _encode(value: Any, folder: str, files: list) -> Any:
+    """JSON-encode `value`, writing every frame or series it holds to a Parquet file in `folder`."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        file = f"{len(files)}.parquet"
+        files.append(file)
+        frame = value.to_frame('values') if isinstance(value, pd.Series) else value
+        pq.write_table(to_arrow(frame, preserve_index=True), os.path.join(folder, file))
+        return {'__series__' if isinstance(value, pd.Series) else '__frame__': file,
+                'name': value.name if isinstance(value, pd.Series) else None}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return {'__timestamp__': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, tuple):
+        return {'__tuple__': [_encode(item, folder, files) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item, folder, files) for item in value]
+    if isinstance(value, dict):
+        return {'__dict__': [[key, _encode(item, folder, files)] for key, item in value.items()]}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"cannot persist a {type(value).__name__} result")
+
+def _decode(value: Any, folder: str) -> Any:
+    if isinstance(value, list):
+        return [_decode(item, folder) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '__frame__' in value or '__series__' in value:
+        frame = pq.read_table(os.path.join(folder, value.get('__frame__') or value['__series__'])).to_pandas()
+        return frame['values'].rename(value['name']) if '__series__' in value else frame
+    if '__timestamp__' in value:
+        return pd.Timestamp(value['__timestamp__'])
+    if '__date__' in value:
+        return datetime.date.fromisoformat(value['__date__'])
+    if '__tuple__' in value:
+        return tuple(_decode(item, folder) for item in value['__tuple__'])
+    return {key: _decode(item, folder) for key, item in value['__dict__']}
+
+@st.cache_data
+def _load(path: str, mtime: float) -> Any:
+    # `mtime` is part of the cache key, so a result rewritten by the ingest worker is picked up
+    with open(os.path.join(path, META_FILE)) as f:
+        return _decode(json.load(f), path)
+
+def has(version: Optional[str], name: str) -> bool:
+    """Return True when result `name` is persisted for dataset `version`."""
+    return version is not None and os.path.exists(os.path.join(_path(version, name), META_FILE))
+
+def load(version: Optional[str], name: str, default: Any = None) -> Any:
+    """Return the persisted result `name` for dataset `version`, or `default` if there is none."""
+    if not has(version, name):
+        return default
+    path = _path(version, name)
+    # The result set's mtime is its last use, for eviction
+    os.utime(os.path.dirname(path))
+    return _load(path, os.path.getmtime(os.path.join(path, META_FILE)))
+
+def save(version: str, name: str, value: Any) -> None:
+    """Persist `value` as result `name` of dataset `version`: frames and series as Parquet, the rest as JSON.
+
+    The result is written to a temporary folder and moved into place, so readers never see a
+    partial result. Saving a new dataset version evicts the least recently used ones beyond
+    `MAX_RESULT_SETS`.
+    """
+    path = _path(version, name)
+    new_version = not os.path.isdir(os.path.dirname(path))
+    app_dirs.private_dir(RESULTS_DIR)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    files = []
+    meta = _encode(value, tmp_path, files)
+    with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+        json.dump(meta, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    if new_version:
+        evict()
+
+def evict(max_sets: int = MAX_RESULT_SETS, directory: str = RESULTS_DIR) -> int:
+    """Delete the least recently used result sets beyond `max_sets`; return how many were deleted."""
+    if not os.path.isdir(directory):
+        return 0
+    sets = [entry for entry in os.scandir(directory) if entry.is_dir()]
+    sets.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in sets[max_sets:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return max(len(sets) - max_sets, 0)
+
+def cached(version: Optional[str], name: str, compute: Callable, *args, **kwargs) -> Any:
+    """Return result `name` for dataset `version` from disk, computing and persisting it on a miss.
+
+    A `version` of None (e.g. a one-off stored-history query) is computed and not persisted.
+    """
+    if version is None:
+        return compute(*args, **kwargs)
+    if has(version, name):
+        return load(version, name)
+    value = compute(*args, **kwargs)
+    save(version, name, value)
+    return value
+
+def analysis(name: str, df: pd.DataFrame, version: Optional[str]) -> Any:
+    """Return one of the `ANALYSES` for `df`, reusing the persisted result when it exists."""
+    return cached(version, name, ANALYSES[name], df)
+
+def precompute(df: pd.DataFrame, version: str) -> None:
+    """Compute and persist every entry of `ANALYSES` for dataset `version`."""
+    for name in ANALYSES:
+        analysis(name, df, version)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+from modules import datetime_parsing
+
+MAX_CALL_SECONDS = 4 * 3600
+PLACEHOLDER_DATES = ['0000-00-00', '0000-00-00 00:00:00']
+# (rule, action, description), applied in this order; a row is counted under the first rule it breaks
+RULES = [
+    ('blank_row', 'drop', 'Row has no values'),
+    ('summary_row', 'drop', 'Summary/footer row: first column is not a date and the row is mostly empty'),
+    ('duplicate_row', 'drop', 'Exact duplicate of an earlier row'),
+    ('invalid_length', 'quarantine', f'length_in_sec is not a number, negative or longer than {MAX_CALL_SECONDS // 3600} h'),
+    ('blank_agent', 'fill', "No agent name; reported as 'Unknown Agent'"),
+    ('placeholder_dob', 'fill', "date_of_birth is a 0000-00-00 placeholder; cleared"),
+]
+
+def _blank(values: pd.Series) -> np.ndarray:
+    """Null or whitespace-only cells, checked once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    blank = np.append(pd.Index(uniques).astype(str).str.strip() == '', True)
+    return blank[codes]
+
+def _row_hash(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash per row built from per-column factorize codes (much cheaper than hashing every string)."""
+    h = np.zeros(len(df), dtype=np.uint64)
+    for col in df.columns:
+        codes, _ = pd.factorize(df[col], use_na_sentinel=False)
+        # splitmix64 finaliser spreads the small integer codes over all 64 bits before mixing
+        x = codes.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        h = (h * np.uint64(31)) ^ x ^ (x >> np.uint64(31))
+    return h
+
+def _rule_masks(df: pd.DataFrame) -> dict:
+    n = len(df)
+    filled = df.notna().to_numpy().sum(axis=1)
+    masks = {'blank_row': filled == 0}
+    first = df.iloc[:, 0]
+    first_dates, first_report = datetime_parsing.parse_datetimes(first)
+    is_date_column = first_report['unparseable'] < 0.5 * max(n - first_report['missing'], 1)
+    masks['summary_row'] = (first_dates.isna().to_numpy() & (filled < 0.5 * df.shape[1])) if is_date_column else np.zeros(n, dtype=bool)
+    masks['duplicate_row'] = pd.Series(_row_hash(df)).duplicated().to_numpy()
+    if 'length_in_sec' in df.columns:
+        length = pd.to_numeric(df['length_in_sec'], errors='coerce')
+        masks['invalid_length'] = (df['length_in_sec'].notna() & (length.isna() | (length < 0) | (length > MAX_CALL_SECONDS))).to_numpy()
+    if 'full_name' in df.columns:
+        masks['blank_agent'] = _blank(df['full_name'])
+    if 'date_of_birth' in df.columns:
+        masks['placeholder_dob'] = df['date_of_birth'].astype(str).isin(PLACEHOLDER_DATES).to_numpy()
+    return masks
+
+# Not cached: it runs once per upload, and hashing the raw frame for a cache key costs as much as sanitizing it
+def sanitize(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Apply every validity rule as a vectorized mask and return (clean rows, quarantined rows).
+
+    Dropped rows (blank, summary/footer, exact duplicates via row hashing) are discarded,
+    quarantined rows are returned separately for review, and fixable problems (blank agents,
+    placeholder dates of birth) are cleared to NaN for preprocessing to fill. The per-rule
+    counts are stored in `clean.attrs['quality_report']`; see `quality_report`.
+    """
+    masks = _rule_masks(df)
+    taken = np.zeros(len(df), dtype=bool)
+    drop = np.zeros(len(df), dtype=bool)
+    quarantine = np.zeros(len(df), dtype=bool)
+    reason = np.full(len(df), None, dtype=object)
+    report = []
+    for rule, action, description in RULES:
+        if rule not in masks:
+            continue
+        hit = masks[rule] & ~taken
+        if action == 'drop':
+            drop |= hit
+        elif action == 'quarantine':
+            quarantine |= hit
+            reason[hit] = rule
+        if action != 'fill':
+            taken |= hit
+        report.append({'rule': rule, 'action': action, 'description': description, 'rows': int(hit.sum())})
+
+    keep = ~taken
+    fixes = {}
+    if 'blank_agent' in masks:
+        fixes['full_name'] = df['full_name'].mask(masks['blank_agent'])
+    if 'placeholder_dob' in masks:
+        fixes['date_of_birth'] = df['date_of_birth'].mask(masks['placeholder_dob'])
+    clean = df.assign(**fixes)[keep].reset_index(drop=True)
+    clean.attrs['quality_report'] = [{'rule': 'input_rows', 'action': '', 'description': 'Rows in the uploaded file', 'rows': int(len(df))}] + report
+    return clean, df[quarantine].assign(quarantine_reason=reason[quarantine])
+
+def quality_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the sanitizer's per-rule counts carried by `df` (empty if it was not sanitized)."""
+    return pd.DataFrame(df.attrs.get('quality_report', []), columns=['rule', 'action', 'description', 'rows'])
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+import streamlit as st
+
+SESSION_COLUMNS = ['phone_number_dialed', 'call_dateTime', 'call_outcome', 'full_name', 'length_in_sec']
+
+def _order_by_number(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Return the dial attempts sorted by phone number and call time, with integer number codes."""
+    if 'phone_number_dialed' not in df.columns or 'call_dateTime' not in df.columns:
+        return None
+    calls = df[[c for c in SESSION_COLUMNS if c in df.columns]].dropna(subset=['phone_number_dialed', 'call_dateTime'])
+    if calls.empty:
+        return None
+    phone = calls['phone_number_dialed']
+    if pd.api.types.is_numeric_dtype(phone):
+        phone = phone.astype('int64')
+    else:
+        phone = phone.astype(str).str.strip()
+    codes, _ = pd.factorize(phone)
+    times = calls['call_dateTime'].to_numpy(dtype='datetime64[ns]').view('int64')
+    order = np.lexsort((times, codes))
+    calls = calls.iloc[order].reset_index(drop=True)
+    calls['phone_number_dialed'] = phone.to_numpy()[order]
+    calls['number_code'] = codes[order]
+    return calls
+
+@st.cache_data
+def sessionize_calls(df: pd.DataFrame, gap_minutes: float = 60) -> Optional[pd.DataFrame]:
+    """Group dial attempts by phone number into sessions split on gaps longer than `gap_minutes`.
+
+    One sort plus array diffs: every attempt gets its session id, position in the session,
+    minutes since the previous attempt to the same number and hand-off / drop-then-answer flags.
+    """
+    calls = _order_by_number(df)
+    if calls is None:
+        return None
+    n = len(calls)
+    codes = calls['number_code'].to_numpy()
+    times = calls['call_dateTime'].to_numpy(dtype='datetime64[ns]').view('int64')
+    outcome = calls['call_outcome'].to_numpy()
+    agent = calls['full_name'].astype(str).to_numpy()
+
+    new_number = np.ones(n, dtype=bool)
+    new_number[1:] = codes[1:] != codes[:-1]
+    gap_min = np.full(n, np.nan)
+    gap_min[1:] = (times[1:] - times[:-1]) / 60e9
+    gap_min[new_number] = np.nan
+    new_session = new_number | (gap_min > gap_minutes)
+
+    idx = np.arange(n)
+    number_start = np.maximum.accumulate(np.where(new_number, idx, 0))
+    session_start = np.maximum.accumulate(np.where(new_session, idx, 0))
+    prev_outcome = np.empty(n, dtype=object)
+    prev_outcome[0] = None
+    prev_outcome[1:] = outcome[:-1]
+    prev_outcome[new_session] = None
+    prev_agent = np.empty(n, dtype=object)
+    prev_agent[0] = None
+    prev_agent[1:] = agent[:-1]
+    prev_agent[new_session] = None
+
+    # A drop anywhere earlier in the session makes a later answer a drop-then-answer
+    dropped = outcome == 'Dropped'
+    drops_so_far = np.cumsum(dropped)
+    drops_before_session = (drops_so_far - dropped)[session_start]
+    drops_before = drops_so_far - dropped - drops_before_session
+
+    calls['session_id'] = np.cumsum(new_session) - 1
+    calls['attempt_number'] = idx - number_start + 1
+    calls['session_attempt'] = idx - session_start + 1
+    calls['minutes_since_prev'] = gap_min
+    calls['prev_outcome'] = prev_outcome
+    calls['prev_agent'] = prev_agent
+    calls['is_handoff'] = ~new_session & (prev_agent != agent)
+    calls['is_drop_then_answer'] = (outcome == 'Answered') & (drops_before > 0)
+    return calls.drop(columns='number_code')
+
+@st.cache_data
+def session_summary(df: pd.DataFrame, gap_minutes: float = 60) -> Optional[pd.DataFrame]:
+    """Return one row per dial session with attempts, outcomes, agents involved and hand-offs."""
+    calls = sessionize_calls(df, gap_minutes)
+    if calls is None:
+        return None
+    calls = calls.assign(
+        answered=calls['call_outcome'] == 'Answered',
+        dropped=calls['call_outcome'] == 'Dropped',
+        minutes_between=calls['minutes_since_prev'].where(calls['session_attempt'] > 1))
+    sessions = calls.groupby('session_id', sort=True).agg(
+        phone_number_dialed=('phone_number_dialed', 'first'),
+        session_start=('call_dateTime', 'min'),
+        session_end=('call_dateTime', 'max'),
+        attempts=('call_dateTime', 'size'),
+        answered=('answered', 'sum'),
+        dropped=('dropped', 'sum'),
+        agents=('full_name', 'nunique'),
+        handoffs=('is_handoff', 'sum'),
+        drop_then_answer=('is_drop_then_answer', 'any'),
+        avg_minutes_between=('minutes_between', 'mean'))
+    sessions['session_minutes'] = (sessions['session_end'] - sessions['session_start']).dt.total_seconds() / 60
+    return sessions.reset_index()
+
+@st.cache_data
+def number_summary(df: pd.DataFrame, gap_minutes: float = 60) -> Optional[pd.DataFrame]:
+    """Return attempts, sessions, active days and attempt spacing per phone number."""
+    calls = sessionize_calls(df, gap_minutes)
+    if calls is None:
+        return None
+    calls = calls.assign(
+        call_day=calls['call_dateTime'].dt.normalize(),
+        answered=calls['call_outcome'] == 'Answered',
+        dropped=calls['call_outcome'] == 'Dropped')
+    numbers = calls.groupby('phone_number_dialed', sort=False).agg(
+        total_attempts=('call_dateTime', 'size'),
+        sessions=('session_id', 'nunique'),
+        unique_days=('call_day', 'nunique'),
+        answered=('answered', 'sum'),
+        dropped=('dropped', 'sum'),
+        agents=('full_name', 'nunique'),
+        handoffs=('is_handoff', 'sum'),
+        drop_then_answer=('is_drop_then_answer', 'sum'),
+        first_attempt=('call_dateTime', 'min'),
+        last_attempt=('call_dateTime', 'max'),
+        avg_minutes_between=('minutes_since_prev', 'mean'),
+        median_minutes_between=('minutes_since_prev', 'median'))
+    return numbers.sort_values('total_attempts', ascending=False).reset_index()
+
+@st.cache_data
+def drop_then_answer(df: pd.DataFrame, gap_minutes: float = 60) -> Optional[pd.DataFrame]:
+    """Return each session's first drop followed by the first later answer, with response time in minutes."""
+    calls = sessionize_calls(df, gap_minutes)
+    if calls is None:
+        return None
+    first_drop = calls[calls['call_outcome'] == 'Dropped'].drop_duplicates('session_id')
+    answers = calls[calls['is_drop_then_answer']].drop_duplicates('session_id')
+    pairs = first_drop[['session_id', 'phone_number_dialed', 'call_dateTime', 'full_name']].merge(
+        answers[['session_id', 'call_dateTime', 'full_name']], on='session_id', suffixes=('_drop', '_answer'))
+    pairs = pairs.rename(columns={
+        'call_dateTime_drop': 'call_date_drop', 'call_dateTime_answer': 'call_date_answer',
+        'full_name_drop': 'agent_drop', 'full_name_answer': 'agent_answer'})
+    pairs['call_day'] = pairs['call_date_drop'].dt.date
+    pairs['response_time_minutes'] = (pairs['call_date_answer'] - pairs['call_date_drop']).dt.total_seconds() / 60
+    pairs['is_handoff'] = pairs['agent_drop'] != pairs['agent_answer']
+    return pairs[['phone_number_dialed', 'call_day', 'call_date_drop', 'call_date_answer',
+                  'response_time_minutes', 'agent_drop', 'agent_answer', 'is_handoff']]
@@ -0,0 +1,144 @@
+import importlib.util
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as pads
+import streamlit as st
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def is_available() -> bool:
+    """Return True when the embedded SQL engine (DuckDB) is installed; it is imported on first query."""
+    return importlib.util.find_spec('duckdb') is not None
+
+@st.cache_resource
+def get_connection():
+    """Return the process-wide in-memory DuckDB connection with file system access disabled.
+
+    Data is never imported: each query registers the persisted Arrow files as the `calls` view
+    and DuckDB scans them in place with projection and filter pushdown.
+    """
+    import duckdb
+    return duckdb.connect(config={'enable_external_access': False})
+
+def _calls_dataset(paths: List[str]) -> pads.Dataset:
+    """Open persisted Arrow IPC dumps as one dataset, unifying schemas that differ between dumps."""
+    schemas = [pads.dataset(path, format='ipc').schema for path in paths]
+    schema = pa.unify_schemas(schemas, promote_options='permissive')
+    return pads.dataset(paths, schema=schema, format='ipc')
+
+def _cursor(paths: List[str]):
+    """Return a thread-local cursor with the dumps at `paths` registered as the `calls` view."""
+    cursor = get_connection().cursor()
+    cursor.register('calls', _calls_dataset(paths))
+    return cursor
+
+def _query(paths: List[str], sql: str, params: Optional[list] = None) -> pd.DataFrame:
+    return _cursor(paths).execute(sql, params or []).df()
+
+@st.cache_data
+def overview_stats_sql(paths: List[str]) -> Dict[str, Any]:
+    """SQL counterpart of `eda.overview_stats`: totals, outcome mix, talk time and busiest hour/day.
+
+    Stored dumps are immutable and named by dataset version, so results are cached by `paths`.
+    """
+    totals = _query(paths, """
+        SELECT count(*) AS total_calls,
+               count(DISTINCT full_name) AS unique_agents,
+               min(date) AS date_min, max(date) AS date_max,
+               avg(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS avg_talk_time,
+               sum(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS total_talk_time,
+               median(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS median_talk_time,
+               min(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS min_talk_time,
+               max(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS max_talk_time,
+               mode(hour) AS busiest_hour,
+               mode(day_of_week) AS busiest_day
+        FROM calls""").iloc[0]
+    outcome_counts = _query(paths, """
+        SELECT call_outcome, count(*) AS calls FROM calls GROUP BY call_outcome ORDER BY calls DESC
+        """).set_index('call_outcome')['calls']
+    total_calls = int(totals['total_calls'])
+    outcome_dist = outcome_counts / total_calls * 100 if total_calls else outcome_counts.astype(float)
+    return {
+        'total_calls': total_calls,
+        'avg_talk_time': totals['avg_talk_time'],
+        'total_talk_time': totals['total_talk_time'],
+        'unique_agents': int(totals['unique_agents']),
+        'date_range': tuple(None if pd.isna(d) else pd.Timestamp(d).date() for d in (totals['date_min'], totals['date_max'])),
+        'outcome_dist': outcome_dist,
+        'outcome_counts': outcome_counts,
+        'min_talk_time': totals['min_talk_time'],
+        'max_talk_time': totals['max_talk_time'],
+        'median_talk_time': totals['median_talk_time'],
+        'answered_count': int(outcome_counts.get('Answered', 0)),
+        'dropped_count': int(outcome_counts.get('Dropped', 0)),
+        'answered_rate': outcome_dist.get('Answered', 0),
+        'dropped_rate': outcome_dist.get('Dropped', 0),
+        'busiest_hour': totals['busiest_hour'],
+        'busiest_day': totals['busiest_day'],
+    }
+
+@st.cache_data
+def agent_performance_sql(paths: List[str]) -> pd.DataFrame:
+    """SQL counterpart of `agent_analysis.agent_performance` (report columns only)."""
+    return _query(paths, """
+        WITH agents AS (
+            SELECT full_name,
+                   count(*) AS total_calls,
+                   count(*) FILTER (WHERE call_outcome = 'Answered') AS Answered,
+                   count(*) FILTER (WHERE call_outcome = 'Dropped') AS Dropped,
+                   avg(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS avg_talk_time_min,
+                   median(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS median_talk_time_min,
+                   sum(length_in_min) FILTER (WHERE call_outcome = 'Answered') / 60 AS total_talk_time_hours,
+                   stddev_samp(length_in_min) FILTER (WHERE call_outcome = 'Answered') AS std_talk_time_min
+            FROM calls GROUP BY full_name
+        )
+        SELECT full_name, total_calls, Answered, Dropped,
+               coalesce(Answered * 100.0 / nullif(total_calls, 0), 0) AS answer_rate,
+               coalesce(avg_talk_time_min, 0) AS avg_talk_time_min,
+               coalesce(median_talk_time_min, 0) AS median_talk_time_min,
+               coalesce(total_talk_time_hours, 0) AS total_talk_time_hours,
+               coalesce(std_talk_time_min / nullif(avg_talk_time_min, 0), 0) AS talk_time_consistency_cv,
+               CASE WHEN Answered > 0 THEN dense_rank() OVER (PARTITION BY Answered > 0 ORDER BY avg_talk_time_min) ELSE 0 END AS rank_by_avg_talk_time,
+               dense_rank() OVER (ORDER BY total_calls DESC) AS rank_by_total_calls,
+               coalesce(std_talk_time_min, 0) AS std_talk_time_min
+        FROM agents
+        ORDER BY rank_by_avg_talk_time
+        """)
+
+@st.cache_data
+def time_patterns_sql(paths: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """SQL counterpart of `time_analysis.time_patterns`: hourly and daily volume and average talk time."""
+    pattern_sql = """
+        SELECT {key}, count(*) AS total_calls,
+               coalesce(avg(length_in_min) FILTER (WHERE call_outcome = 'Answered'), 0) AS avg_talk_time_min
+        FROM calls WHERE {key} IS NOT NULL GROUP BY {key} ORDER BY {key}"""
+    hourly_stats = _query(paths, pattern_sql.format(key='hour')).set_index('hour')
+    daily_stats = _query(paths, pattern_sql.format(key='day_of_week')).set_index('day_of_week')
+    daily_stats = daily_stats.reindex([day for day in DAY_ORDER if day in daily_stats.index])
+    return hourly_stats, daily_stats
+
+@st.cache_data
+def detect_anomalies_sql(paths: List[str], n: int = 10) -> Optional[pd.DataFrame]:
+    """SQL counterpart of `anomaly.detect_anomalies`: top `n` answered calls outside the IQR fences."""
+    anomalies = _query(paths, """
+        WITH answered AS (
+            SELECT call_dateTime, full_name, status, length_in_sec, length_in_min
+            FROM calls WHERE call_outcome = 'Answered'
+        ), fences AS (
+            SELECT quantile_cont(length_in_min, 0.25) AS q1, quantile_cont(length_in_min, 0.75) AS q3 FROM answered
+        )
+        SELECT call_dateTime, full_name, status, length_in_sec, length_in_min,
+               abs(length_in_min - (q1 + q3) / 2) AS anomaly_score
+        FROM answered, fences
+        WHERE length_in_min < q1 - 1.5 * (q3 - q1) OR length_in_min > q3 + 1.5 * (q3 - q1)
+        ORDER BY anomaly_score DESC
+        LIMIT ?""", [n])
+    return None if anomalies.empty else anomalies
+
+def stream_query(paths: List[str], sql: str, batch_size: int = 50_000) -> Iterator[pd.DataFrame]:
+    """Run an ad-hoc query against the `calls` view and yield the result in DataFrame batches."""
+    result = _cursor(paths).execute(sql)
+    reader = result.to_arrow_reader(batch_size) if hasattr(result, 'to_arrow_reader') else result.fetch_record_batch(batch_size)
+    for batch in reader:
+        yield batch.to_pandas()
@@ -1,18 +1,94 @@
+import datetime
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Optional, Tuple
 import streamlit as st
+from modules import compute_backend
 
 @st.cache_data
-def time_patterns(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def time_patterns(df: pd.DataFrame, backend: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Return hourly and daily call volume and average talk time DataFrames."""
-    answered_df = df[df['call_outcome'] == 'Answered']
-    hourly_calls = df.groupby('hour')['call_outcome'].count()
-    hourly_avg_talk = answered_df.groupby('hour')['length_in_min'].mean()
-    hourly_stats = pd.DataFrame({'total_calls': hourly_calls, 'avg_talk_time_min': hourly_avg_talk}).fillna(0)
-
-    daily_calls = df.groupby('day_of_week')['call_outcome'].count()
-    daily_avg_talk = answered_df.groupby('day_of_week')['length_in_min'].mean()
-    daily_stats = pd.DataFrame({'total_calls': daily_calls, 'avg_talk_time_min': daily_avg_talk}).fillna(0)
+    backend = compute_backend.resolve(df, backend)
+    stats = []
+    for col in ('hour', 'day_of_week'):
+        calls = compute_backend.aggregate(df, [col], {'total_calls': ('call_outcome', 'count')}, backend=backend)['total_calls']
+        avg_talk = compute_backend.aggregate(df, [col], {'avg_talk_time_min': ('length_in_min', 'mean')}, where=('call_outcome', 'Answered'), backend=backend)['avg_talk_time_min']
+        stats.append(pd.DataFrame({'total_calls': calls, 'avg_talk_time_min': avg_talk}).fillna(0))
+    hourly_stats, daily_stats = stats
     day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     daily_stats = daily_stats.reindex([day for day in day_order if day in daily_stats.index])
-    return hourly_stats, daily_stats 
\ No newline at end of file
+    return hourly_stats, daily_stats 
+
+def _call_events(df: pd.DataFrame, group_col: Optional[str] = None):
+    """Sweep-line over call intervals: return sorted event times, deltas, group codes, group labels and active calls."""
+    calls = df[df['length_in_sec'] > 0].dropna(subset=['call_dateTime'])
+    start = calls['call_dateTime'].to_numpy(dtype='datetime64[ns]').view('int64')
+    end = start + (calls['length_in_sec'].to_numpy(dtype=float) * 1e9).astype('int64')
+    if group_col and group_col in calls.columns:
+        codes, labels = pd.factorize(calls[group_col].astype(str), sort=True)
+    else:
+        codes, labels = np.zeros(len(calls), dtype=np.int64), pd.Index(['All'])
+    times = np.concatenate([start, end])
+    delta = np.concatenate([np.ones(len(start), dtype=np.int64), -np.ones(len(end), dtype=np.int64)])
+    groups = np.concatenate([codes, codes])
+    # Ends sort before starts at the same instant so back-to-back calls never overlap;
+    # every group nets to zero, so one cumulative sum restarts at each group boundary
+    order = np.lexsort((delta, times, groups))
+    times, delta, groups = times[order], delta[order], groups[order]
+    return times, delta, groups, labels, np.cumsum(delta)
+
+@st.cache_data
+def concurrency_curve(_df: pd.DataFrame, version: str, resolution: str = '1min', day: Optional[datetime.date] = None) -> pd.DataFrame:
+    """Return the peak number of concurrent active calls in every `resolution` bin (e.g. '1min', '1s').
+
+    Each call with talk time (`length_in_sec > 0`, whatever its outcome) becomes a +1 event at its
+    start and a -1 event at start + `length_in_sec`; a cumulative sum over the sorted events gives
+    active calls. `day` limits the bins to that date (calls carried over from the day before still
+    count), which keeps a per-second curve to 86,400 points. Cached per dataset `version`.
+    """
+    times, delta, _, _, active = _call_events(_df)
+    if len(times) == 0:
+        return pd.DataFrame(columns=['concurrent_calls'])
+    step = pd.Timedelta(resolution).value
+    bins = times // step
+    first = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    event_bins = bins[first]
+    # A bin's peak is the highest level reached inside it or carried in from the previous bin
+    carried_in = np.r_[0, active[first[1:] - 1]]
+    bin_peak = np.maximum(np.maximum.reduceat(active, first), carried_in)
+    bin_close = active[np.r_[first[1:] - 1, len(active) - 1]]
+    lo, hi = event_bins[0], event_bins[-1]
+    if day is not None:
+        day_start = pd.Timestamp(day).value // step
+        lo, hi = max(lo, day_start), min(hi, (pd.Timestamp(day) + pd.Timedelta(days=1)).value // step - 1)
+    all_bins = np.arange(lo, hi + 1)
+    pos = np.searchsorted(event_bins, all_bins, side='right') - 1
+    has_events = event_bins[pos] == all_bins
+    curve = np.where(has_events, bin_peak[pos], bin_close[pos])
+    index = pd.DatetimeIndex((all_bins * step).astype('datetime64[ns]'), name='time')
+    return pd.DataFrame({'concurrent_calls': curve}, index=index)
+
+@st.cache_data
+def peak_concurrency(_df: pd.DataFrame, version: str, by: Optional[str] = None) -> pd.DataFrame:
+    """Return peak concurrent calls and when it occurred per day, optionally per `by` group (e.g. 'campaign_id', 'user_group')."""
+    times, delta, groups, labels, active = _call_events(_df, by)
+    group_name = by or 'group'
+    if len(times) == 0:
+        return pd.DataFrame(columns=[group_name, 'date', 'peak_concurrent_calls', 'peak_time'])
+    day_ns = pd.Timedelta('1D').value
+    days = times // day_ns
+    first_of_day = np.r_[True, (days[1:] != days[:-1]) | (groups[1:] != groups[:-1])]
+    # Calls still running at midnight: the level before the day's first event holds from 00:00
+    level, when = active.copy(), times.copy()
+    carried = first_of_day & (active - delta > active)
+    level[carried] = (active - delta)[carried]
+    when[carried] = days[carried] * day_ns
+    events = pd.DataFrame({'group': groups, 'day': days, 'level': level, 'when': when})
+    peaks = events.loc[events.groupby(['group', 'day'], sort=True)['level'].idxmax()]
+    result = pd.DataFrame({
+        group_name: labels[peaks['group'].to_numpy()],
+        'date': pd.to_datetime(peaks['day'].to_numpy() * day_ns).date,
+        'peak_concurrent_calls': peaks['level'].to_numpy(),
+        'peak_time': pd.to_datetime(peaks['when'].to_numpy()),
+    })
+    return result if by else result.drop(columns=group_name)